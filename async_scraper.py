@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio-Scrape-Engine für Pricehunter
+-------------------------------------
+Alternative zu main.scrape_all für viele gleichzeitige Suchen in *einem*
+Worker-Prozess (statt eines blockierenden Selenium-Drivers pro Suche):
+- aiohttp-Client mit Connection-Pooling (ein ClientSession/Connector für alle Suchen)
+- Semaphore pro Host begrenzt gleichzeitige Requests je Zielserver
+- Tempo pro Host über den gemeinsamen RateGovernor (rate_governor.py); gesperrte
+  oder leere Seiten (Captcha, 403/429/503) werden nach Backoff erneut geladen
+- Paginierung asynchron über main.NEXT_SELECTOR
+- HTML-Parsing (CPU-lastig) läuft über main.parse_page in einem Thread- oder
+  Prozess-Executor, damit die Event-Loop nicht blockiert.
+
+Hinweis: Lädt Seiten ohne Browser, d.h. ohne JavaScript/Lazy-Loading. Für eBay-
+Suchseiten reicht das serverseitig gerenderte HTML; Cookie-Banner entfallen.
+
+Beispiel:
+    offers_by_query = run_async_scrape([("ski", "70"), ("skischuhe", "120")])
+    for page_rows in iter_async_search("ski", "70"):  # seitenweise (Live-Ansicht)
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import main
+from checkpoint import Checkpoint
+from offers import Offer
+from page_archive import PageArchive, open_archive
+from rate_governor import (
+    BLOCK_STATUSES,
+    ERROR,
+    PAGE_RETRIES,
+    RETRY_OUTCOMES,
+    TIMEOUT,
+    CircuitOpenError,
+    RateGovernor,
+    classify_page,
+    get_governor,
+)
+from stop_conditions import (
+    StopCondition,
+    default_stop_conditions,
+    first_stop_reason,
+    track_page,
+)
+
+logger = logging.getLogger("ebay_scraper.async")
+
+# ----------------------------- Konfiguration ----------------------------- #
+MAX_CONCURRENCY = 64  # max. offene Verbindungen insgesamt (Connection-Pool)
+PER_HOST_LIMIT = 6  # max. gleichzeitige Requests pro Host
+REQUEST_TIMEOUT = 25  # Sekunden (analog wait_for_results)
+PAGE_DELAY = 0.0  # zusätzliche feste Pause zwischen Seiten (Tempo: RateGovernor)
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
+)
+
+
+class AsyncScrapeEngine:
+    """
+    Teilt Connection-Pool, Host-Semaphoren und Parser-Executor zwischen allen
+    Suchen. Verwendung als async Context-Manager:
+
+        async with AsyncScrapeEngine() as engine:
+            rows = await engine.scrape(start_url)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        per_host_limit: int = PER_HOST_LIMIT,
+        timeout: float = REQUEST_TIMEOUT,
+        page_delay: float = PAGE_DELAY,
+        executor: Optional[Executor] = None,
+        archive: Optional[PageArchive] = None,
+        governor: Optional[RateGovernor] = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.page_delay = page_delay
+        self.executor = executor  # None -> Default-ThreadPool der Event-Loop
+        self.archive = archive  # None -> Seiten nicht archivieren
+        self.governor = governor or get_governor()  # mit Tabs/Selenium geteilt
+        self.pages_fetched = 0
+        self._session = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncScrapeEngine":
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency, limit_per_host=self.per_host_limit
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "de-CH,de;q=0.9"},
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        sem = self._host_semaphores.get(host)
+        if sem is None:
+            sem = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return sem
+
+    async def fetch(self, url: str) -> str:
+        """
+        Lädt eine Seite (Tempo über den RateGovernor, begrenzt durch die
+        Semaphore des Hosts). HTTP- und Netzwerkfehler werden dem Governor
+        gemeldet und weitergereicht.
+
+        Raises:
+            CircuitOpenError: Host ist nach zu vielen Fehlschlägen gesperrt.
+        """
+        import aiohttp
+
+        if self._session is None:
+            raise RuntimeError(
+                "AsyncScrapeEngine muss mit 'async with' geöffnet werden."
+            )
+        delay = self.governor.reserve(url)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.governor.reserve(url)
+        async with self._host_semaphore(url):
+            try:
+                async with self._session.get(url) as resp:
+                    if resp.status >= 400:
+                        self.governor.record(
+                            url, classify_page("", 0, status=resp.status)
+                        )
+                    resp.raise_for_status()
+                    html = await resp.text()
+            except asyncio.TimeoutError:
+                self.governor.record(url, TIMEOUT)
+                raise
+            except aiohttp.ClientResponseError:
+                raise  # Status oben bereits gemeldet
+            except aiohttp.ClientError:  # Verbindung abgebrochen, Antwort defekt, …
+                self.governor.record(url, ERROR)
+                raise
+        self.pages_fetched += 1
+        return html
+
+    async def _fetch_page(
+        self, url: str, page: int
+    ) -> Optional[Tuple[str, List[Offer], Optional[str]]]:
+        """
+        Lädt und parst eine Suchseite; gesperrte oder leere Seiten, Timeouts,
+        Netzwerk- und Serverfehler (5xx) werden bis zu PAGE_RETRIES Mal erneut
+        geladen. None = Seite bleibt gesperrt/fehlerhaft (oder z.B. 404).
+        """
+        import aiohttp
+
+        for attempt in range(PAGE_RETRIES + 1):
+            try:
+                html = await self.fetch(url)
+            except aiohttp.ClientResponseError as e:
+                outcome = classify_page("", 0, status=e.status)
+                if e.status not in BLOCK_STATUSES and e.status < 500:
+                    logger.warning("Seite %d: HTTP %d – Abbruch.", page, e.status)
+                    return None  # erneut laden hilft nicht
+            except asyncio.TimeoutError:
+                outcome = TIMEOUT
+            except aiohttp.ClientError as e:
+                logger.warning("Seite %d: %s", page, e)
+                outcome = ERROR
+            else:
+                page_rows, next_url = await self._parse(html)
+                outcome = classify_page(html, len(page_rows))
+                self.governor.record(url, outcome)
+                if outcome not in RETRY_OUTCOMES:
+                    return html, page_rows, next_url
+            logger.warning(
+                "Seite %d: %s (Versuch %d/%d)",
+                page,
+                outcome,
+                attempt + 1,
+                PAGE_RETRIES + 1,
+            )
+        return None
+
+    async def _parse(self, html: str) -> Tuple[List[Offer], Optional[str]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, main.parse_page, html, set())
+
+    async def scrape(
+        self,
+        start_url: str,
+        max_pages: int = main.MAX_PAGES,
+        stop_conditions: Optional[List[StopCondition]] = None,
+    ) -> List[Offer]:
+        """
+        Async-Pendant zu main.scrape_all: durchläuft die Paginierung einer Suche.
+        Bricht die Paginierung ab (Host gesperrt, Seite bleibt auch nach
+        PAGE_RETRIES gesperrt oder fehlerhaft), gilt das Teilergebnis.
+
+        Args:
+            start_url: Erste Suchseite.
+            max_pages: Maximale Seitenanzahl.
+            stop_conditions: Abbruchkriterien (None = default_stop_conditions()).
+
+        Returns:
+            Liste mit Angeboten (Offer), ohne doppelte Links.
+        """
+        try:
+            result = await self.scrape_search(start_url, max_pages, stop_conditions)
+        except main.ScrapeInterrupted as e:
+            return e.rows
+        return result.rows
+
+    async def scrape_search(
+        self,
+        start_url: str,
+        max_pages: int = main.MAX_PAGES,
+        stop_conditions: Optional[List[StopCondition]] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        on_page: Optional[Callable[[List[Offer]], None]] = None,
+    ) -> main.ScrapeResult:
+        """
+        Async-Pendant zu main.scrape_search (Argumente wie scrape).
+
+        Args:
+            checkpoint: Seiten und Cursor festhalten bzw. ab der ersten nicht
+                erledigten Seite fortsetzen (wie main.iter_scrape).
+            on_page: Wird mit den neuen Angeboten jeder Seite aufgerufen, sobald
+                sie geparst ist (siehe iter_async_search).
+
+        Returns:
+            ScrapeResult (Angebote, vollständig ja/nein).
+
+        Raises:
+            main.ScrapeInterrupted: Host gesperrt oder Seite bleibt gesperrt/fehlerhaft.
+        """
+        if stop_conditions is None:
+            stop_conditions = default_stop_conditions()
+        all_rows: List[Offer] = []
+        seen_links: set = set()
+        current_url = start_url
+        started = time.monotonic()
+        first_page = 1
+
+        state = checkpoint.load() if checkpoint is not None else None
+        if state is not None:
+            all_rows = state.rows
+            seen_links.update(offer.link for offer in all_rows)
+            if state.done:
+                return main.ScrapeResult(all_rows, state.complete)
+            logger.info(
+                "Checkpoint: weiter ab Seite %d (%d Angebote)",
+                len(state.pages) + 1,
+                len(all_rows),
+            )
+            current_url = state.next_url
+            first_page = len(state.pages) + 1
+
+        for page in range(first_page, max_pages + 1):
+            logger.info("Lade Seite %d: %s", page, current_url)
+            try:
+                loaded = await self._fetch_page(current_url, page)
+            except CircuitOpenError as e:
+                logger.warning("Paginierung abgebrochen: %s", e)
+                raise main.ScrapeInterrupted(
+                    f"Paginierung abgebrochen: {e}", all_rows
+                ) from e
+            if loaded is None:
+                logger.warning("Seite %d bleibt gesperrt/fehlerhaft – Abbruch.", page)
+                raise main.ScrapeInterrupted(
+                    f"Seite {page} bleibt gesperrt/fehlerhaft", all_rows
+                )
+            html, page_rows, next_url = loaded
+            if self.archive is not None:
+                self.archive.store(html, current_url, page)
+
+            # Duplikate über Seiten hinweg hier filtern (Executor arbeitet zustandslos)
+            new_rows, stats = track_page(
+                page, page_rows, seen_links, len(all_rows), started
+            )
+            all_rows.extend(new_rows)
+            logger.info(" → %d verwertbare Angebote (nach Filter)", len(new_rows))
+
+            next_url = urljoin(current_url, next_url) if next_url else None
+            reason = first_stop_reason(stop_conditions, stats) if next_url else None
+            if checkpoint is not None:
+                last = reason or page == max_pages
+                checkpoint.save(
+                    page, new_rows, None if last else next_url, complete=not next_url
+                )
+            if on_page is not None:
+                on_page(new_rows)
+            if not next_url:
+                return main.ScrapeResult(all_rows, True)
+            if reason:
+                logger.info("Paginierung beendet nach Seite %d: %s", page, reason)
+                break
+            current_url = next_url
+            if self.page_delay:
+                await asyncio.sleep(self.page_delay)
+
+        return main.ScrapeResult(all_rows, False)
+
+    async def scrape_many(
+        self,
+        start_urls: Iterable[str],
+        max_pages: int = main.MAX_PAGES,
+        stop_conditions: Optional[List[StopCondition]] = None,
+    ) -> List[List[Offer]]:
+        """
+        Führt mehrere Suchen gleichzeitig aus (Reihenfolge wie start_urls).
+        Scheitert eine Suche unerwartet, liefert sie eine leere Liste; die
+        Ergebnisse der übrigen Suchen bleiben erhalten.
+        """
+        start_urls = list(start_urls)
+        results = await asyncio.gather(
+            *(self.scrape(url, max_pages, stop_conditions) for url in start_urls),
+            return_exceptions=True,
+        )
+        rows_per_search: List[List[Offer]] = []
+        for url, result in zip(start_urls, results):
+            if isinstance(result, Exception):
+                logger.error("Suche %s fehlgeschlagen: %r", url, result)
+                result = []
+            elif isinstance(result, BaseException):  # z.B. CancelledError
+                raise result
+            rows_per_search.append(result)
+        return rows_per_search
+
+
+def run_async_scrape(
+    searches: Iterable[Tuple[str, str]],
+    max_pages: int = main.MAX_PAGES,
+    **engine_kwargs,
+) -> Dict[Tuple[str, str], List[Offer]]:
+    """
+    Synchroner Einstieg: scrapt mehrere (query, preis)-Suchen gleichzeitig.
+
+    Returns:
+        Dict (query, preis) -> Angebotsliste.
+    """
+    searches = list(searches)
+    engine_kwargs.setdefault("archive", open_archive(main.ARCHIVE_DIR))
+
+    async def _run() -> List[List[Offer]]:
+        async with AsyncScrapeEngine(**engine_kwargs) as engine:
+            urls = [main.build_search_url(q, p) for q, p in searches]
+            return await engine.scrape_many(urls, max_pages=max_pages)
+
+    return dict(zip(searches, asyncio.run(_run())))
+
+
+def run_async_search(
+    query: str,
+    preis: str,
+    max_pages: int = main.MAX_PAGES,
+    checkpoint: Optional[Checkpoint] = None,
+    on_page: Optional[Callable[[List[Offer]], None]] = None,
+    **engine_kwargs,
+) -> main.ScrapeResult:
+    """
+    Synchroner Einstieg für eine Suche (siehe main.run_search).
+
+    Raises:
+        main.ScrapeInterrupted: Host gesperrt; ein Checkpoint bleibt offen.
+    """
+    engine_kwargs.setdefault("archive", open_archive(main.ARCHIVE_DIR))
+
+    async def _run() -> main.ScrapeResult:
+        async with AsyncScrapeEngine(**engine_kwargs) as engine:
+            return await engine.scrape_search(
+                main.build_search_url(query, preis),
+                max_pages,
+                checkpoint=checkpoint,
+                on_page=on_page,
+            )
+
+    return asyncio.run(_run())
+
+
+class _StreamClosed(Exception):
+    """Konsument von iter_async_search hat aufgehört zu lesen."""
+
+
+def iter_async_search(
+    query: str, preis: str, max_pages: int = main.MAX_PAGES, **engine_kwargs
+) -> Iterator[List[Offer]]:
+    """
+    Generator wie main.iter_scrape für die Async-Engine: liefert die neuen
+    Angebote jeder Seite, sobald sie geparst ist. Die Event-Loop läuft dafür
+    in einem eigenen Thread; wird der Generator vorzeitig geschlossen, endet
+    der Scrape nach der laufenden Seite.
+
+    Yields:
+        Liste mit Angeboten (Offer) pro Seite.
+
+    Returns:
+        True, wenn die Suche vollständig gescrapt wurde (StopIteration.value).
+
+    Raises:
+        main.ScrapeInterrupted: Host gesperrt oder Seite bleibt gesperrt/fehlerhaft.
+    """
+    pages: "queue.Queue[object]" = queue.Queue()
+    closed = threading.Event()
+
+    def on_page(rows: List[Offer]) -> None:
+        if closed.is_set():
+            raise _StreamClosed()
+        pages.put(rows)
+
+    def worker() -> None:
+        try:
+            pages.put(
+                run_async_search(
+                    query, preis, max_pages, on_page=on_page, **engine_kwargs
+                )
+            )
+        except _StreamClosed:
+            pass
+        except Exception as e:  # im Generator erneut auslösen
+            pages.put(e)
+
+    threading.Thread(target=worker, name="async-search", daemon=True).start()
+    try:
+        while True:
+            item = pages.get()
+            if isinstance(item, main.ScrapeResult):
+                return item.complete
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        closed.set()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Atomare Dateioperationen für Pricehunter
+----------------------------------------
+Mehrere Suchen können gleichzeitig laufen (mehrere Worker, Scheduler). Damit
+Leser (/suchresultat, /api/stats) nie eine halb geschriebene Datei sehen
+und Schreiber sich nicht gegenseitig überschreiben, ohne alle Suchen über eine
+globale Sperre zu serialisieren:
+
+- atomic_write: schreibt in eine temporäre Datei im selben Verzeichnis und
+  ersetzt das Ziel per os.replace. Wer die Datei bereits geöffnet hat, liest
+  weiter den alten, vollständigen Stand (gleiches Inode); neue Leser sehen den
+  neuen Stand.
+- publish_file: veröffentlicht eine fertige Datei unter einem festen Namen –
+  Hardlink bzw. Kopie + os.replace.
+- replace_symlink: setzt einen Zeiger (Symlink, z.B. outputs/current) atomar um;
+  so wird ein ganzes Verzeichnis mit zusammengehörigen Dateien auf einmal
+  veröffentlicht.
+- append_line: hängt eine Zeile mit einem einzigen write() und O_APPEND an
+  (Zeilen mehrerer Prozesse werden nicht vermischt).
+
+Beispiel:
+    with atomic_write(path, newline="") as f:
+        csv.writer(f).writerows(rows)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+PathLike = Union[str, Path]
+
+
+@contextlib.contextmanager
+def atomic_write(
+    path: PathLike,
+    mode: str = "w",
+    encoding: Optional[str] = "utf-8",
+    newline: Optional[str] = None,
+    durable: bool = False,
+) -> Iterator[IO]:
+    """
+    Öffnet eine temporäre Datei neben path; nach fehlerfreiem Block ersetzt sie
+    path atomar. Bei einer Exception bleibt path unverändert.
+
+    Args:
+        path: Zieldatei.
+        mode: 'w' (Text) oder 'wb' (Binär).
+        encoding: Encoding im Textmodus.
+        newline: Wie bei open() (für csv: '').
+        durable: True = vor dem Ersetzen fsync (übersteht auch einen Stromausfall).
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        binary = "b" in mode
+        with os.fdopen(
+            fd,
+            mode,
+            encoding=None if binary else encoding,
+            newline=None if binary else newline,
+        ) as f:
+            yield f
+            f.flush()
+            if durable:
+                os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)  # mkstemp legt 0600 an
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+@contextlib.contextmanager
+def _temp_name(dest: Path, suffix: str) -> Iterator[str]:
+    """
+    Eindeutiger, noch freier Name neben dest (für os.link/os.symlink, die nicht
+    auf eine bestehende Datei schreiben): mkstemp reserviert '<tmp>', benutzt
+    wird '<tmp>.new'. Beide werden danach entfernt, falls noch vorhanden.
+    """
+    fd, reserved = tempfile.mkstemp(
+        dir=dest.parent, prefix=f".{dest.name}.", suffix=suffix
+    )
+    os.close(fd)
+    tmp = reserved + ".new"
+    try:
+        yield tmp
+    finally:
+        for leftover in (tmp, reserved):
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(leftover)
+
+
+def publish_file(src: PathLike, dest: PathLike) -> None:
+    """
+    Veröffentlicht die fertige Datei src atomar unter dest (src bleibt bestehen).
+    Auf demselben Dateisystem per Hardlink (ohne Kopie), sonst per Kopie.
+    """
+    dest = Path(dest)
+    with _temp_name(dest, ".publish") as tmp:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+
+
+def replace_symlink(target: PathLike, link: PathLike) -> None:
+    """
+    Lässt link atomar auf target zeigen (neuer Symlink + os.replace). Leser, die
+    link auflösen, sehen entweder das alte oder das neue Ziel.
+
+    Args:
+        target: Ziel, wie es im Symlink steht (relativ zu link.parent oder absolut).
+        link: Zeiger, der ersetzt wird.
+    """
+    link = Path(link)
+    with _temp_name(link, ".link") as tmp:
+        os.symlink(target, tmp)
+        os.replace(tmp, link)
+
+
+def append_line(path: PathLike, line: str, encoding: str = "utf-8") -> None:
+    """
+    Hängt line (inkl. Zeilenende) mit einem einzigen write() an path an.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode(encoding))
+    finally:
+        os.close(fd)
+
+
+def create_with_content(path: PathLike, content: str, encoding: str = "utf-8") -> bool:
+    """
+    Legt path mit content an, falls die Datei fehlt (O_EXCL: nur ein Prozess gewinnt).
+
+    Returns:
+        True, wenn die Datei neu angelegt wurde.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    try:
+        os.write(fd, content.encode(encoding))
+    finally:
+        os.close(fd)
+    return True
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checkpoints für lange Scrape-Läufe
+----------------------------------
+scrape_all lieferte die Angebote erst am Ende; stürzte der WebDriver ab oder
+wurde der Worker neu gestartet, war der ganze Lauf verloren. CheckpointStore
+hält nach jeder Seite fest (SQLite, WAL, eine Transaktion pro Seite):
+
+- die geparsten Angebote der Seite
+- den Paginierungs-Cursor: Anzahl erledigter Seiten und URL der nächsten Seite
+  (keine = Lauf beendet) sowie ob die letzte Seite der Suche erreicht wurde
+
+Ein erneuter Lauf derselben Suche (gleicher scope + key) liefert die gespeicherten
+Seiten sofort und lädt ab der ersten nicht erledigten Seite weiter. Ein Fehler
+kostet so höchstens die gerade geladene Seite. Der Aufrufer verwirft den
+Checkpoint, sobald er das Ergebnis verarbeitet hat (discard); bricht ein Lauf ab
+(main.ScrapeInterrupted), bleibt der Checkpoint offen. Checkpoints älter als
+MAX_AGE gelten als veraltet und werden nicht fortgesetzt.
+
+Beispiel:
+    store = CheckpointStore()
+    checkpoint = store.checkpoint("scheduler", search_id)
+    result = main.scrape_search(driver, start_url, checkpoint=checkpoint)
+    ...  # Ergebnis verarbeiten
+    checkpoint.discard()
+
+CLI:
+    python checkpoint.py [--scope scheduler] [--clear]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Union
+
+from offers import Offer
+
+# ----------------------------- Konfiguration ----------------------------- #
+CHECKPOINT_DB_PATH = Path(__file__).resolve().parent / "checkpoints.db"
+MAX_AGE = 3600.0  # Sekunden seit der letzten Seite; älter = neu scrapen
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS scrape_cursors (
+    scope    TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    pages    INTEGER NOT NULL,  -- erledigte Seiten
+    next_url TEXT,              -- NULL = Lauf beendet
+    complete INTEGER NOT NULL,  -- 1 = letzte Seite der Suche erreicht
+    updated  REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE TABLE IF NOT EXISTS scrape_pages (
+    scope TEXT NOT NULL,
+    key   TEXT NOT NULL,
+    page  INTEGER NOT NULL,
+    rows  TEXT NOT NULL,        -- JSON: Liste von Offer-Feldlisten
+    PRIMARY KEY (scope, key, page)
+);
+"""
+
+
+class ScrapeState(NamedTuple):
+    """Gespeicherter Stand einer Suche."""
+
+    scope: str
+    key: str
+    pages: List[List[Offer]]  # Angebote pro erledigter Seite (Seite 1 zuerst)
+    next_url: Optional[str]  # None = Lauf beendet
+    complete: bool  # letzte Seite erreicht (nicht nur max_pages/Abbruchkriterium)
+    updated: float
+
+    @property
+    def done(self) -> bool:
+        return self.next_url is None
+
+    @property
+    def rows(self) -> List[Offer]:
+        return [offer for page in self.pages for offer in page]
+
+
+class PendingCheckpoint(NamedTuple):
+    """Übersicht eines Checkpoints (ohne Angebote), z.B. für die CLI."""
+
+    scope: str
+    key: str
+    pages: int
+    done: bool
+    updated: float
+
+
+class CheckpointStore:
+    """Checkpoints aller Suchen (SQLite, von allen Prozessen geteilt)."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = CHECKPOINT_DB_PATH,
+        max_age: float = MAX_AGE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = str(path)
+        self.max_age = max_age
+        self.clock = clock
+        self._local = threading.local()
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:  # eine Verbindung pro Thread, Transaktionen explizit
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def checkpoint(self, scope: str, key: str) -> "Checkpoint":
+        """Checkpoint einer Suche (z.B. key = main.make_search_id(query, preis))."""
+        return Checkpoint(self, scope, key)
+
+    def load(self, scope: str, key: str) -> Optional[ScrapeState]:
+        """
+        Gespeicherter Stand oder None (kein Checkpoint bzw. veraltet – ein
+        veralteter Checkpoint wird dabei gelöscht).
+        """
+        conn = self._conn
+        row = conn.execute(
+            "SELECT pages, next_url, complete, updated FROM scrape_cursors "
+            "WHERE scope = ? AND key = ?",
+            (scope, key),
+        ).fetchone()
+        if row is None:
+            return None
+        pages, next_url, complete, updated = row
+        if updated < self.clock() - self.max_age:
+            self.discard(scope, key)
+            return None
+        stored = conn.execute(
+            "SELECT rows FROM scrape_pages WHERE scope = ? AND key = ? AND page <= ? "
+            "ORDER BY page",
+            (scope, key, pages),
+        ).fetchall()
+        return ScrapeState(
+            scope,
+            key,
+            [
+                [Offer.create(*values) for values in json.loads(rows)]
+                for (rows,) in stored
+            ],
+            next_url,
+            bool(complete),
+            updated,
+        )
+
+    def save_page(
+        self,
+        scope: str,
+        key: str,
+        page: int,
+        rows: List[Offer],
+        next_url: Optional[str],
+        complete: bool = False,
+    ) -> None:
+        """
+        Hält eine erledigte Seite fest (Angebote + Cursor in einer Transaktion).
+
+        Args:
+            page: Seitennummer ab 1; Seite 1 beginnt einen neuen Checkpoint.
+            rows: Neue Angebote der Seite.
+            next_url: Absolute URL der nächsten Seite; None = Lauf beendet.
+            complete: Letzte Seite der Suche erreicht (keine weitere Seite).
+        """
+        blob = json.dumps([list(offer) for offer in rows], ensure_ascii=False)
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if page == 1:  # alter Stand derselben Suche (neuer Lauf)
+                conn.execute(
+                    "DELETE FROM scrape_pages WHERE scope = ? AND key = ?", (scope, key)
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_pages VALUES (?, ?, ?, ?)",
+                (scope, key, page, blob),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_cursors VALUES (?, ?, ?, ?, ?, ?)",
+                (scope, key, page, next_url, complete, self.clock()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def discard(self, scope: str, key: str) -> None:
+        """Verwirft den Checkpoint einer Suche (Ergebnis ist verarbeitet)."""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in ("scrape_cursors", "scrape_pages"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE scope = ? AND key = ?", (scope, key)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def pending(self, scope: Optional[str] = None) -> List[PendingCheckpoint]:
+        """Vorhandene Checkpoints (optional nur eines scope), neueste zuerst."""
+        rows = self._conn.execute(
+            "SELECT scope, key, pages, next_url IS NULL, updated FROM scrape_cursors "
+            "WHERE ? IS NULL OR scope = ? ORDER BY updated DESC",
+            (scope, scope),
+        ).fetchall()
+        return [
+            PendingCheckpoint(s, key, pages, bool(done), updated)
+            for s, key, pages, done, updated in rows
+        ]
+
+    def clear(self, scope: Optional[str] = None) -> int:
+        """Verwirft alle Checkpoints (optional nur eines scope)."""
+        entries = self.pending(scope)
+        for entry in entries:
+            self.discard(entry.scope, entry.key)
+        return len(entries)
+
+
+class Checkpoint:
+    """Checkpoint einer Suche (an scope + key gebunden), für main.iter_scrape."""
+
+    def __init__(self, store: CheckpointStore, scope: str, key: str) -> None:
+        self.store = store
+        self.scope = scope
+        self.key = key
+
+    def load(self) -> Optional[ScrapeState]:
+        return self.store.load(self.scope, self.key)
+
+    def save(
+        self,
+        page: int,
+        rows: List[Offer],
+        next_url: Optional[str],
+        complete: bool = False,
+    ) -> None:
+        self.store.save_page(self.scope, self.key, page, rows, next_url, complete)
+
+    def discard(self) -> None:
+        self.store.discard(self.scope, self.key)
+
+
+# ----------------------------- CLI ----------------------------- #
+def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pricehunter Scrape-Checkpoints")
+    parser.add_argument("--db", type=Path, default=CHECKPOINT_DB_PATH)
+    parser.add_argument("--scope", default=None, help="Nur Checkpoints dieses Laufs")
+    parser.add_argument(
+        "--clear", action="store_true", help="Checkpoints verwerfen statt anzeigen"
+    )
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_cli_args(argv)
+    store = CheckpointStore(args.db)
+    if args.clear:
+        print(f"{store.clear(args.scope)} Checkpoints verworfen.")
+        return 0
+    for entry in store.pending(args.scope):
+        state = "beendet" if entry.done else "offen"
+        updated = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.updated))
+        print(f"{entry.scope}\t{entry.key}\t{entry.pages} Seiten\t{state}\t{updated}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
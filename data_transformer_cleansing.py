@@ -34,26 +34,54 @@ Umfang der Transformation:
     * Aus der *ersten* URL-Spalte (link) den Query-Parameter 'skw' oder '_skw'
       extrahieren (alles vor 'skw=' sowie alles nach dem nächsten '&' wird
       entfernt). URL-decodiert. Erster Buchstabe wird groß gemacht.
+- cluster_id:
+    * Beinahe doppelte Angebote (ähnlicher Titel, ähnlicher Preis, z.B. Varianten
+      mit anderer Artikelnummer) erhalten dieselbe ID (near_duplicates, MinHash/LSH).
 
 
 Das Skript ist bewusst robust gegenüber leicht unterschiedlichen Spaltennamen
 (z.B. 'Preis'/'price', 'Versand'/'Versandkosten', usw.).
-Zudem wird bei fehlenden Pflichtfeldern (price, product_name) ein harter Abbruch mit
-Fehlermeldung durchgeführt.
+Fehlt eine Pflichtspalte (Preis, URL), wird ein TransformError ausgelöst. Einzelne
+Zeilen mit fehlenden Pflichtwerten (price, product_name) werden nicht mehr mit
+Prozessabbruch quittiert, sondern in Quarantäne verschoben (TransformResult.quarantine).
+
+Verwendung:
+- In-Process (reentrant, threadsicher): transform_frame(df) oder transform(input, output).
+- Kennzahlen (Quantile, Häufigkeiten, günstigste Angebote) stehen in
+  TransformResult.stats und werden von transform() als <output>.stats.json gespeichert.
+- Kommandozeile: python data_transformer_cleansing.py [-i INPUT] [-o OUTPUT]
 """
 
 from __future__ import annotations
 
 from pathlib import Path
+from typing import NamedTuple
 from urllib.parse import urlsplit, parse_qs, unquote
-import re
+import json
+import logging
 import sys
 import pandas as pd
 import argparse
 
+from normalization import (  # noqa: F401 (Re-Export für bestehende Importe)
+    CURRENCY_MAP,
+    extract_currency,
+    fix_grossbritannien,
+    normalize_origin,
+    parse_number_eu,
+)
+from atomic_files import atomic_write
+from near_duplicates import cluster_ids
+from offers import CLEAN_FIELD_MAP, RAW_FIELDS, Offer
+
+
+logger = logging.getLogger("pricehunter.transformer")
+
 
 # Parser-Funktion
-def parse_cli_args(script_dir: Path) -> tuple[Path, Path]:
+def parse_cli_args(
+    script_dir: Path, argv: list[str] | None = None
+) -> tuple[Path, Path]:
     """
     CLI-Argumente parsen und Defaultpfade setzen:
     - Default-Input:  <script_dir>/output_scraper.csv
@@ -74,7 +102,7 @@ def parse_cli_args(script_dir: Path) -> tuple[Path, Path]:
         type=Path,
         help="Pfad zur Ausgabedatei (CSV). Wenn leer, wird <script_dir>/output_clean.csv verwendet.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # CSV-Dateien liegen jetzt im gleichen Ordner wie dieses Skript
     project_root = script_dir
@@ -84,11 +112,47 @@ def parse_cli_args(script_dir: Path) -> tuple[Path, Path]:
     return input_path, output_path
 
 
-# Hilfefunktion zum harten Abbrechen bei fehlenden Pflichtfeldern
+# ----------------------------- Ergebnis- und Fehlertypen ----------------------------- #
+
+
+class TransformError(ValueError):
+    """Strukturelles Problem der Eingabe (z.B. Pflichtspalte fehlt) – nichts bereinigbar."""
+
+
+class ValidationIssue(NamedTuple):
+    """Ein Befund zu einer Eingabezeile (row = Zeilenindex der Eingabe)."""
+
+    row: int
+    field: str
+    message: str
+
+
+class TransformResult(NamedTuple):
+    """
+    Ergebnis eines Transformationslaufs.
+
+    data: bereinigte Zeilen (Spalten wie output_clean.csv).
+    quarantine: verworfene Eingabezeilen (Originalspalten + 'quarantine_reason').
+    issues: Befunde pro verworfener Zeile.
+    duplicates_removed: Anzahl entfernter Duplikate.
+    stats: vorberechnete Kennzahlen der bereinigten Daten (siehe compute_stats).
+    """
+
+    data: pd.DataFrame
+    quarantine: pd.DataFrame
+    issues: list[ValidationIssue]
+    duplicates_removed: int = 0
+    stats: dict | None = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+# Hilfefunktion für fehlende Pflichtspalten
 def require(condition: bool, message: str) -> None:
     if not condition:
-        print(f"❌ {message}", file=sys.stderr)
-        sys.exit(1)
+        raise TransformError(message)
 
 
 # ----------------------------- Definition Funktionen ----------------------------- #
@@ -110,119 +174,43 @@ def find_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
     return None
 
 
-CURRENCY_MAP = {
-    "€": "EUR",
-    "eur": "EUR",
-    "euro": "EUR",
-    "chf": "CHF",
-    "sfr": "CHF",
-    "fr.": "CHF",
-    "fr": "CHF",
-    "$": "USD",
-    "usd": "USD",
-    "£": "GBP",
-    "gbp": "GBP",
-}
-
+# Produktname aus URL extrahieren
+URL_PATTERN = r"https?://"
+URL_SAMPLE_SIZE = 64  # Stichprobengrösse pro Spalte für die URL-Erkennung
 
-# Währung aus Text extrahieren
-def extract_currency(text: str | float | int | None) -> str | None:
-    """
-    Versucht, eine Währung aus dem gegebenen Text zu erkennen.
-    Gibt ISO-ähnliche Kürzel (EUR/CHF/USD/GBP) zurück oder None.
-    """
-    if text is None:
-        return None
-    s = str(text).lower()
-    for key, code in CURRENCY_MAP.items():
-        if key in s:
-            return code
-    return None
 
+def _sample(series: pd.Series, sample_size: int) -> pd.Series:
+    """Gleichmässig verteilte Stichprobe (max. ~sample_size Werte) einer Spalte."""
+    step = max(1, len(series) // sample_size)
+    return series.iloc[::step]
 
-# Preise normalisieren
-def parse_number_eu(text: str | float | int | None) -> float | None:
-    """
-    Parst europäische/„gemischte“ Zahlendarstellungen in float.
-    Beispiele:
-        "3.040,06" -> 3040.06
-        "1,234"    -> 1.234  (interpretiert Komma als Dezimalzeichen, wenn
-                               plausible Stellenanzahl)
-        "1.234"    -> 1234.0 (Punkt als Tausender)
-        "+ 12,00 EUR Versand" -> 12.0
-    Gibt None zurück, wenn es nicht parsebar ist.
-    """
-    if text is None:
-        return None
-    s = str(text).strip()
-    if not s:
-        return None
 
-    # Störwörter/Zeichen entfernen (ohne Ziffern/.,,)
-    s = re.sub(
-        r"(versand|inkl\.?|exkl\.?|inklusive|zzgl\.?|\+)", " ", s, flags=re.IGNORECASE
+def _contains_url(series: pd.Series) -> bool:
+    return bool(
+        series.astype(str).str.contains(URL_PATTERN, regex=True, na=False).any()
     )
-    s = re.sub(r"[^0-9\.,\s]", "", s)  # nur Ziffern, Punkt, Komma, Space
 
-    s = s.strip()
-    if not s:
-        return None
 
-    # Heuristik: wenn beides vorkommt, '.' als Tausender, ',' als Dezimal
-    if "." in s and "," in s:
-        s = s.replace(".", "").replace(",", ".")
-    elif (
-        "," in s
-    ):  # Hinweis (Uni-Test): neue Variante zur Korrektur der Dezimalerkennung (z. B. '12,5')
-        # Prüfe, ob das letzte Segment Dezimalstellen sein könnten
-        parts = s.split(",")
-        if len(parts[-1]) <= 3:  # Hinweis (Uni-Test): statt (2,3)
-            s = "".join(parts[:-1]).replace(".", "") + "." + parts[-1]
-        else:
-            # eher Tausendertrennzeichen
-            s = s.replace(",", "")
-    else:
-        # nur Punkte -> so belassen (kann Dezimalpunkt oder Integer sein)
-        pass
-
-    s = s.replace(" ", "")
-    try:
-        return float(s)
-    except ValueError:
-        return None
-
-
-# Korrigiert fehlerhafte Darstellung von 'Grossbritannien'
-def fix_grossbritannien(value: str | None) -> str | None:
-    """
-    Korrigiert fehlerhafte Encodings von 'Großbritannien' auf 'Grossbritannien'.
-    Wir ändern *nur* bekannte defekte Varianten.
-    """
-    if value is None:
-        return None
-    s = str(value).strip()
-    bad = {
-        "GroÃŸbritannien",
-        "GroÃbritannien",
-        "GroÃ£Âbritannien",
-        "GroÃYbritannien",  # Hinweis (Uni-Test): neue Variante
-        "Großbritannien",
-    }
-    if s in bad:
-        return "Grossbritannien"
-    return s
-
-
-# Produktname aus URL extrahieren
-def find_first_url_column(df: pd.DataFrame) -> str | None:
+def find_first_url_column(
+    df: pd.DataFrame, sample_size: int = URL_SAMPLE_SIZE
+) -> str | None:
     """
     Sucht die erste Spalte, die wie eine URL-Spalte aussieht (enthält 'http').
+
+    Geprüft wird zuerst nur eine Stichprobe pro Text-Spalte (numerische Spalten
+    werden übersprungen); erst wenn keine Stichprobe trifft, werden die Spalten
+    vollständig durchsucht. In beiden Durchgängen gilt die Spaltenreihenfolge:
+    enthalten z.B. 'link' und 'image' URLs, gewinnt die vordere Spalte.
     """
-    for col in df.columns:
-        series = df[col].astype(str)
-        if series.str.contains(r"https?://", regex=True, na=False).any():
-            return col
-    return None
+    text_cols = [
+        c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c].dtype)
+    ]
+    found = next(
+        (c for c in text_cols if _contains_url(_sample(df[c], sample_size))), None
+    )
+    if found is None:
+        found = next((c for c in text_cols if _contains_url(df[c])), None)
+    return found
 
 
 def extract_skw_from_url(url: str | None) -> str | None:
@@ -248,19 +236,78 @@ def extract_skw_from_url(url: str | None) -> str | None:
         return None
 
 
+def _decode_skw(raw: str) -> str | None:
+    """Decodiert einen rohen skw-Wert wie parse_qs + unquote in extract_skw_from_url."""
+    text = unquote(unquote(raw.replace("+", " "))).strip()
+    if not text:
+        return None
+    return text[:1].upper() + text[1:]
+
+
+def extract_skw_series(urls: pd.Series) -> pd.Series:
+    """
+    Vektorisierte Variante von extract_skw_from_url für eine ganze URL-Spalte.
+    Der Query-String wird per str.extract gelesen; decodiert wird nur einmal pro
+    *unterschiedlichem* Rohwert (alle Zeilen einer Suche teilen denselben '_skw').
+    Zeilen ohne Parameter erhalten NaN.
+    """
+    query = urls.astype(str).str.extract(r"^[^?#]*\?([^#]*)", expand=False)
+    raw = query.str.extract(r"(?:^|&)skw=([^&]+)", expand=False)
+    raw = raw.fillna(query.str.extract(r"(?:^|&)_skw=([^&]+)", expand=False))
+    decoded = {value: _decode_skw(value) for value in raw.dropna().unique()}
+    return raw.map(decoded).astype(object)
+
+
+# ----------------------------- Offer-Konvertierung ---------------------------------- #
+
+
+def frame_from_offers(offers: list[Offer]) -> pd.DataFrame:
+    """
+    Baut aus einer Offer-Liste (Scraper-Rohdaten) einen DataFrame mit den
+    Spalten der Rohdaten-CSV, ohne Umweg über Dicts.
+    """
+    return pd.DataFrame.from_records(
+        [o.raw_values() for o in offers], columns=list(RAW_FIELDS)
+    )
+
+
+def offers_from_frame(df: pd.DataFrame) -> list[Offer]:
+    """
+    Wandelt einen bereinigten DataFrame (Spalten wie output_clean.csv) in Offer-Objekte.
+    Fehlende Spalten werden als leere Strings übernommen.
+    """
+    cols = {
+        field: (
+            df[col].fillna("").astype(str)
+            if col in df.columns
+            else pd.Series("", index=df.index)
+        )
+        for field, col in CLEAN_FIELD_MAP.items()
+    }
+    return [Offer.create(*values) for values in zip(*(cols[f] for f in Offer._fields))]
+
+
 # ----------------------------- Hauptlogik Transformation ---------------------------------- #
 
 
-def transform(input_path: Path, output_path: Path) -> None:
+def read_input_csv(input_path: Path) -> pd.DataFrame:
     """
-    Führt sämtliche Transformationen aus und schreibt die bereinigte CSV.
+    Lädt die Rohdaten-CSV – robust gegen Encoding-Probleme.
     """
-    # 1) CSV laden – robust gegen Encoding-Probleme
     try:
-        df = pd.read_csv(input_path)
+        return pd.read_csv(input_path)
     except UnicodeDecodeError:
-        df = pd.read_csv(input_path, encoding="latin-1")
+        return pd.read_csv(input_path, encoding="latin-1")
 
+
+def transform_frame(df: pd.DataFrame) -> TransformResult:
+    """
+    Führt sämtliche Transformationen in-memory aus (ohne Datei-I/O, ohne globalen
+    Zustand) und liefert bereinigte Daten, Quarantäne und Befunde.
+
+    Raises:
+        TransformError: wenn Preis- oder URL-Spalte vollständig fehlen.
+    """
     out = df.copy()
     out.rename(columns=lambda c: str(c).strip(), inplace=True)
 
@@ -300,17 +347,38 @@ def transform(input_path: Path, output_path: Path) -> None:
         "Pflichtfeld fehlt: Keine URL-Spalte gefunden (für product_name via 'skw' oder '_skw').",
     )
 
-    # 2b-3) product_name für jede Zeile extrahieren können
-    prod_name_series_required = out[url_col_required].map(extract_skw_from_url)
-    pn_clean = prod_name_series_required.fillna("").str.strip()
-    missing_pn = pn_clean == ""
-    require(
-        missing_pn.sum() == 0,
-        f"Pflichtfeld 'product_name' fehlt in {missing_pn.sum()} Zeilen (Parameter 'skw' oder '_skw' nicht vorhanden).",
-    )
+    # 2b-3) product_name und Preis pro Zeile prüfen -> ungültige Zeilen in Quarantäne
+    product_name = extract_skw_series(out[url_col_required])
+    missing_pn = product_name.fillna("").str.strip() == ""
+    price_text = out[col_price].astype(str)
+    price_num = price_text.map(parse_number_eu)
+    missing_price = pd.Series(price_num).isna()
 
-    # Merken, damit wir es unten wiederverwenden und nicht doppelt berechnen
-    _precomputed_product_name = prod_name_series_required
+    issues: list[ValidationIssue] = []
+    reasons: dict[int, list[str]] = {}
+    checks = [
+        (
+            missing_pn,
+            "product_name",
+            "Pflichtfeld 'product_name' fehlt (Parameter 'skw' oder '_skw' nicht vorhanden).",
+        ),
+        (missing_price, "price", "Pflichtfeld 'price' ist nicht parsebar."),
+    ]
+    for mask, field, message in checks:
+        for row in out.index[mask.to_numpy()]:
+            issues.append(ValidationIssue(int(row), field, message))
+            reasons.setdefault(int(row), []).append(field)
+    bad_rows = missing_pn | missing_price
+    quarantine = df.loc[bad_rows.to_numpy()].copy()
+    quarantine["quarantine_reason"] = [
+        "; ".join(reasons[int(row)]) for row in quarantine.index
+    ]
+    if bad_rows.any():
+        keep = ~bad_rows
+        out = out.loc[keep]
+        product_name = product_name.loc[keep]
+        price_text = price_text.loc[keep]
+        price_num = price_num.loc[keep]
 
     # 3) title
     if col_title:
@@ -334,33 +402,18 @@ def transform(input_path: Path, output_path: Path) -> None:
     if col_country:
         origin = out[col_country].astype(str)
         origin = origin.replace(["nan", "NaN", "None"], "", regex=False)
-        origin = origin.str.replace(r"^\s*aus\s+", "", flags=re.IGNORECASE, regex=True)
-        origin = origin.map(fix_grossbritannien)
-        origin = origin.str.strip()
+        origin = origin.map(normalize_origin)  # 'aus ' entfernen, GB-Korrektur, trimmen
         out["product_origin"] = origin
         out.drop(columns=[col_country], inplace=True)
     else:
         # Falls keine Länderspalte vorhanden ist, legen wir sie leer an.
         out["product_origin"] = ""
 
-    # 6) Preis -> price + currency
-    # (Spalte existiert garantiert wegen Pflichtfeld-Check oben)
-    price_text = out[col_price].astype(str)
-    price_num = price_text.map(parse_number_eu)
-    curr_series = price_text.map(extract_currency)
-
-    # Pflicht: Alle Preise müssen parsebar sein
-    missing_price = pd.Series(price_num).isna()
-    require(
-        missing_price.sum() == 0,
-        f"Pflichtfeld 'price' ist in {missing_price.sum()} Zeilen nicht parsebar.",
-    )
-
-    # price numerisch (du wolltest 0.0 reichen lassen, aber da jetzt Pflicht: keine Füllung nötig)
+    # 6) Preis -> price + currency (Preise oben bereits geparst und geprüft)
     out["price"] = pd.Series(price_num, dtype="float64")
 
     # currency
-    out["currency"] = curr_series
+    out["currency"] = price_text.map(extract_currency)
 
     out.drop(columns=[col_price], inplace=True)
 
@@ -390,7 +443,7 @@ def transform(input_path: Path, output_path: Path) -> None:
     out["currency"] = out["currency"].fillna("keine Angabe")
 
     # 9) product_name: aus erster URL-Spalte skw/_skw (bereits geprüft & berechnet)
-    out["product_name"] = _precomputed_product_name
+    out["product_name"] = product_name
 
     # 10a) Spaltenreihenfolge harmonisieren (falls vorhanden)
     desired_order = [
@@ -422,28 +475,203 @@ def transform(input_path: Path, output_path: Path) -> None:
     # - wenn keine 'link'-Spalte existiert, nimm die erste erkannte URL-Spalte (sollte passen, so lange Bild URL nach Haupt URL kommt)
     dedupe_keys = ["title", "price"]
 
-    link_col = "link" if "link" in out.columns else find_first_url_column(out)
+    link_col = (
+        "link"
+        if "link" in out.columns
+        else rename_map.get(url_col_required, url_col_required)
+    )
+    if link_col not in out.columns:
+        link_col = find_first_url_column(out)
     if link_col and link_col not in dedupe_keys:
         dedupe_keys.append(link_col)
 
     before = len(out)
     out = out.drop_duplicates(subset=dedupe_keys, keep="first").reset_index(drop=True)
     removed = before - len(out)
-    print(
-        f"ℹ️  Duplikate entfernt: {removed} (Schlüssel: {dedupe_keys})", file=sys.stderr
+    logger.info("Duplikate entfernt: %d (Schlüssel: %s)", removed, dedupe_keys)
+
+    # 10d) Beinahe-Duplikate gruppieren (Varianten/Wiedereinstellungen)
+    if "title" in out.columns and len(out):
+        out["cluster_id"] = cluster_ids(out["title"].astype(str).tolist(), out["price"])
+        logger.info(
+            "Varianten-Cluster: %d für %d Angebote",
+            out["cluster_id"].nunique(),
+            len(out),
+        )
+
+    return TransformResult(out, quarantine, issues, removed, compute_stats(out))
+
+
+# ----------------------------- Kennzahlen ----------------------------- #
+STATS_CHEAPEST_N = 5
+# Kennzahl -> Quantil für price und price_with_shipping
+STATS_QUANTILES = {
+    "min": 0.0,
+    "p25": 0.25,
+    "median": 0.5,
+    "p75": 0.75,
+    "p90": 0.9,
+    "max": 1.0,
+}
+STATS_COUNT_COLUMNS = {
+    "currency": "currency",
+    "origin": "product_origin",
+    "condition": "product_condition",
+}
+STATS_CHEAPEST_COLUMNS = [
+    "title",
+    "price",
+    "price_with_shipping",
+    "currency",
+    "product_origin",
+    "link",
+]
+
+
+def _json_number(value) -> float | None:
+    return None if pd.isna(value) else round(float(value), 2)
+
+
+def compute_stats(df: pd.DataFrame, cheapest_n: int = STATS_CHEAPEST_N) -> dict:
+    """
+    Vektorisierte Kennzahlen einer bereinigten Suche (JSON-serialisierbar):
+    Häufigkeiten pro Währung/Herkunft/Zustand, Anzahl Varianten-Cluster,
+    Quantile von price und price_with_shipping sowie die cheapest_n
+    günstigsten Angebote.
+
+    Args:
+        df: Bereinigte Daten (Spalten wie output_clean.csv).
+        cheapest_n: Anzahl günstigster Angebote.
+    """
+    stats: dict = {"rows": int(len(df)), "counts": {}, "cheapest": []}
+    if "cluster_id" in df.columns:
+        stats["clusters"] = int(df["cluster_id"].nunique())
+
+    for key, col in STATS_COUNT_COLUMNS.items():
+        if col in df.columns:
+            counts = df[col].fillna("keine Angabe").astype(str).value_counts()
+            stats["counts"][key] = {k: int(v) for k, v in counts.items()}
+
+    for col in ("price", "price_with_shipping"):
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").dropna()
+        quantiles = (
+            values.quantile(list(STATS_QUANTILES.values())) if len(values) else None
+        )
+        stats[col] = {"count": int(len(values)), "mean": _json_number(values.mean())}
+        for name, q in STATS_QUANTILES.items():
+            stats[col][name] = (
+                None if quantiles is None else _json_number(quantiles.loc[q])
+            )
+
+    sort_col = "price_with_shipping" if "price_with_shipping" in df.columns else "price"
+    if sort_col in df.columns and cheapest_n > 0:
+        cols = [c for c in STATS_CHEAPEST_COLUMNS if c in df.columns]
+        cheapest = df.assign(_sort=pd.to_numeric(df[sort_col], errors="coerce"))
+        cheapest = cheapest.nsmallest(cheapest_n, "_sort")[cols]
+        stats["cheapest"] = [
+            {
+                col: (
+                    _json_number(val)
+                    if col.startswith("price")
+                    else ("" if pd.isna(val) else str(val))
+                )
+                for col, val in row.items()
+            }
+            for row in cheapest.to_dict("records")
+        ]
+    return stats
+
+
+def default_stats_path(output_path: Path) -> Path:
+    """<output>.stats.json neben der bereinigten Datei."""
+    return output_path.with_name(f"{output_path.stem}.stats.json")
+
+
+def transform(
+    input_path: Path, output_path: Path, quarantine_path: Path | None = None
+) -> TransformResult:
+    """
+    Liest die Rohdaten-CSV, bereinigt sie und schreibt die bereinigte CSV.
+    Explizite Ein-/Ausgabepfade, kein globaler Zustand -> parallel aufrufbar
+    (Threads oder Prozesse), solange die Ausgabepfade verschieden sind.
+
+    Args:
+        input_path: Rohdaten-CSV (z.B. output_scraper.csv).
+        output_path: Ziel für die bereinigte CSV.
+        quarantine_path: Optionales Ziel für verworfene Zeilen (nur geschrieben, wenn vorhanden).
+
+    Returns:
+        TransformResult mit Daten, Quarantäne und Befunden.
+    """
+    result = transform_frame(read_input_csv(input_path))
+
+    # 11) Schreiben (atomar: Leser sehen den alten oder den neuen Stand, nie einen halben)
+    with atomic_write(output_path, newline="") as f:
+        result.data.to_csv(f, index=False)
+    with atomic_write(default_stats_path(output_path)) as f:
+        json.dump(result.stats, f, ensure_ascii=False, indent=2)
+    if quarantine_path is not None and len(result.quarantine):
+        with atomic_write(quarantine_path, newline="") as f:
+            result.quarantine.to_csv(f, index=False)
+    logger.info(
+        "Bereinigt: %s (%d Zeilen, %d in Quarantäne)",
+        output_path,
+        len(result.data),
+        len(result.quarantine),
     )
+    return result
+
+
+def default_quarantine_path(output_path: Path) -> Path:
+    """<output>_quarantine.csv neben der bereinigten Datei."""
+    return output_path.with_name(f"{output_path.stem}_quarantine{output_path.suffix}")
 
-    # 11) Schreiben
-    out.to_csv(output_path, index=False)
-    print(f"✅ Fertig: {output_path}")
 
+def cleanup(
+    input_path: Path | None = None, output_path: Path | None = None
+) -> TransformResult:
+    """
+    Bereinigt output_scraper.csv -> output_clean.csv (Defaultpfade im Skriptordner).
+    Liest bewusst keine Kommandozeilenargumente (sicher im Flask-Prozess).
 
-def cleanup():
+    Raises:
+        FileNotFoundError: wenn die Eingabedatei fehlt.
+        TransformError: wenn Pflichtspalten fehlen.
+    """
     script_dir = Path(__file__).resolve().parent
-    input_path, output_path = parse_cli_args(script_dir)
+    input_path = input_path or (script_dir / "output_scraper.csv")
+    output_path = output_path or (script_dir / "output_clean.csv")
 
     if not input_path.exists():
-        print(f"❌ Eingabedatei nicht gefunden: {input_path}", file=sys.stderr)
-        sys.exit(1)
+        raise FileNotFoundError(f"Eingabedatei nicht gefunden: {input_path}")
+
+    return transform(input_path, output_path, default_quarantine_path(output_path))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Kommandozeilen-Einstieg. Rückgabewert = Exit-Code (0 ok, 1 Fehler).
+    """
+    script_dir = Path(__file__).resolve().parent
+    input_path, output_path = parse_cli_args(script_dir, argv)
+    try:
+        result = cleanup(input_path, output_path)
+    except (FileNotFoundError, TransformError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    for issue in result.issues:
+        print(f"⚠️  Zeile {issue.row}: {issue.message}", file=sys.stderr)
+    print(
+        f"ℹ️  Duplikate entfernt: {result.duplicates_removed}, "
+        f"Quarantäne: {len(result.quarantine)}",
+        file=sys.stderr,
+    )
+    print(f"✅ Fertig: {output_path}")
+    return 0
+
 
-    transform(input_path, output_path)
+if __name__ == "__main__":
+    sys.exit(main())
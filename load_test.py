@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lasttest für Pricehunter (End-to-End über /submit)
+--------------------------------------------------
+Startet den eBay-Nachbau (mock_ebay.py) im eigenen Prozess und die Flask-App als
+Unterprozess, der per EBAY_BASE_URL auf den Nachbau zeigt. Danach schicken
+`concurrency` Clients zusammen `requests` Formular-POSTs an /submit – jeder
+Request scrapt, bereinigt und veröffentlicht wie im Betrieb.
+
+Die App läuft in einer Kopie des Projekts (nur *.py und templates) in einem
+temporären Verzeichnis: data.csv, output_*.csv und die SQLite-Dateien des
+Projekts bleiben unberührt.
+
+Bericht:
+- Durchsatz: Requests/s und vom Nachbau ausgelieferte Seiten/s
+- Latenz von /submit: p50, p90, p95, p99, Maximum
+- Fehler nach HTTP-Status bzw. Ausnahme
+- Ressourcen der App: CPU-Sekunden und -Auslastung während der Last, Spitzen-RSS
+  (Linux: /proc und wait4; sonst nur, was das System liefert)
+
+CLI:
+    python load_test.py [--requests 40] [--concurrency 8] [--engine http]
+                        [--rate 20] [--latency 0.2] [--captcha-rate 0.02] [--json PATH]
+
+--engine selenium nutzt Chrome (headless) statt des HTTP-Scrapers; CPU und RSS
+der Browser-Prozesse sind dann nicht vollständig erfasst.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+from mock_ebay import MockEbay, add_config_args, config_from_args, start_server
+
+logger = logging.getLogger("ebay_scraper.load_test")
+
+ROOT = Path(__file__).resolve().parent
+APP_STARTUP_TIMEOUT = 60.0  # Sekunden bis die App antwortet
+SUBMIT_TIMEOUT = 600.0  # Sekunden pro /submit (Scrape läuft im Request)
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LoadReport(NamedTuple):
+    """Ergebnis eines Lasttests."""
+
+    requests: int
+    ok: int
+    errors: Dict[str, int]
+    wall: float  # Sekunden vom ersten bis zum letzten Request
+    throughput: float  # erfolgreiche Requests pro Sekunde
+    pages_per_s: float  # vom Nachbau ausgelieferte Suchseiten pro Sekunde
+    latency: Dict[str, float]  # p50 … p99, max, mean (Sekunden)
+    app_cpu: Optional[float]  # CPU-Sekunden der App während der Last
+    app_cpu_util: Optional[float]  # app_cpu / wall (1.0 = ein Kern voll)
+    app_peak_rss_mb: Optional[float]
+    mock: Dict[str, int]  # Zähler des Nachbaus (pages, captcha, throttled, …)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """p-Perzentil (lineare Interpolation wie numpy.percentile); 0.0 ohne Werte."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    summary = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+    summary["max"] = max(values, default=0.0)
+    summary["mean"] = sum(values) / len(values) if values else 0.0
+    return {key: round(value, 4) for key, value in summary.items()}
+
+
+# ----------------------------- App-Prozess ----------------------------- #
+def prepare_app_dir(dest: Path) -> Path:
+    """Kopiert Code und Templates nach dest (Ausgaben landen dort, nicht im Projekt)."""
+    for path in ROOT.glob("*.py"):
+        shutil.copy2(path, dest / path.name)
+    shutil.copytree(ROOT / "templates", dest / "templates")
+    return dest
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(app_dir: Path, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """
+    Startet die Flask-App (threaded) und wartet, bis / antwortet.
+
+    Raises:
+        RuntimeError: App antwortet nicht innerhalb von APP_STARTUP_TIMEOUT.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "flask", "--app", "main", "run", "--port", str(port)],
+        cwd=app_dir,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + APP_STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"App beendet mit Status {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("App antwortet nicht.")
+
+
+def stop_app(proc: subprocess.Popen) -> Optional[float]:
+    """
+    Beendet die App (SIGINT wie Ctrl+C).
+
+    Returns:
+        Spitzen-RSS in MB (None, wenn das System es nicht liefert).
+    """
+    proc.send_signal(signal.SIGINT)
+    if not hasattr(os, "wait4"):
+        proc.wait(timeout=30)
+        return None
+    _, _, usage = os.wait4(proc.pid, 0)
+    proc.returncode = 0  # bereits eingesammelt
+    # ru_maxrss: Linux in KB, macOS in Bytes
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def process_cpu(pid: int) -> Optional[float]:
+    """CPU-Sekunden (user + system) eines laufenden Prozesses aus /proc (nur Linux)."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+# ----------------------------- Last ----------------------------- #
+def submit(port: int, produkt: str, preis: str) -> Tuple[str, float]:
+    """
+    Ein Formular-POST an /submit (ohne Weiterleitung zu folgen).
+
+    Returns:
+        (Ergebnis, Sekunden) – Ergebnis ist "ok" (302) oder der Fehler.
+    """
+    body = urlencode({"produkt": produkt, "preis": preis, "region": "CH"})
+    started = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=SUBMIT_TIMEOUT)
+        conn.request(
+            "POST",
+            "/submit",
+            body,
+            {"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        resp = conn.getresponse()
+        resp.read()
+        conn.close()
+        outcome = "ok" if resp.status == 302 else f"HTTP {resp.status}"
+    except OSError as e:
+        outcome = type(e).__name__
+    return outcome, time.perf_counter() - started
+
+
+def run_load_test(
+    mock: MockEbay,
+    requests: int = 40,
+    concurrency: int = 8,
+    queries: int = 10,
+    engine: str = "http",
+    rate: Optional[float] = None,
+) -> LoadReport:
+    """
+    Führt einen Lasttest aus (Nachbau, App, Clients) und räumt danach auf.
+
+    Args:
+        mock: Konfigurierter Nachbau (läuft für die Dauer des Tests).
+        requests: Anzahl /submit-Requests insgesamt.
+        concurrency: Gleichzeitige Clients.
+        queries: Anzahl verschiedener Suchbegriffe (wiederholt sich zyklisch).
+        engine: "http" (async_scraper) oder "selenium" (Chrome headless).
+        rate: Seitenaufrufe/s des RateGovernors der App (None = Standard).
+
+    Returns:
+        LoadReport.
+    """
+    server = start_server(mock)
+    env = {
+        "EBAY_BASE_URL": f"http://127.0.0.1:{server.server_address[1]}",
+        "SCRAPE_ENGINE": engine,
+        "SCRAPE_HEADLESS": "1",
+    }
+    if rate is not None:
+        env["SCRAPE_RATE"] = str(rate)
+    searches = [(f"loadtest produkt {i % queries}", "500") for i in range(requests)]
+    try:
+        with tempfile.TemporaryDirectory(prefix="pricehunter-load-") as tmp:
+            port = free_port()
+            proc = start_app(prepare_app_dir(Path(tmp)), port, env)
+            try:
+                cpu_before = process_cpu(proc.pid)
+                pages_before = mock.snapshot().get("pages", 0)
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    results = list(pool.map(lambda s: submit(port, *s), searches))
+                wall = time.perf_counter() - started
+                cpu_after = process_cpu(proc.pid)
+            finally:
+                peak_rss = stop_app(proc)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    stats = mock.snapshot()
+    latencies = [seconds for outcome, seconds in results if outcome == "ok"]
+    errors = Counter(outcome for outcome, _ in results if outcome != "ok")
+    app_cpu = None
+    if cpu_before is not None and cpu_after is not None:
+        app_cpu = round(cpu_after - cpu_before, 3)
+    return LoadReport(
+        requests=requests,
+        ok=len(latencies),
+        errors=dict(errors),
+        wall=round(wall, 3),
+        throughput=round(len(latencies) / wall, 3) if wall else 0.0,
+        pages_per_s=round((stats.get("pages", 0) - pages_before) / wall, 3),
+        latency=latency_summary(latencies),
+        app_cpu=app_cpu,
+        app_cpu_util=round(app_cpu / wall, 3) if app_cpu is not None else None,
+        app_peak_rss_mb=round(peak_rss, 1) if peak_rss is not None else None,
+        mock=stats,
+    )
+
+
+def format_report(report: LoadReport) -> str:
+    lat = report.latency
+    lines = [
+        f"Requests:    {report.ok}/{report.requests} ok in {report.wall:.1f} s"
+        + (f", Fehler: {report.errors}" if report.errors else ""),
+        f"Durchsatz:   {report.throughput:.2f} Requests/s, "
+        f"{report.pages_per_s:.2f} Seiten/s",
+        "Latenz:      "
+        + ", ".join(f"{key} {lat[key]:.2f} s" for key in ("p50", "p90", "p95", "p99"))
+        + f", max {lat['max']:.2f} s",
+    ]
+    if report.app_cpu is not None:
+        lines.append(
+            f"App-CPU:     {report.app_cpu:.1f} s ({report.app_cpu_util:.0%} eines Kerns)"
+        )
+    if report.app_peak_rss_mb is not None:
+        lines.append(f"App-RSS:     {report.app_peak_rss_mb:.0f} MB (Spitze)")
+    lines.append(f"Nachbau:     {report.mock}")
+    return "\n".join(lines)
+
+
+# ----------------------------- CLI ----------------------------- #
+def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pricehunter Lasttest (/submit)")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--engine", choices=("http", "selenium"), default="http")
+    parser.add_argument(
+        "--rate", type=float, default=None, help="SCRAPE_RATE der App (Seiten/s)"
+    )
+    parser.add_argument(
+        "--json", type=Path, default=None, help="Bericht zusätzlich als JSON"
+    )
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_cli_args(argv)
+    report = run_load_test(
+        MockEbay(config_from_args(args)),
+        requests=args.requests,
+        concurrency=args.concurrency,
+        queries=args.queries,
+        engine=args.engine,
+        rate=args.rate,
+    )
+    print(format_report(report))
+    if args.json is not None:
+        args.json.write_text(json.dumps(report._asdict(), indent=2), encoding="utf-8")
+    return 0 if report.ok == report.requests else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s"
+    )
+    sys.exit(main_cli())
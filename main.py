@@ -9,28 +9,64 @@ Flask-App + eBay-Scraper:
 """
 
 # ----------------------------- Standardbibliothek ----------------------------- #
+from __future__ import annotations
+
 import csv
+import hashlib
+import io
+import json
 import os
+import shutil
+import sqlite3
+import threading
 import time
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple
 import logging
 
 # ----------------------------- Drittanbieter ----------------------------- #
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    render_template,
+    request,
+    redirect,
+    stream_with_context,
+    url_for,
+    session,
+)
+from urllib.parse import quote_plus, urljoin
 
+# Schwere Abhängigkeiten (selenium, bs4, pandas über den Transformer) werden erst
+# beim Scrapen/Bereinigen importiert, damit Web-Worker und Test-Collection schnell starten.
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from selenium.webdriver.remote.webdriver import WebDriver
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.remote.webdriver import WebDriver
-from bs4 import BeautifulSoup
-from urllib.parse import quote_plus
+    from checkpoint import Checkpoint
 
 # ----------------------------- Lokale Module ----------------------------- #
-from data_transformer_cleansing import cleanup
+from atomic_files import atomic_write, create_with_content, replace_symlink
+from offers import Offer, RAW_FIELDS, as_offers
+from page_archive import PageArchive, open_archive
+from rate_governor import (
+    BLOCK_PAGE_SELECTOR,
+    PAGE_RETRIES,
+    RETRY_OUTCOMES,
+    CircuitOpenError,
+    RateGovernor,
+    classify_page,
+    get_governor,
+    is_block_title,
+)
+from stop_conditions import (
+    StopCondition,
+    default_stop_conditions,
+    first_stop_reason,
+    track_page,
+)
 
 # ----------------------------- Flake + Pfade ----------------------------- #
 app = Flask(__name__)
@@ -38,14 +74,39 @@ app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-change-me")
 
 BASE_DIR = Path(__file__).resolve().parent
 
-# Input-Log (optional)
+# Input-Log (optional); gepuffert geschrieben und abfragbar über search_log.py
 CSV_PATH = BASE_DIR / "data.csv"
 CSV_FIELDS = ["Produkt", "Preis", "Region", "Link"]
+SEARCH_DB_PATH = BASE_DIR / "search_log.db"
 
-# Output Daten (Scraper)
+# Output Daten (Scraper); Ausgangsstand, solange noch keine Suche veröffentlicht
+# wurde (danach gilt OUTPUT_DIR/current, siehe published_file)
 CSV_DATA_PATH = BASE_DIR / "output_scraper.csv"
 CLEANED_DATA_PATH = BASE_DIR / "output_clean.csv"
-CSV_DATA_FIELDS = ["titel", "aktualitaet", "preis", "land", "versand", "link", "image"]
+CLEANED_STATS_PATH = BASE_DIR / "output_clean.stats.json"  # von transform() erzeugt
+CSV_DATA_FIELDS = list(RAW_FIELDS)
+
+# Versionierte Ausgaben pro Suche: outputs/<search_id>/<version>/output_*.csv;
+# veröffentlicht wird ein ganzes Verzeichnis über den Zeiger outputs/current.
+OUTPUT_DIR = BASE_DIR / "outputs"
+OUTPUT_VERSIONS_KEPT = 3
+CURRENT_OUTPUT = "current"  # Symlink in OUTPUT_DIR -> <search_id>/<version>
+
+# Archiv aller geladenen Suchseiten (siehe page_archive.py)
+ARCHIVE_DIR = BASE_DIR / "archive"
+
+# Preisverlauf pro product_name (siehe price_history.py)
+HISTORY_DIR = BASE_DIR / "history"
+
+# Volltextindex über alle bereinigten Angebote (siehe offer_store.py)
+OFFER_DB_PATH = BASE_DIR / "offers.db"
+
+# Gemeinsamer Cache aller Worker-Prozesse (siehe shared_cache.py)
+CACHE_DB_PATH = BASE_DIR / "cache.db"
+SEARCH_CACHE_TTL = 600  # Sekunden; zusätzlich geleert, sobald neu indexiert wird
+
+# Vorab gescrapte, beliebte Suchen und Trefferstatistik (siehe prewarm.py)
+PREWARM_DB_PATH = BASE_DIR / "prewarm.db"
 
 # ----------------------------- Logging ----------------------------- #
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
@@ -53,6 +114,13 @@ logger = logging.getLogger("ebay_scraper")
 
 
 # ----------------------------- CSV Utilities ----------------------------- #
+def _csv_line(values) -> str:
+    """Eine CSV-Zeile (inkl. Zeilenende) wie csv.writer sie schreibt."""
+    buf = io.StringIO()
+    csv.writer(buf).writerow(values)
+    return buf.getvalue()
+
+
 def ensure_csv_with_header(path: Path, fields) -> None:
     """
     Erstellt eine CSV-Datei mit vorgegebenem Header, falls die Datei fehlt oder leer ist.
@@ -61,63 +129,116 @@ def ensure_csv_with_header(path: Path, fields) -> None:
         path: Pfad zur CSV-Datei.
         fields: Liste der Spaltenüberschriften.
     """
-    if not path.exists() or path.stat().st_size == 0:  # Datei fehlt/leer?
-        with path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fields)
-            writer.writeheader()
+    header = _csv_line(fields)
+    if create_with_content(path, header):  # O_EXCL: nur ein Prozess legt an
+        return
+    if path.stat().st_size == 0:  # Datei leer?
+        with atomic_write(path, newline="") as f:
+            f.write(header)
+
+
+def log_search(produkt: str, preis: str, region: str) -> None:
+    """
+    Protokolliert eine Sucheingabe über den gepufferten Such-Log (search_log.py):
+    kein Datei-Zugriff im Request, geschrieben wird gesammelt im Hintergrund.
+    """
+    from search_log import open_search_log
+
+    open_search_log(CSV_PATH, SEARCH_DB_PATH).record(produkt, preis, region)
+
+
+def published_output_dir() -> Optional[Path]:
+    """
+    Zuletzt veröffentlichtes Ausgabeverzeichnis (Ziel von OUTPUT_DIR/current)
+    oder None, solange noch keine Suche veröffentlicht wurde.
+    """
+    try:
+        return OUTPUT_DIR / os.readlink(OUTPUT_DIR / CURRENT_OUTPUT)
+    except OSError:
+        return None
 
 
-def append_row(produkt_url: str, preis: str, region: str) -> None:
+def published_file(path: Path, out_dir: Optional[Path] = None) -> Path:
     """
-    Hängt eine neue Eingabezeile (Form-Log) an data.csv an.
+    Pfad einer Ausgabedatei (CLEANED_DATA_PATH, CLEANED_STATS_PATH, …) im
+    veröffentlichten Stand. Wer mehrere Dateien derselben Suche braucht, löst
+    den Zeiger einmal auf (published_output_dir) und gibt out_dir mit.
 
     Args:
-        product_url: Ursprüngliche Produktsuche/URL aus dem Formular.
-        preis: Preis-Limit (frei eingeben).
+        path: Datei unter BASE_DIR (gilt, solange nichts veröffentlicht ist).
+        out_dir: Veröffentlichtes Verzeichnis (None = jetzt auflösen).
     """
-    ensure_csv_with_header(CSV_PATH, CSV_FIELDS)
-    with CSV_PATH.open("a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writerow(
-            {
-                "Produkt": (produkt_url or "").strip(),
-                "Preis": str(preis or "").strip(),
-                "Region": (
-                    region or ""
-                ).strip(),  # aktuell im Frontend keine Eingabe für Region möglich (Vorbereitung für mögliche Weiterentwicklung)
-                "Link": "",  # Link wird aufgrund von Suchbegriff {query} und {preis_max} zusammengesetzt
-            }
+    out_dir = published_output_dir() if out_dir is None else out_dir
+    return path if out_dir is None else out_dir / path.name
+
+
+def iter_rows_for_table(path: Optional[Path] = None) -> Iterator[Offer]:
+    """
+    Liest die bereinigte CSV zeilenweise (Generator) – für das gestreamte
+    Rendern der Resultatseite, ohne alle Zeilen gleichzeitig im Speicher.
+
+    Args:
+        path: Bereinigte CSV (Standard: veröffentlichte CLEANED_DATA_PATH).
+    """
+    path = published_file(CLEANED_DATA_PATH) if path is None else path
+    if not path.exists() or path.stat().st_size == 0:
+        return
+
+    with path.open("r", newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            yield Offer.from_clean_row(r)
+
+
+def load_rows_for_table() -> List[Offer]:
+    """
+    Liest die bereinigte CSV und liefert alle Zeilen (Offer) als Liste.
+    Das Ergebnis wird im gemeinsamen Cache abgelegt: solange output_clean.csv
+    unverändert ist, wird sie nur einmal pro Rechner geparst (nicht pro Worker).
+    /suchresultat streamt dagegen direkt aus der CSV (iter_rows_for_table).
+    """
+    from shared_cache import file_fingerprint
+
+    path = published_file(CLEANED_DATA_PATH)
+    try:
+        return get_shared_cache().get_or_build(
+            f"rows:{path}",
+            file_fingerprint(path),
+            lambda: list(iter_rows_for_table(path)),
         )
+    except sqlite3.Error as e:
+        logger.warning("Gemeinsamer Cache nicht verfügbar: %s", e)
+        return list(iter_rows_for_table(path))
 
 
-def load_rows_for_table():
-    """Liest die bereinigte CSV und liefert Zeilen fürs Template."""
-    if not CLEANED_DATA_PATH.exists() or CLEANED_DATA_PATH.stat().st_size == 0:
-        return []
+def load_stats(path: Optional[Path] = None) -> Optional[dict]:
+    """
+    Liest die vorberechneten Kennzahlen der bereinigten Daten (ohne Zeilen zu lesen).
 
-    rows = []
-    with CLEANED_DATA_PATH.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            rows.append(
-                {
-                    "produkt": (r.get("title") or "").strip(),
-                    "preis": (r.get("price") or "").strip(),
-                    "region": (r.get("product_origin") or "").strip(),
-                    "link": (r.get("link") or "").strip(),
-                    "image": (r.get("image") or "").strip(),
-                    "aktualitaet": (r.get("product_condition") or "").strip(),
-                    "versand": (r.get("shipping_cost") or "").strip(),
-                    "währung": (r.get("currency") or "").strip(),
-                }
-            )
-    return rows
+    Args:
+        path: Kennzahlen-Datei (Standard: veröffentlichte CLEANED_STATS_PATH).
+    """
+    path = published_file(CLEANED_STATS_PATH) if path is None else path
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
 
 # ----------------------------- Scraper-Konfiguration ----------------------------- #
-BASE_URL = "https://www.ebay.ch/sch/i.html?_nkw={}&_sacat=0&_from=R40&_trksid=m570.l1313&_udhi={}"  # mit Platzhaltern: {query} und {preis_max}
+# Umgebungsvariablen, z.B. für Lasttests gegen mock_ebay.py:
+#   EBAY_BASE_URL=http://127.0.0.1:8765  SCRAPE_ENGINE=http  SCRAPE_HEADLESS=1
+EBAY_BASE_URL = os.environ.get("EBAY_BASE_URL", "https://www.ebay.ch").rstrip("/")
+BASE_URL = (
+    EBAY_BASE_URL + "/sch/i.html?_nkw={}&_sacat=0&_from=R40&_trksid=m570.l1313&_udhi={}"
+)  # mit Platzhaltern: {query} und {preis_max}
 MAX_PAGES = 4  # Seitenlimit - muss noch angepasst werden
-HEADLESS = False  # für Chrome relevant: False = Scraping wird sichtbar im Browser ausgeführt ; True = Scraping läuft unsichtbar im Hintergrund
+HEADLESS = (
+    os.environ.get("SCRAPE_HEADLESS") == "1"
+)  # für Chrome relevant: False = Scraping wird sichtbar im Browser ausgeführt ; True = Scraping läuft unsichtbar im Hintergrund
+SCRAPE_ENGINE = os.environ.get(
+    "SCRAPE_ENGINE", "selenium"
+)  # "selenium" = Browser (Standard) ; "http" = async_scraper ohne Browser (kein JavaScript)
 
 # ----------------------------- Scraper-Selektoren ----------------------------- #
 """
@@ -155,6 +276,70 @@ LINK_SELECTOR = "a.s-item__link, a[role='link'][href*='/itm/'], a[href*='/itm/']
 IMAGE_SELECTOR = "img.s-card__image, img.s-item__image-img, img.s-item__image"
 NEXT_SELECTOR = ".pagination__next, a[rel='next'], a[aria-label='Weiter']"
 
+
+class SelectorLayout(NamedTuple):
+    """Selektoren einer eBay-Layout-Variante (ein Feld je Angebotsattribut)."""
+
+    name: str
+    title: str
+    price: str
+    attr_rows: str
+    condition: str
+    link: str
+    image: str
+
+
+"""
+Layout-Varianten: pro Seite wird einmal anhand der Karten-Klassen erkannt, welche
+Variante ITEMS_SELECTOR getroffen hat; danach werden für alle Karten nur noch deren
+Selektoren ausgewertet. GENERIC_LAYOUT (alle Varianten) dient als Fallback für
+gemischte/unbekannte Seiten.
+"""
+LAYOUTS: Dict[str, SelectorLayout] = {
+    "s-card": SelectorLayout(
+        name="s-card",
+        title=(
+            ".s-card__title .su-styled-text.primary.default, "
+            ".s-card__title [class*='su-styled-text'], "
+            "[role='heading'].s-card__title"
+        ),
+        price=(
+            ".s-card__attribute-row .s-card__price, "
+            ".su-card-container__attributes__primary .s-card__price, "
+            ".su-styled-text.primary.italic.large-1.s-card__price"
+        ),
+        attr_rows=(
+            ".s-card__attribute-row .su-styled-text.secondary.italic.large, "
+            ".s-card__attribute-row .su-styled-text.secondary.large"
+        ),
+        condition=(
+            ".s-card__subtitle-row .su-styled-text.secondary.default, "
+            ".s-card__subtitle .su-styled-text.secondary.default, "
+            ".SECONDARY_INFO"
+        ),
+        link="a[href*='/itm/']",
+        image="img.s-card__image",
+    ),
+    "s-item": SelectorLayout(
+        name="s-item",
+        title=".s-item__title",
+        price=".s-item__price",
+        attr_rows=".s-item__location, .s-item__itemLocation",
+        condition=".SECONDARY_INFO",
+        link="a.s-item__link, a[href*='/itm/']",
+        image="img.s-item__image-img, img.s-item__image",
+    ),
+}
+GENERIC_LAYOUT = SelectorLayout(
+    name="generic",
+    title=TITLE_SELECTOR,
+    price=PRICE_SELECTOR,
+    attr_rows=ATTR_ROW_TEXTS_SELECTOR,
+    condition=CONDITION_SELECTOR,
+    link=LINK_SELECTOR,
+    image=IMAGE_SELECTOR,
+)
+
 TITLE_BAD_PHRASES = [
     "wird in neuem fenster oder tab geöffnet",
     "wird in neuem fenster geöffnet",
@@ -208,6 +393,7 @@ def start_chrome(headless: bool) -> WebDriver:
     from selenium.webdriver.chrome.service import Service as ChromeService
     from selenium.webdriver.chrome.options import Options as ChromeOptions
 
+    from selenium import webdriver
     from webdriver_manager.chrome import ChromeDriverManager
 
     options = ChromeOptions()
@@ -232,6 +418,8 @@ def start_safari() -> WebDriver:
     """
     Startet Safari WebDriver (nur auf macOS verfügbar)
     """
+    from selenium import webdriver
+
     driver = webdriver.Safari()
     driver.set_window_size(1280, 900)
     return driver
@@ -242,6 +430,9 @@ def accept_cookies(driver: WebDriver) -> None:
     """
     Versucht, Cookie-Banner (inkl. iframe) zu akzeptieren.
     """
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.common.by import By
+
     try:
         time.sleep(2)  # kurze Wartezeit bis Banner erscheint
         # Direkt sichtbare Buttons prüfen
@@ -291,15 +482,25 @@ def accept_cookies(driver: WebDriver) -> None:
 
 def wait_for_results(driver: WebDriver, timeout: int = 25) -> None:
     """
-    Wartet bis das Treffer-Container-Element sichtbar/geladen ist
+    Wartet bis das Treffer-Container-Element sichtbar/geladen ist – oder bis
+    erkennbar eine Captcha-/Sperrseite geladen wurde (dann ohne Timeout zurück;
+    die Seite bewertet danach classify_page).
 
     Args:
         driver: Aktueller WebDriver.
         timeout: Maximale Wartezeit in Sekunden
     """
-    WebDriverWait(driver, timeout).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, RESULTS_CONTAINER_SELECTOR))
-    )
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    def loaded(d) -> bool:
+        return bool(
+            d.find_elements(By.CSS_SELECTOR, RESULTS_CONTAINER_SELECTOR)
+            or d.find_elements(By.CSS_SELECTOR, BLOCK_PAGE_SELECTOR)
+            or is_block_title(d.title)
+        )
+
+    WebDriverWait(driver, timeout).until(loaded)
 
 
 def lazy_scroll(driver: WebDriver, steps: int = 6, pause: float = 0.8) -> None:
@@ -355,17 +556,20 @@ def clean_title(title: str) -> str:
     return t
 
 
-def extract_location_and_shipping(card: BeautifulSoup) -> Tuple[str, str]:
+def extract_location_and_shipping(
+    card: BeautifulSoup, selector: str = ATTR_ROW_TEXTS_SELECTOR
+) -> Tuple[str, str]:
     """
     Extrahiert das Herkunftsland und Versandzeile aus Attributreihen.
 
     Args:
         card: BeautifulSoup-Knoten eines Angebots.
+        selector: Selektor der Attributreihen (Standard: alle Layout-Varianten).
     """
 
     texts = [
         el.get_text(" ", strip=True)
-        for el in card.select(ATTR_ROW_TEXTS_SELECTOR)
+        for el in card.select(selector)
         if el.get_text(strip=True)
     ]
     land, versand = "", ""
@@ -438,124 +642,399 @@ def extract_image_url(img_el) -> str:
     return ""
 
 
+# ----------------------------- Layout-Erkennung ----------------------------- #
+_SELECTOR_STATS: Dict[str, Counter] = {}
+_SELECTOR_STATS_LOCK = threading.Lock()
+
+
+def detect_layout(cards: list) -> SelectorLayout:
+    """
+    Bestimmt anhand der Klassen der gefundenen Karten die Layout-Variante der Seite.
+    Gemischte oder unbekannte Karten -> GENERIC_LAYOUT.
+    """
+    names = set()
+    for card in cards:
+        classes = card.get("class") or ()
+        names.add(next((n for n in LAYOUTS if n in classes), GENERIC_LAYOUT.name))
+        if len(names) > 1:
+            return GENERIC_LAYOUT
+    if not names:
+        return GENERIC_LAYOUT
+    return LAYOUTS.get(names.pop(), GENERIC_LAYOUT)
+
+
+def _record_selector_stats(layout: SelectorLayout, hits: Counter) -> None:
+    with _SELECTOR_STATS_LOCK:
+        stats = _SELECTOR_STATS.setdefault(layout.name, Counter())
+        stats["pages"] += 1
+        stats.update(hits)
+
+
+def selector_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Trefferstatistik pro Layout-Variante seit Prozessstart bzw. reset_selector_stats().
+
+    Returns:
+        Dict Layout -> {'pages', 'cards', 'title', 'link', 'price', 'condition',
+        'attr_rows', 'image': Anzahl Treffer}. Varianten ohne Seiten oder Felder mit
+        0 Treffern sind Kandidaten zum Entfernen.
+    """
+    with _SELECTOR_STATS_LOCK:
+        result = {}
+        for name in (*LAYOUTS, GENERIC_LAYOUT.name):
+            stats = _SELECTOR_STATS.get(name, Counter())
+            result[name] = {
+                key: stats[key]
+                for key in ("pages", "cards", *SelectorLayout._fields[1:])
+            }
+        return result
+
+
+def reset_selector_stats() -> None:
+    """Setzt die Trefferstatistik zurück."""
+    with _SELECTOR_STATS_LOCK:
+        _SELECTOR_STATS.clear()
+
+
 # ----------------------------- Kernparser + Scraper ----------------------------- #
-def parse_items_from_html(html: str, seen_links: set) -> List[Dict]:
+def parse_cards(
+    soup: BeautifulSoup, seen_links: set, layout: Optional[SelectorLayout] = None
+) -> List[Offer]:
     """
-    Parse Angebotskarten aus HTML und extrahiert relevante Felder.
+    Extrahiert Angebote aus einem bereits geparsten Dokument.
 
     Args:
-        html: Seitenquelltext.
+        soup: BeautifulSoup-Dokument einer Suchseite.
         seen_links: Set bereits gesehener /itm/-Links (Duplikate vermeiden).
-
-    Returns_
-        Liste von Angebots-Dicts (CSV_DATA_FIELDS).
+        layout: Erzwingt eine Layout-Variante (None = pro Seite erkennen).
     """
-    soup = BeautifulSoup(html, "html.parser")
     cards = soup.select(ITEMS_SELECTOR)
-    rows: List[Dict] = []
+    if layout is None:
+        layout = detect_layout(cards)
+    rows: List[Offer] = []
+    hits: Counter = Counter(cards=len(cards))
 
-    logger.info("Karten gefunden (ITEMS_SELECTOR): %d", len(cards))
+    logger.info("Karten gefunden (ITEMS_SELECTOR): %d [%s]", len(cards), layout.name)
     for card in cards:
-        title = clean_title(sel_text(card, TITLE_SELECTOR)).strip()
+        title = clean_title(sel_text(card, layout.title)).strip()
         if not title:
             continue
+        hits["title"] += 1
         if any(bad in title.lower() for bad in BAD_TITLE_SUBSTRINGS):
             continue
 
-        link = sel_href(card, LINK_SELECTOR)
+        link = sel_href(card, layout.link)
         if not link or "/itm/" not in link or link in seen_links:
             continue
         seen_links.add(link)
+        hits["link"] += 1
 
-        price = sel_text(card, PRICE_SELECTOR)
-        condition = sel_text(card, CONDITION_SELECTOR)
-        land, versand = extract_location_and_shipping(card)
-        image_el = card.select_one(IMAGE_SELECTOR)
+        price = sel_text(card, layout.price)
+        condition = sel_text(card, layout.condition)
+        land, versand = extract_location_and_shipping(card, layout.attr_rows)
+        image_el = card.select_one(layout.image)
         image = extract_image_url(image_el)
+        hits.update(
+            field
+            for field, found in (
+                ("price", price),
+                ("condition", condition),
+                ("attr_rows", land != "aus Schweiz" or versand),
+                ("image", image_el is not None),
+            )
+            if found
+        )
 
         rows.append(
-            {
-                "titel": title,
-                "aktualitaet": condition,
-                "preis": price,
-                "land": land,
-                "versand": versand,
-                "link": link,
-                "image": image,
-            }
+            Offer.create(
+                titel=title,
+                aktualitaet=condition,
+                preis=price,
+                land=land,
+                versand=versand,
+                link=link,
+                image=image,
+            )
         )
+    _record_selector_stats(layout, hits)
     return rows
 
 
-def scrape_all(
-    driver: WebDriver, start_url: str, max_pages: int = MAX_PAGES
-) -> List[Dict]:
+def find_next_url(soup: BeautifulSoup) -> Optional[str]:
     """
-    Durchläuft Painierung ab start_url und sammelt Angebotsdaten.
+    Liefert die URL der nächsten Ergebnisseite (oder None).
+    """
+    next_link = soup.select_one(NEXT_SELECTOR)  # Paginierungs-Link
+    if not next_link or not next_link.get("href"):
+        return None
+    return next_link["href"]
+
+
+def parse_items_from_html(html: str, seen_links: set) -> List[Offer]:
+    """
+    Parse Angebotskarten aus HTML und extrahiert relevante Felder.
 
     Args:
-        driver: Initialisierter WebDriver.
-        start_url: Erste Suchseite.
-        max_pages: Maximale Seitenanzahl.
+        html: Seitenquelltext.
+        seen_links: Set bereits gesehener /itm/-Links (Duplikate vermeiden).
+
+    Returns_
+        Liste von Angeboten (Offer, Felder wie CSV_DATA_FIELDS).
+    """
+    from bs4 import BeautifulSoup
+
+    return parse_cards(BeautifulSoup(html, "html.parser"), seen_links)
+
+
+def parse_page(html: str, seen_links: set) -> Tuple[List[Offer], Optional[str]]:
+    """
+    Parst eine Suchseite genau einmal und liefert Angebote + URL der Folgeseite.
+    Picklebar (Modulfunktion) -> auch in Thread-/Prozess-Executors nutzbar.
+
+    Args:
+        html: Seitenquelltext.
+        seen_links: Set bereits gesehener /itm/-Links (wird ergänzt).
 
     Returns:
-        Liste mit Angebots-Dictionaries.
+        (Angebote der Seite, nächste URL oder None)
     """
-    all_rows: List[Dict] = []
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    return parse_cards(soup, seen_links), find_next_url(soup)
+
+
+class ScrapeResult(NamedTuple):
+    """Ergebnis eines Scrapes (scrape_search, run_search)."""
+
+    rows: List[Offer]
+    complete: bool  # letzte Seite erreicht; False = max_pages/Abbruchkriterium
+
+
+class ScrapeInterrupted(RuntimeError):
+    """
+    Paginierung vorzeitig abgebrochen (Host gesperrt, Seite bleibt gesperrt).
+    rows enthält die bis dahin gesammelten Angebote; ein Checkpoint bleibt offen
+    und ein erneuter Lauf setzt dort fort.
+    """
+
+    def __init__(self, message: str, rows: Optional[List[Offer]] = None) -> None:
+        super().__init__(message)
+        self.rows = rows or []
+
+
+def iter_scrape(
+    driver: WebDriver,
+    start_url: str,
+    max_pages: int = MAX_PAGES,
+    stop_conditions: Optional[List[StopCondition]] = None,
+    archive: Optional[PageArchive] = None,
+    governor: Optional[RateGovernor] = None,
+    checkpoint: Optional["Checkpoint"] = None,
+) -> Iterator[List[Offer]]:
+    """
+    Durchläuft die Paginierung ab start_url und liefert die neuen Angebote jeder
+    Seite, sobald sie geparst ist (Generator; Argumente wie scrape_all).
+
+    Das Tempo bestimmt der RateGovernor (rate_governor.py) statt einer festen
+    Pause: gesperrte oder leere Seiten werden nach Backoff bis zu PAGE_RETRIES
+    Mal neu geladen statt geparst; ist der Host gesperrt, bricht die Paginierung
+    mit ScrapeInterrupted ab.
+
+    Mit checkpoint wird jede Seite samt Cursor festgehalten, bevor sie geliefert
+    wird; ein erneuter Aufruf liefert zuerst die gespeicherten Seiten und lädt
+    ab der ersten nicht erledigten Seite weiter (checkpoint.py).
+
+    Yields:
+        Angebote (Offer) einer Seite, ohne bereits gelieferte Links (ggf. leer).
+
+    Returns:
+        True, wenn die letzte Seite der Suche erreicht wurde (StopIteration.value).
+
+    Raises:
+        ScrapeInterrupted: Host gesperrt oder Seite bleibt gesperrt/leer.
+    """
+    from selenium.common.exceptions import TimeoutException
+
+    if stop_conditions is None:
+        stop_conditions = default_stop_conditions()
+    if archive is None:
+        archive = open_archive(ARCHIVE_DIR)
+    if governor is None:
+        governor = get_governor()
+
+    total_rows = 0
     current_url = start_url
     seen_links: set = set()
-
-    for page in range(1, max_pages + 1):
-        logger.info("Lade Seite %d: %s", page, current_url)
-        driver.get(current_url)  # Seite laden
-        accept_cookies(driver)  # Cookie-Banner wegklicken
-        try:
-            wait_for_results(driver, timeout=25)  # Treffer-Liste abwarten
-        except TimeoutException:
+    started = time.monotonic()
+    first_page = 1
+
+    state = checkpoint.load() if checkpoint is not None else None
+    if state is not None:
+        logger.info(
+            "Checkpoint: %d Seiten (%d Angebote) erledigt%s",
+            len(state.pages),
+            len(state.rows),
+            "" if state.done else f", weiter ab Seite {len(state.pages) + 1}",
+        )
+        for page_rows in state.pages:
+            seen_links.update(offer.link for offer in page_rows)
+            total_rows += len(page_rows)
+            yield page_rows
+        if state.done:
+            return state.complete
+        current_url = state.next_url
+        first_page = len(state.pages) + 1
+
+    for page in range(first_page, max_pages + 1):
+        for attempt in range(PAGE_RETRIES + 1):
+            try:
+                governor.wait(current_url)  # Tempo pro Host, Backoff
+            except CircuitOpenError as e:
+                logger.warning("Paginierung abgebrochen: %s", e)
+                raise ScrapeInterrupted(f"Paginierung abgebrochen: {e}") from e
+            logger.info("Lade Seite %d: %s", page, current_url)
+            loaded = time.monotonic()
+            driver.get(current_url)  # Seite laden
+            accept_cookies(driver)  # Cookie-Banner wegklicken
+            timed_out = False
+            try:
+                wait_for_results(driver, timeout=25)  # Treffer-Liste abwarten
+            except TimeoutException:
+                timed_out = True
+                logger.warning(
+                    "Trefferliste nicht rechtzeitig erschienen – parse trotzdem …"
+                )
+
+            lazy_scroll(driver, steps=6, pause=0.8)  # nachladen
+            html = driver.page_source  # Quelltext holen
+
+            page_rows, next_url = parse_page(html, set())  # Einträge parsen
+            outcome = classify_page(html, len(page_rows), timed_out=timed_out)
+            archive.store(html, current_url, page, outcome=outcome)  # asynchron
+            governor.record(current_url, outcome, time.monotonic() - loaded)
+            if outcome not in RETRY_OUTCOMES:
+                break
             logger.warning(
-                "Trefferliste nicht rechtzeitig erschienen – parse trotzdem …"
+                "Seite %d: %s (Versuch %d/%d)",
+                page,
+                outcome,
+                attempt + 1,
+                PAGE_RETRIES + 1,
             )
+        else:
+            logger.warning("Seite %d bleibt gesperrt/leer – Abbruch.", page)
+            raise ScrapeInterrupted(f"Seite {page} bleibt gesperrt/leer")
 
-        lazy_scroll(driver, steps=6, pause=0.8)  # nachladen
-        html = driver.page_source  # Quelltext holen
-
-        if page == 1:
-            with open(BASE_DIR / "debug_page1.html", "w", encoding="utf-8") as f:
-                f.write(html)
-            logger.info("Debug gespeichert: debug_page1.html")
-
-        page_rows = parse_items_from_html(html, seen_links)  # Einträge parsen
+        page_rows, stats = track_page(page, page_rows, seen_links, total_rows, started)
         logger.info(" → %d verwertbare Angebote (nach Filter)", len(page_rows))
         if not page_rows and page == 1:
             logger.warning(
-                "Keine Angebote geparst. Prüfe debug_page1.html und Selektoren."
+                "Keine Angebote geparst. Prüfe das Seitenarchiv (%s) und Selektoren.",
+                ARCHIVE_DIR,
+            )
+        total_rows += len(page_rows)
+        next_url = urljoin(current_url, next_url) if next_url else None  # relativ
+        reason = first_stop_reason(stop_conditions, stats) if next_url else None
+        if checkpoint is not None:  # Seite + Cursor festhalten (None = fertig)
+            last = reason or page == max_pages
+            checkpoint.save(
+                page, page_rows, None if last else next_url, complete=not next_url
             )
-        all_rows.extend(page_rows)  # Ergebnisse sammeln
+        yield page_rows  # Seite sofort weitergeben
 
-        soup = BeautifulSoup(html, "html.parser")
-        next_link = soup.select_one(NEXT_SELECTOR)  # Paginierungs-Link
-        if not next_link or not next_link.get("href"):
+        if not next_url:
             logger.info("Keine weitere Seite gefunden.")
+            return True
+        if reason:
+            logger.info("Paginierung beendet nach Seite %d: %s", page, reason)
             break
-        current_url = next_link["href"]
-        time.sleep(1.1)  # kurze Pause zwischen den Seiten
+        current_url = next_url
+    return False
+
+
+def scrape_search(
+    driver: WebDriver,
+    start_url: str,
+    max_pages: int = MAX_PAGES,
+    stop_conditions: Optional[List[StopCondition]] = None,
+    archive: Optional[PageArchive] = None,
+    governor: Optional[RateGovernor] = None,
+    checkpoint: Optional["Checkpoint"] = None,
+) -> ScrapeResult:
+    """
+    Wie scrape_all, meldet aber zusätzlich, ob die Suche vollständig ist, und
+    bricht bei gesperrtem Host ab statt ein Teilergebnis zu liefern.
+
+    Args:
+        checkpoint: Checkpoint der Suche (None = ohne); setzt einen abgebrochenen
+            Lauf ab der ersten nicht erledigten Seite fort.
+
+    Returns:
+        ScrapeResult (Angebote, vollständig ja/nein).
+
+    Raises:
+        ScrapeInterrupted: Abbruch; rows enthält die bisherigen Angebote.
+    """
+    all_rows: List[Offer] = []
+    pages = iter_scrape(
+        driver, start_url, max_pages, stop_conditions, archive, governor, checkpoint
+    )
+    try:
+        while True:
+            all_rows.extend(next(pages))
+    except StopIteration as end:
+        return ScrapeResult(all_rows, bool(end.value))
+    except ScrapeInterrupted as e:
+        e.rows = all_rows
+        raise
+
+
+def scrape_all(
+    driver: WebDriver,
+    start_url: str,
+    max_pages: int = MAX_PAGES,
+    stop_conditions: Optional[List[StopCondition]] = None,
+    archive: Optional[PageArchive] = None,
+    governor: Optional[RateGovernor] = None,
+) -> List[Offer]:
+    """
+    Durchläuft Painierung ab start_url und sammelt Angebotsdaten.
+    Bricht die Paginierung ab (Host gesperrt), gilt das Teilergebnis.
 
-    return all_rows
+    Args:
+        driver: Initialisierter WebDriver.
+        start_url: Erste Suchseite.
+        max_pages: Maximale Seitenanzahl.
+        stop_conditions: Abbruchkriterien nach jeder Seite (None = default_stop_conditions()).
+        archive: Seitenarchiv für das Roh-HTML (None = Archiv in ARCHIVE_DIR).
+        governor: Tempo pro Host (None = gemeinsamer RateGovernor des Prozesses).
 
+    Returns:
+        Liste mit Angeboten (Offer).
+    """
+    try:
+        return scrape_search(
+            driver, start_url, max_pages, stop_conditions, archive, governor
+        ).rows
+    except ScrapeInterrupted as e:
+        return e.rows
 
-def save_to_csv(items: List[Dict], filename: Path) -> None:
+
+def save_to_csv(items: List[Offer], filename: Path) -> None:
     """
-    Schreibt Angebotsliste in CSV (überschreibt bestehende Datei mit Header).
+    Schreibt Angebotsliste in CSV (ersetzt bestehende Datei atomar, mit Header).
 
     Args:
-        items: Liste von Angebots-Dicts.
+        items: Liste von Angeboten (Offer; Dicts mit CSV_DATA_FIELDS werden ebenfalls akzeptiert).
         filename: Ziel-Dateipfad.
     """
-    ensure_csv_with_header(filename, CSV_DATA_FIELDS)  # Header sicherstellen
-    with filename.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=CSV_DATA_FIELDS)
-        w.writeheader()
-        w.writerows(items)  # alle Items schreiben
+    with atomic_write(filename, newline="") as f:  # Leser sehen nie halbe Dateien
+        w = csv.writer(f)
+        w.writerow(CSV_DATA_FIELDS)
+        w.writerows(
+            offer.raw_values() for offer in as_offers(items)
+        )  # alle Items schreiben
     logger.info("CSV gespeichert: %s  (%d Zeilen)", filename, len(items))
 
 
@@ -568,35 +1047,265 @@ def encode_query_limit_5(query: str) -> str:
     return quote_plus(limited)  # Leerzeichen -> '+'
 
 
-def run_scrape(query: str, preis: str) -> List[Dict]:
+def build_search_url(query: str, preis: str) -> str:
     """
-    Öffentliche Funktion: Scrapt eBay für einen Suchbegriff und schreibt CSV.
-    Ruft nach erfolgreichem Scrape zusätzlich die Clean-Up Routine auf.
+    Baut die eBay-Such-URL aus Suchbegriff (max. 5 Wörter) und Maximalpreis (nur Ziffern).
+    """
+    query_encoded = encode_query_limit_5(query)
+    preis_clean = "".join(ch for ch in str(preis) if ch.isdigit()) or ""
+    return BASE_URL.format(query_encoded, preis_clean)
+
+
+_PRICE_HISTORY = None
+
+
+def get_price_history():
+    """Gemeinsame PriceHistory (lazy; Sperren pro Zeitreihe, siehe price_history.py)."""
+    global _PRICE_HISTORY
+    if _PRICE_HISTORY is None or _PRICE_HISTORY.root != HISTORY_DIR:
+        from price_history import PriceHistory
+
+        _PRICE_HISTORY = PriceHistory(HISTORY_DIR)
+    return _PRICE_HISTORY
+
+
+def record_price_history(df) -> None:
+    """
+    Schreibt die bereinigten Preise eines Scrapes in den Preisverlauf (price_history.py).
+    Fehler werden nur geloggt, damit der Scrape selbst nicht scheitert.
+    """
+    try:
+        count = get_price_history().record_frame(df)
+        logger.info("Preisverlauf ergänzt: %d Beobachtungen", count)
+    except Exception as e:
+        logger.exception("Preisverlauf konnte nicht geschrieben werden: %s", e)
+
+
+_OFFER_STORE = None
+
+
+def get_offer_store():
+    """Gemeinsamer OfferStore (lazy, eine SQLite-Verbindung pro Thread)."""
+    global _OFFER_STORE
+    if _OFFER_STORE is None or _OFFER_STORE.path != str(OFFER_DB_PATH):
+        from offer_store import OfferStore
+
+        _OFFER_STORE = OfferStore(OFFER_DB_PATH)
+    return _OFFER_STORE
+
+
+_SHARED_CACHE = None
+
+
+def get_shared_cache():
+    """Gemeinsamer SharedCache (lazy, eine SQLite-Verbindung pro Thread)."""
+    global _SHARED_CACHE
+    if _SHARED_CACHE is None or _SHARED_CACHE.path != str(CACHE_DB_PATH):
+        from shared_cache import SharedCache
+
+        _SHARED_CACHE = SharedCache(CACHE_DB_PATH)
+    return _SHARED_CACHE
+
+
+def cached_search(q: str, produkt: str = "") -> List[Offer]:
+    """
+    Stichwortsuche im Volltextindex mit Ergebnis-Cache, den alle Worker teilen.
+    """
+    key = json.dumps([str(OFFER_DB_PATH), q.lower(), produkt.lower()])
+    try:
+        cache = get_shared_cache()
+        hit = cache.get("search", key)
+    except sqlite3.Error as e:
+        logger.warning("Gemeinsamer Cache nicht verfügbar: %s", e)
+        return get_offer_store().search(q, product_name=produkt or None)
+    if hit is None:
+        hit = get_offer_store().search(q, product_name=produkt or None)
+        try:
+            cache.set("search", key, hit, ttl=SEARCH_CACHE_TTL)
+            cache.purge_expired()  # abgelaufene Suchresultate nicht ansammeln
+        except sqlite3.Error as e:  # Resultat trotzdem ausliefern
+            logger.warning("Gemeinsamer Cache nicht verfügbar: %s", e)
+    return hit
+
+
+def index_offers(df, search_id: Optional[str] = None) -> None:
+    """
+    Übernimmt die bereinigten Angebote in den Volltextindex (offer_store.py),
+    optional als Ergebnis der Suche search_id (für /api/searches/<id>/offers).
+    Fehler werden nur geloggt, damit der Scrape selbst nicht scheitert.
+    """
+    try:
+        count = get_offer_store().index_frame(df, search_id=search_id)
+        get_shared_cache().clear("search")  # gecachte Suchresultate veraltet
+        logger.info("Volltextindex aktualisiert: %d Angebote", count)
+    except Exception as e:
+        logger.exception("Volltextindex konnte nicht aktualisiert werden: %s", e)
+
+
+def make_search_id(query: str, preis: str) -> str:
+    """
+    Stabile Kennung einer Suche (Suchbegriff wie in der URL + Maximalpreis).
+    """
+    words = " ".join(query.lower().split()[:5])
+    preis_clean = "".join(ch for ch in str(preis) if ch.isdigit())
+    return hashlib.sha1(f"{words}|{preis_clean}".encode("utf-8")).hexdigest()[:12]
+
+
+_PREWARM_STORE = None
+
+
+def get_prewarm_store():
+    """Gemeinsamer PrewarmStore (lazy, eine SQLite-Verbindung pro Thread)."""
+    global _PREWARM_STORE
+    if _PREWARM_STORE is None or _PREWARM_STORE.path != str(PREWARM_DB_PATH):
+        from prewarm import PrewarmStore
+
+        _PREWARM_STORE = PrewarmStore(PREWARM_DB_PATH)
+    return _PREWARM_STORE
+
+
+def serve_warm(query: str, preis: str):
+    """
+    Liefert eine vorgewärmte Suche (prewarm.py), falls sie frisch genug ist,
+    und veröffentlicht deren Ausgabeverzeichnis wie nach einem eigenen Scrape.
+    Jeder Aufruf zählt als Treffer bzw. Fehlschuss für den Prewarm-Bericht.
+
+    Returns:
+        WarmSearch oder None (dann wie bisher scrapen).
+    """
+    search_id = make_search_id(query, preis)
+    started = time.perf_counter()
+    try:
+        store = get_prewarm_store()
+        warm = store.lookup(search_id)
+        if warm is not None:
+            publish_outputs(Path(warm.out_dir))
+            logger.info("Vorgewärmte Suche '%s' ausgeliefert.", query)
+        store.record_lookup(search_id, warm, time.perf_counter() - started)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Vorgewärmte Suchen nicht verfügbar: %s", e)
+        return None
+    return warm
+
+
+def new_output_dir(search_id: Optional[str] = None) -> Path:
+    """
+    Legt ein neues, nur von diesem Lauf genutztes Ausgabeverzeichnis an
+    (OUTPUT_DIR/<search_id>/<Zeit>-<Prozess>-<Thread>).
+    """
+    version = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+    path = OUTPUT_DIR / (search_id or "ohne-suche") / version
+    path.mkdir(parents=True)
+    return path
+
+
+def prune_output_versions(search_dir: Path, keep: int = OUTPUT_VERSIONS_KEPT) -> None:
+    """
+    Löscht ältere Ausgabeversionen einer Suche (die neuesten keep bleiben);
+    die veröffentlichte Version bleibt immer erhalten.
+    """
+    published = published_output_dir()
+    versions = sorted(
+        (p for p in search_dir.iterdir() if p.is_dir()),
+        key=lambda p: int(p.name.split("-", 1)[0]),
+    )
+    for old in versions[:-keep]:
+        if published is not None and old == published:
+            continue
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def publish_outputs(out_dir: Path) -> None:
+    """
+    Veröffentlicht ein Ausgabeverzeichnis (siehe new_output_dir) als Ganzes:
+    OUTPUT_DIR/current zeigt danach atomar auf out_dir. Leser sehen so immer
+    Roh-, Clean-, Quarantäne- und Kennzahlen-Datei desselben Laufs.
+    """
+    replace_symlink(os.path.relpath(out_dir, OUTPUT_DIR), OUTPUT_DIR / CURRENT_OUTPUT)
+    logger.info("Veröffentlicht: %s", out_dir)
+
+
+def finish_scrape(
+    rows: List[Offer], search_id: Optional[str] = None, publish: bool = True
+) -> Path:
+    """
+    Schreibt die Rohdaten, ruft die Clean-Up Routine auf und übernimmt das
+    Ergebnis in Preisverlauf und Volltextindex (siehe make_search_id).
+
+    Jeder Lauf schreibt in ein eigenes Versionsverzeichnis (new_output_dir) und
+    veröffentlicht die fertigen Dateien danach atomar (publish_outputs).
+    Gleichzeitige Suchen brauchen so keine gemeinsame Sperre; es gilt der
+    zuletzt veröffentlichte Stand.
+
+    Args:
+        rows: Angebote (Rohdaten).
+        search_id: Kennung der Suche.
+        publish: False = nur das Versionsverzeichnis erzeugen (z.B. prewarm.py).
+
+    Returns:
+        Versionsverzeichnis dieses Laufs.
+    """
+    from data_transformer_cleansing import cleanup
+
+    out_dir = new_output_dir(search_id)
+    raw_path = out_dir / CSV_DATA_PATH.name
+    clean_path = out_dir / CLEANED_DATA_PATH.name
+
+    save_to_csv(rows, raw_path)  # Rohdaten sichern
+
+    # Nachbearbeitung: erzeugt output_clean.csv aus output_scraper.csv
+    try:
+        result = cleanup(raw_path, clean_path)
+        logger.info(
+            "Cleaned file generated: %s (%d Zeilen, %d in Quarantäne)",
+            clean_path,
+            len(result.data),
+            len(result.quarantine),
+        )
+    except Exception as e:
+        logger.exception("Cleaning failed: %s", e)
+    else:
+        record_price_history(result.data)
+        index_offers(result.data, search_id=search_id)
+    finally:
+        if publish:
+            publish_outputs(out_dir)
+        prune_output_versions(out_dir.parent)
+    return out_dir
+
+
+def run_search(
+    query: str, preis: str, checkpoint: Optional["Checkpoint"] = None
+) -> ScrapeResult:
+    """
+    Scrapt eine Suche mit der konfigurierten Engine (SCRAPE_ENGINE), ohne
+    Ausgabedateien zu schreiben (z.B. für scheduler.py).
 
     Args:
         query: Suchbegriff (frei wählbar).
         preis: Maximalpeis (wird numerisch gereinigt).
+        checkpoint: Checkpoint der Suche (siehe scrape_search); verwirft der
+            Aufrufer, sobald er das Ergebnis verarbeitet hat.
 
     Returns:
-        Angebotsliste (Rohdaten).
+        ScrapeResult (Angebote, vollständig ja/nein).
+
+    Raises:
+        ScrapeInterrupted: Abbruch (Host gesperrt); ein Checkpoint bleibt offen.
     """
+    if SCRAPE_ENGINE == "http":
+        from async_scraper import run_async_search
 
-    query_encoded = encode_query_limit_5(query)
-    preis_clean = "".join(ch for ch in str(preis) if ch.isdigit()) or ""
-    start_url = BASE_URL.format(query_encoded, preis_clean)  # Such-URL inkl. Maxpreis
+        return run_async_search(
+            query, preis, max_pages=MAX_PAGES, checkpoint=checkpoint
+        )
+
+    start_url = build_search_url(query, preis)  # Such-URL inkl. Maxpreis
     driver = setup_driver()  # WebDriver wählen/starten
     try:
-        rows = scrape_all(driver, start_url, max_pages=MAX_PAGES)  # Scrape
-        save_to_csv(rows, CSV_DATA_PATH)  # Rohdaten sichern
-
-        # Nachbearbeitung: erzeugt output_clean.csv aus output_scraper.csv
-        try:
-            cleanup()
-            logger.info("Cleaned file generated: %s", CLEANED_DATA_PATH)
-        except Exception as e:
-            logger.exception("Cleaning failed: %s", e)
-
-        return rows
+        return scrape_search(
+            driver, start_url, max_pages=MAX_PAGES, checkpoint=checkpoint
+        )
     finally:
         try:
             driver.quit()  # Browser sauber schliessen
@@ -604,6 +1313,98 @@ def run_scrape(query: str, preis: str) -> List[Dict]:
             logger.debug("WebDriver konnte nicht sauber geschlossen werden.")
 
 
+def run_scrape(query: str, preis: str, write_output: bool = True) -> List[Offer]:
+    """
+    Öffentliche Funktion: Scrapt eBay für einen Suchbegriff und schreibt CSV.
+    Ruft nach erfolgreichem Scrape zusätzlich die Clean-Up Routine auf.
+    Bricht die Paginierung ab (Host gesperrt), gilt das Teilergebnis.
+
+    Args:
+        query: Suchbegriff (frei wählbar).
+        preis: Maximalpeis (wird numerisch gereinigt).
+        write_output: False = nur Angebote liefern, output_*.csv bleiben unverändert.
+
+    Returns:
+        Angebotsliste (Rohdaten).
+    """
+    try:
+        rows = run_search(query, preis).rows  # Scrape
+    except ScrapeInterrupted as e:
+        rows = e.rows
+    if write_output:
+        finish_scrape(rows, search_id=make_search_id(query, preis))
+    return rows
+
+
+def clean_page_rows(rows: List[Offer]) -> List[Offer]:
+    """
+    Bereinigt die Angebote einer einzelnen Seite (gleiche Regeln wie output_clean.csv),
+    damit sie vor Ende des Scrapes angezeigt werden können.
+    """
+    from data_transformer_cleansing import (
+        TransformError,
+        frame_from_offers,
+        offers_from_frame,
+        transform_frame,
+    )
+
+    if not rows:
+        return []
+    try:
+        return offers_from_frame(transform_frame(frame_from_offers(rows)).data)
+    except TransformError as e:
+        logger.warning("Seite konnte nicht bereinigt werden: %s", e)
+        return []
+
+
+def run_scrape_stream(query: str, preis: str) -> Iterator[List[Offer]]:
+    """
+    Wie run_scrape (Engine gemäss SCRAPE_ENGINE), liefert aber die bereinigten
+    Angebote jeder Seite, sobald sie geparst ist (Generator). Nach der letzten Seite werden Roh- und
+    Clean-CSV wie bei run_scrape geschrieben; bricht der Konsument vorher ab
+    (z.B. Browser geschlossen), bleiben die Ausgabedateien unverändert.
+    Ist die Suche vorgewärmt (serve_warm), wird nicht gescrapt.
+
+    Yields:
+        Bereinigte Angebote (Offer) einer Seite.
+    """
+    warm = serve_warm(query, preis)
+    if warm is not None:  # vorgewärmt: eine "Seite" mit allen bereinigten Angeboten
+        yield list(iter_rows_for_table(Path(warm.out_dir) / CLEANED_DATA_PATH.name))
+        return
+
+    driver = None
+    if SCRAPE_ENGINE == "http":  # wie run_search
+        from async_scraper import iter_async_search
+
+        pages = iter_async_search(query, preis, max_pages=MAX_PAGES)
+    else:
+        driver = setup_driver()
+        start_url = build_search_url(query, preis)
+        pages = iter_scrape(driver, start_url, max_pages=MAX_PAGES)
+    try:
+        rows: List[Offer] = []
+        try:
+            for page_rows in pages:
+                rows.extend(page_rows)
+                yield clean_page_rows(page_rows)
+        except ScrapeInterrupted:
+            pass  # Teilergebnis wie bei run_scrape
+        finish_scrape(rows, search_id=make_search_id(query, preis))
+    finally:
+        pages.close()
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                logger.debug("WebDriver konnte nicht sauber geschlossen werden.")
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Formatiert ein Server-Sent-Event (eine JSON-Zeile als data)."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 # ----------------------------- Jinja-Filter ----------------------------- #
 @app.template_filter("chf")
 def chf_filter(value):
@@ -621,6 +1422,24 @@ def chf_filter(value):
         return value
 
 
+# ----------------------------- Gestreamtes Rendern ----------------------------- #
+# Anzahl Template-Ausgaben, die vor dem Senden zu einem Chunk zusammengefasst werden
+STREAM_BUFFER_SIZE = 200
+
+
+def stream_page(template_name: str, **context) -> Response:
+    """
+    Rendert ein Template als Stream (Jinja Template.stream): der Browser erhält
+    den Seitenkopf sofort, Tabellenzeilen werden beim Iterieren von Generatoren
+    im Kontext erzeugt und blockweise gesendet. Der Speicherbedarf hängt damit
+    nicht von der Anzahl Zeilen ab.
+    """
+    app.update_template_context(context)
+    stream = app.jinja_env.get_template(template_name).stream(context)
+    stream.enable_buffering(STREAM_BUFFER_SIZE)
+    return Response(stream_with_context(stream), mimetype="text/html")
+
+
 # ----------------------------- Routes ----------------------------- #
 @app.route("/")
 def home():
@@ -648,13 +1467,16 @@ def submit():
         "region", ""
     ).strip()  # Holt eingegebenes Land/Region aus Frontend Formular (wird aktuell nicht konsumiert) und speichert in Variable
 
-    append_row(
-        produkt_url=produkt, preis=preis, region=region
-    )  # Eingaben-Log (optional)
+    log_search(produkt, preis, region)  # Eingaben-Log (gepuffert)
 
-    items = run_scrape(
-        query=produkt, preis=preis
-    )  # Scraper Funktion starten inklusive Produkt und Preisübergabe
+    warm = serve_warm(produkt, preis)  # vorgewärmt? dann ohne Browser
+    if warm is not None:
+        scraped_count = warm.offers
+    else:
+        items = run_scrape(
+            query=produkt, preis=preis
+        )  # Scraper Funktion starten inklusive Produkt und Preisübergabe
+        scraped_count = len(items)
 
     session["new_row"] = {  # Kurzinfo für UI
         "produkt": produkt,
@@ -662,7 +1484,7 @@ def submit():
         "region": region,
         "link": produkt,
     }
-    session["scraped_count"] = len(items)
+    session["scraped_count"] = scraped_count
     return redirect(url_for("suchresultat_aktuell"))
 
 
@@ -684,19 +1506,198 @@ def suchresultat_aktuell():
     )
 
 
+@app.route("/suchresultat/live")
+def suchresultat_live():
+    """
+    Statusseite mit Live-Tabelle: lädt die Treffer per Server-Sent Events von
+    /suchresultat/stream, während der Scrape noch läuft.
+    """
+    produkt = request.args.get("produkt", "").strip()
+    preis = request.args.get("preis", "").strip()
+    region = request.args.get("region", "").strip()
+    if not produkt:
+        return redirect(url_for("home"))
+
+    # Kein Eingaben-Log: GET (Neuladen, Prefetch) würde popular() verfälschen
+    return render_template(
+        "suchresultat_aktuell.html",
+        daten=[{"produkt": produkt, "preis": preis, "region": region}],
+        stream_url=url_for("suchresultat_stream", produkt=produkt, preis=preis),
+        success=True,
+        active_page="results",
+    )
+
+
+@app.route("/suchresultat/stream")
+def suchresultat_stream():
+    """
+    Server-Sent Events eines laufenden Scrapes:
+    'page' (bereinigte Zeilen einer Seite), danach 'done' bzw. 'error'.
+    """
+    produkt = request.args.get("produkt", "").strip()
+    preis = request.args.get("preis", "").strip()
+    done_url = url_for("suchresultat_total")
+
+    def events():
+        total = 0
+        try:
+            for page, offers in enumerate(run_scrape_stream(produkt, preis), 1):
+                total += len(offers)
+                rows = [offer._asdict() for offer in offers]
+                yield sse_event("page", {"page": page, "total": total, "rows": rows})
+        except Exception as e:
+            logger.exception("Live-Scrape fehlgeschlagen: %s", e)
+            yield sse_event("error", {"message": "Scrape fehlgeschlagen."})
+            return
+        yield sse_event("done", {"total": total, "url": done_url})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/suchresultat")
 def suchresultat_total():
     """
-    Alle gespeicherten Scraper-Einträge anzeigen.
+    Alle gespeicherten Scraper-Einträge anzeigen (gestreamt, siehe stream_page).
+    Mit ?q=... (optional &produkt=...) wird stattdessen der Volltextindex über
+    alle bisher bereinigten Angebote durchsucht (AND/Präfix, z.B. '176 cm').
     """
-    daten = load_rows_for_table()
-    return render_template(
+    q = request.args.get("q", "").strip()
+    produkt = request.args.get("produkt", "").strip()
+    if q:
+        daten = cached_search(q, produkt)
+        stats = None
+    else:
+        out_dir = published_output_dir()  # Zeilen und Kennzahlen derselben Suche
+        daten = iter_rows_for_table(published_file(CLEANED_DATA_PATH, out_dir))
+        stats = load_stats(published_file(CLEANED_STATS_PATH, out_dir))
+    return stream_page(
         "suchresultat_total.html",
         daten=daten,
+        stats=stats,
+        q=q,
+        produkt=produkt,
         active_page="results",
     )
 
 
+@app.route("/api/stats")
+def api_stats():
+    """
+    Kennzahlen der aktuellen Suche als JSON (Quantile, Häufigkeiten, günstigste Angebote).
+    """
+    stats = load_stats()
+    if stats is None:
+        return jsonify({"error": "Keine Kennzahlen vorhanden."}), 404
+    return jsonify(stats)
+
+
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+
+def _api_offers(search_id: Optional[str] = None):
+    """
+    Gemeinsame Antwort für /api/offers und /api/searches/<id>/offers.
+
+    Query-Parameter:
+        fields: Kommagetrennte Felder (Standard: alle, siehe offer_store.API_FIELDS).
+        produkt: Nur Angebote dieses Produkts.
+        cursor: next_cursor der vorherigen Seite (bzw. letzte id im NDJSON).
+        limit: Zeilen pro Seite (JSON, Standard API_PAGE_SIZE) bzw. insgesamt (NDJSON).
+        format: 'json' (Seite mit next_cursor) oder 'ndjson' (gestreamt, eine Zeile
+            pro Angebot).
+    """
+    from offer_store import API_FIELDS, dumps
+
+    fmt = request.args.get("format", "json")
+    fields_arg = request.args.get("fields", "").strip()
+    fields = [f.strip() for f in fields_arg.split(",") if f.strip()] or list(API_FIELDS)
+    unknown = [f for f in fields if f not in API_FIELDS]
+    if fmt not in ("json", "ndjson"):
+        return jsonify({"error": f"Unbekanntes Format: {fmt}"}), 400
+    if unknown:
+        return jsonify({"error": f"Unbekannte Felder: {', '.join(unknown)}"}), 400
+    try:
+        after = int(request.args.get("cursor", 0))
+        limit_arg = request.args.get("limit")
+        limit = None if limit_arg is None else int(limit_arg)
+    except ValueError:
+        return jsonify({"error": "cursor und limit müssen Zahlen sein."}), 400
+    if after < 0 or (limit is not None and limit < 1):
+        # SQLite liest LIMIT -1 als "ohne Limit": ganze Treffermenge im Speicher
+        return jsonify({"error": "cursor muss >= 0 und limit >= 1 sein."}), 400
+
+    store = get_offer_store()
+    if search_id is not None and not store.has_search(search_id):
+        return jsonify({"error": f"Unbekannte Suche: {search_id}"}), 404
+    query = dict(search_id=search_id, product_name=request.args.get("produkt"))
+
+    if fmt == "ndjson":
+
+        def lines():
+            for row in store.iter_offers(fields, after=after, limit=limit, **query):
+                yield dumps(row) + b"\n"
+
+        return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+
+    page_size = min(limit or API_PAGE_SIZE, API_MAX_PAGE_SIZE)
+    select = fields if "id" in fields else ["id", *fields]
+    rows = list(store.iter_offers(select, after=after, limit=page_size, **query))
+    next_cursor = rows[-1]["id"] if len(rows) == page_size else None
+    if "id" not in fields:
+        for row in rows:
+            del row["id"]
+    body = dumps({"items": rows, "next_cursor": next_cursor})
+    return Response(body, mimetype="application/json")
+
+
+@app.route("/api/searches/popular")
+def api_popular_searches():
+    """Häufigste Suchen aus dem Such-Log (?limit=, ?days= für ein Zeitfenster)."""
+    from search_log import open_search_log
+
+    limit = max(1, min(request.args.get("limit", 10, type=int), 100))
+    days = request.args.get("days", type=float)
+    since = time.time() - days * 86400 if days else None
+    popular = open_search_log(CSV_PATH, SEARCH_DB_PATH).popular(limit, since=since)
+    return jsonify(
+        [
+            {
+                "search_id": make_search_id(p.query_key, p.preis),
+                "query": p.query,
+                "preis": p.preis,
+                "hits": p.hits,
+                "last_seen": p.last_seen,
+            }
+            for p in popular
+        ]
+    )
+
+
+@app.route("/api/prewarm")
+def api_prewarm():
+    """Prewarm-Bericht: Trefferquote und eingesparte Wartezeit (?days= Zeitfenster)."""
+    days = request.args.get("days", type=float)
+    since = time.time() - days * 86400 if days else None
+    return jsonify(get_prewarm_store().report(since=since)._asdict())
+
+
+@app.route("/api/offers")
+def api_offers():
+    """Alle gespeicherten Angebote (Volltextindex) als JSON-Seiten oder NDJSON."""
+    return _api_offers()
+
+
+@app.route("/api/searches/<search_id>/offers")
+def api_search_offers(search_id: str):
+    """Angebote einer Suche (search_id = make_search_id(query, preis))."""
+    return _api_offers(search_id)
+
+
 # ----------------------------- Main ----------------------------- #
 if __name__ == "__main__":
     """
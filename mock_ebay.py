@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lokaler eBay-Nachbau für Last- und End-to-End-Tests
+---------------------------------------------------
+Gegen ebay.ch lässt sich nicht gefahrlos Last erzeugen. MockEbay liefert unter
+/sch/i.html Suchseiten, die aus echten gespeicherten Seiten erzeugt werden:
+
+- s-card: debug_page1.html (aktuelles Layout)
+- s-item: testing_scraping/fixtures/search_s_item.html (Legacy-Layout)
+
+Kopf und Fuss der Vorlage bleiben unverändert (realistische Seitengrösse und
+Parse-Kosten); dazwischen werden `cards` Karten aus den Vorlagen-Karten
+eingesetzt, jede mit eindeutiger Artikelnummer pro (Suche, Seite, Position).
+Die Paginierung (_pgn) endet nach `pages` Seiten.
+
+Konfigurierbar (MockConfig, CLI-Flags):
+- Latenz: Mittelwert + Streuung pro Aufruf (Normalverteilung, >= 0)
+- Paginierung und Karten pro Seite, Layout (s-card, s-item, mixed = abwechselnd)
+- Fehlerraten: Captcha-Seite (200), 429, 500 und leere Seiten – damit lassen
+  sich RateGovernor, Retries und Abbrüche reproduzierbar prüfen.
+
+Scraper zeigen per Umgebungsvariable auf den Nachbau (siehe main.EBAY_BASE_URL):
+    python mock_ebay.py --port 8765 --captcha-rate 0.05
+    EBAY_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+logger = logging.getLogger("ebay_scraper.mock")
+
+BASE_DIR = Path(__file__).resolve().parent
+SEED_PAGES = {
+    "s-card": BASE_DIR / "debug_page1.html",
+    "s-item": BASE_DIR / "testing_scraping" / "fixtures" / "search_s_item.html",
+}
+SEARCH_PATH = "/sch/i.html"
+LAYOUTS = ("s-card", "s-item", "mixed")
+
+_CARDS_MARKER = "<!--mock:cards-->"
+_NEXT_MARKER = "<!--mock:next-->"
+_ITEM_ID_RE = re.compile(r"(/itm/|data-listingid=\")\d+")
+
+BLOCK_PAGE = (
+    "<!DOCTYPE html><html><head><title>Pardon Our Interruption...</title></head>"
+    '<body><div id="px-captcha"></div>'
+    "<p>Bitte bestätigen Sie, dass Sie kein Roboter sind.</p></body></html>"
+)
+
+
+class MockConfig(NamedTuple):
+    """Verhalten des Nachbaus (Raten jeweils pro Aufruf, 0.0–1.0)."""
+
+    pages: int = 4  # Seiten pro Suche (danach kein Weiter-Link)
+    cards: int = 60  # Karten pro Seite
+    layout: str = "s-card"  # s-card, s-item oder mixed
+    latency: float = 0.2  # Sekunden (Mittelwert)
+    jitter: float = 0.05  # Sekunden (Standardabweichung)
+    captcha_rate: float = 0.0  # Captcha-Seite mit Status 200
+    throttle_rate: float = 0.0  # 429 Too Many Requests
+    error_rate: float = 0.0  # 500 Internal Server Error
+    empty_rate: float = 0.0  # Seite ohne Karten
+    seed: Optional[int] = None  # Zufallsgenerator (None = nicht reproduzierbar)
+
+
+class SeedPage(NamedTuple):
+    """Vorlage eines Layouts: Seitenrahmen, Karten und Weiter-Link."""
+
+    head: str  # bis zur ersten Karte
+    tail: str  # nach der letzten Karte (enthält _NEXT_MARKER)
+    cards: List[str]
+    next_link: str  # mit Platzhalter {href}
+
+
+def load_seed(path: Path) -> SeedPage:
+    """
+    Zerlegt eine gespeicherte Suchseite in Rahmen und Karten (einmal beim Start).
+
+    Raises:
+        ValueError: Seite enthält keine Karten (main.ITEMS_SELECTOR).
+    """
+    from bs4 import BeautifulSoup, Comment
+
+    import main
+
+    soup = BeautifulSoup(path.read_text(encoding="utf-8"), "html.parser")
+    items = soup.select(main.ITEMS_SELECTOR)
+    if not items:
+        raise ValueError(f"Keine Angebotskarten in {path}")
+    cards = [str(item) for item in items]
+    items[0].replace_with(Comment(_CARDS_MARKER[4:-3]))
+    for item in items[1:]:
+        item.decompose()
+
+    next_link = ""
+    anchor = soup.select_one(main.NEXT_SELECTOR)
+    if anchor is not None:
+        anchor["href"] = "{href}"
+        next_link = str(anchor)
+        anchor.replace_with(Comment(_NEXT_MARKER[4:-3]))
+    head, tail = str(soup).split(_CARDS_MARKER, 1)
+    if _NEXT_MARKER not in tail:  # Weiter-Link fehlt in der Vorlage
+        tail = tail.replace("</body>", _NEXT_MARKER + "</body>", 1)
+    return SeedPage(
+        head,
+        tail,
+        cards,
+        next_link or '<a class="pagination__next" href="{href}">Weiter</a>',
+    )
+
+
+def _item_id(*parts: object) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=8)
+    return str(100000000000 + int.from_bytes(digest.digest(), "big") % 900000000000)
+
+
+class MockEbay:
+    """Erzeugt Antworten des Nachbaus und zählt sie (thread-sicher)."""
+
+    def __init__(
+        self,
+        config: MockConfig = MockConfig(),
+        seeds: Optional[Dict[str, SeedPage]] = None,
+    ) -> None:
+        if config.layout not in LAYOUTS:
+            raise ValueError(f"Unbekanntes Layout: {config.layout}")
+        self.config = config
+        needed = ("s-card", "s-item") if config.layout == "mixed" else (config.layout,)
+        self.seeds = seeds or {name: load_seed(SEED_PAGES[name]) for name in needed}
+        self.rng = random.Random(config.seed)
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def layout_for(self, page: int) -> str:
+        if self.config.layout == "mixed":
+            return "s-card" if page % 2 else "s-item"
+        return self.config.layout
+
+    def render(
+        self, query: str, preis: str, page: int, cards: Optional[int] = None
+    ) -> str:
+        """
+        HTML einer Ergebnisseite (ohne Zufallsfehler).
+
+        Args:
+            query: Suchbegriff (_nkw), bestimmt die Artikelnummern.
+            preis: Maximalpreis (_udhi), nur für Artikelnummern und Weiter-Link.
+            page: Seitennummer ab 1 (_pgn).
+            cards: Anzahl Karten (None = config.cards).
+        """
+        seed = self.seeds[self.layout_for(page)]
+        count = self.config.cards if cards is None else cards
+        parts = [seed.head]
+        for i in range(count):
+            template = seed.cards[i % len(seed.cards)]
+            item_id = _item_id(query, preis, page, i)
+            parts.append(_ITEM_ID_RE.sub(lambda m: m.group(1) + item_id, template))
+        next_link = ""
+        if count and page < self.config.pages:
+            href = (
+                SEARCH_PATH
+                + "?"
+                + urlencode({"_nkw": query, "_udhi": preis, "_pgn": page + 1})
+            )
+            next_link = seed.next_link.replace("{href}", href.replace("&", "&amp;"))
+        parts.append(seed.tail.replace(_NEXT_MARKER, next_link, 1))
+        return "".join(parts)
+
+    def respond(self, path: str) -> Tuple[int, str]:
+        """
+        Antwort auf einen GET-Pfad inkl. Latenz und Fehlerraten.
+
+        Returns:
+            (HTTP-Status, HTML)
+        """
+        cfg = self.config
+        url = urlsplit(path)
+        with self._lock:
+            delay = (
+                max(0.0, self.rng.gauss(cfg.latency, cfg.jitter))
+                if cfg.latency
+                else 0.0
+            )
+            roll = self.rng.random()
+        if delay:
+            time.sleep(delay)
+        self._count("requests")
+        if url.path != SEARCH_PATH:
+            self._count("not_found")
+            return 404, "<html><body>Not found</body></html>"
+
+        for key, status, rate in (
+            ("captcha", 200, cfg.captcha_rate),
+            ("throttled", 429, cfg.throttle_rate),
+            ("errors", 500, cfg.error_rate),
+        ):
+            if roll < rate:
+                self._count(key)
+                return status, (
+                    BLOCK_PAGE if status != 500 else "<html><body>Fehler</body></html>"
+                )
+            roll -= rate
+
+        params = parse_qs(url.query)
+        query = params.get("_nkw", [""])[0]
+        preis = params.get("_udhi", [""])[0]
+        try:
+            page = max(1, int(params.get("_pgn", ["1"])[0]))
+        except ValueError:
+            page = 1
+        if roll < cfg.empty_rate or page > cfg.pages:
+            self._count("empty")
+            return 200, self.render(query, preis, page, cards=0)
+        self._count("pages")
+        self._count("cards", cfg.cards)
+        return 200, self.render(query, preis, page)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    mock: MockEbay  # pro Server gesetzt (start_server)
+
+    def do_GET(self):  # noqa: N802 (BaseHTTPRequestHandler-API)
+        status, html = self.mock.respond(self.path)
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "5")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        logger.debug("mock: " + fmt, *args)
+
+
+def start_server(
+    mock: MockEbay, host: str = "127.0.0.1", port: int = 0
+) -> ThreadingHTTPServer:
+    """
+    Startet den Nachbau in einem Hintergrund-Thread.
+
+    Returns:
+        Server; Basis-URL: f"http://{host}:{server.server_address[1]}".
+        Beenden mit server.shutdown() und server.server_close().
+    """
+    handler = type("MockHandler", (_Handler,), {"mock": mock})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-ebay", daemon=True).start()
+    return server
+
+
+# ----------------------------- CLI ----------------------------- #
+def add_config_args(parser: argparse.ArgumentParser) -> None:
+    """CLI-Flags für MockConfig (auch von load_test.py verwendet)."""
+    defaults = MockConfig()
+    parser.add_argument("--pages", type=int, default=defaults.pages)
+    parser.add_argument("--cards", type=int, default=defaults.cards)
+    parser.add_argument("--layout", choices=LAYOUTS, default=defaults.layout)
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+    parser.add_argument("--captcha-rate", type=float, default=defaults.captcha_rate)
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--empty-rate", type=float, default=defaults.empty_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(**{field: getattr(args, field) for field in MockConfig._fields})
+
+
+def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pricehunter eBay-Nachbau")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_cli_args(argv)
+    mock = MockEbay(config_from_args(args))
+    server = start_server(mock, args.host, args.port)
+    logger.info(
+        "eBay-Nachbau läuft auf http://%s:%d", args.host, server.server_address[1]
+    )
+    try:
+        while True:
+            time.sleep(60)
+            logger.info("Statistik: %s", mock.snapshot())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
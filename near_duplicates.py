@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Erkennung beinahe doppelter Angebote (MinHash + LSH)
+----------------------------------------------------
+Die exakte Deduplizierung in transform() (title + price + link) erkennt keine
+wiedereingestellten Angebote (neue Artikelnummer) oder Varianten, deren Titel
+sich nur leicht unterscheiden, z.B.:
+    'SKI ELAN EXPLORE 6 - 2024 - 160 cm -USED (022JG)'
+    'SKI ELAN EXPLORE 6 - 2024 - 160 cm -USED (MC013)'
+
+Ein paarweiser Vergleich aller Titel wäre quadratisch. Stattdessen:
+1. Titel normalisieren und in Zeichen-Shingles (SHINGLE_SIZE) zerlegen.
+2. MinHash-Signatur (NUM_PERM Hashfunktionen, NumPy-vektorisiert) pro Titel.
+3. LSH-Banding: Signaturen in BANDS Bänder teilen; nur Titel mit gleichem
+   Band-Bucket werden als Kandidatenpaar betrachtet.
+4. Kandidaten werden bestätigt, wenn die geschätzte Jaccard-Ähnlichkeit
+   >= SIMILARITY_THRESHOLD ist und die Preise nahe beieinander liegen.
+5. Bestätigte Paare werden per Union-Find zu Clustern zusammengefasst.
+
+Ergebnis: eine cluster_id pro Angebot (0, 1, 2, … in Reihenfolge des ersten
+Auftretens); Angebote ohne Nachbarn bilden einen eigenen Cluster.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections import defaultdict
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+SHINGLE_SIZE = 4
+NUM_PERM = 64
+BANDS = 16  # 16 Bänder à 4 Zeilen -> Kandidaten ab ca. 50 % Jaccard
+SIMILARITY_THRESHOLD = 0.6
+PRICE_REL_TOLERANCE = 0.15  # Preise höchstens 15 % auseinander …
+PRICE_ABS_TOLERANCE = 2.0  # … oder höchstens 2 Einheiten (günstige Artikel)
+MAX_BUCKET_PAIRS = 50  # grössere LSH-Buckets nur paarweise benachbart prüfen
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NOISE_RE = re.compile(r"[^\w]+")
+
+
+def _permutations(num_perm: int, seed: int = 1) -> tuple:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+_PERM_A, _PERM_B = _permutations(NUM_PERM)
+
+
+def normalize(title: str) -> str:
+    """Kleinschreibung, Satz-/Sonderzeichen zu einem Leerzeichen."""
+    return _NOISE_RE.sub(" ", (title or "").lower()).strip()
+
+
+def shingles(title: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Zeichen-Shingles eines normalisierten Titels als uint64-Hashes (crc32)."""
+    text = normalize(title)
+    if len(text) <= size:
+        grams = {text}
+    else:
+        grams = {text[i : i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) for g in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+def minhash_signatures(titles: Sequence[str], num_perm: int = NUM_PERM) -> np.ndarray:
+    """
+    MinHash-Signaturen (Form: len(titles) x num_perm, uint64).
+    """
+    a, b = (_PERM_A, _PERM_B) if num_perm == NUM_PERM else _permutations(num_perm)
+    signatures = np.empty((len(titles), num_perm), dtype=np.uint64)
+    for row, title in enumerate(titles):
+        hashes = shingles(title)
+        # (a*x + b) mod p, danach auf 32 Bit; Minimum über alle Shingles
+        values = (np.outer(a, hashes) + b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        signatures[row] = values.min(axis=1)
+    return signatures
+
+
+def _prices_close(p1: float, p2: float) -> bool:
+    if not (np.isfinite(p1) and np.isfinite(p2)):
+        return False
+    diff = abs(p1 - p2)
+    return diff <= PRICE_ABS_TOLERANCE or diff <= PRICE_REL_TOLERANCE * min(p1, p2)
+
+
+def _bucket_pairs(members: List[int]):
+    """Kandidatenpaare eines LSH-Buckets; sehr grosse Buckets nur linear."""
+    if len(members) <= MAX_BUCKET_PAIRS:
+        for pos, first in enumerate(members):
+            for other in members[pos + 1 :]:
+                yield first, other
+    else:
+        yield from zip(members, members[1:])
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def cluster_ids(
+    titles: Sequence[str],
+    prices: Optional[Sequence[float]] = None,
+    threshold: float = SIMILARITY_THRESHOLD,
+    bands: int = BANDS,
+) -> List[int]:
+    """
+    Gruppiert beinahe doppelte Angebote.
+
+    Args:
+        titles: Titel der Angebote.
+        prices: Preise (gleiche Länge); None = ohne Preisbedingung.
+        threshold: Mindest-Jaccard-Ähnlichkeit (geschätzt über MinHash).
+        bands: Anzahl LSH-Bänder (NUM_PERM muss durch bands teilbar sein).
+
+    Returns:
+        cluster_id pro Angebot (0-basiert, in Reihenfolge des ersten Auftretens).
+    """
+    n = len(titles)
+    if n == 0:
+        return []
+    signatures = minhash_signatures(titles)
+    rows = signatures.shape[1] // bands
+    price_arr = np.asarray(prices, dtype=np.float64) if prices is not None else None
+
+    uf = _UnionFind(n)
+    checked = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        chunk = signatures[:, band * rows : (band + 1) * rows]
+        for idx, key in enumerate(map(bytes, chunk)):
+            buckets[key].append(idx)
+        for members in buckets.values():
+            for first, other in _bucket_pairs(members):
+                if (first, other) in checked or uf.find(first) == uf.find(other):
+                    continue
+                checked.add((first, other))
+                similarity = np.mean(signatures[first] == signatures[other])
+                if similarity < threshold:
+                    continue
+                if price_arr is not None and not _prices_close(
+                    price_arr[first], price_arr[other]
+                ):
+                    continue
+                uf.union(first, other)
+
+    # Wurzeln auf fortlaufende IDs abbilden (Reihenfolge des ersten Auftretens)
+    ids: dict = {}
+    return [ids.setdefault(uf.find(i), len(ids)) for i in range(n)]
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalisierungs-Engine für Pricehunter
+--------------------------------------
+Vorkompilierte Hilfsfunktionen für die Datenbereinigung (Preise, Währungen,
+Herkunftsländer). Die Funktionen liefern exakt dieselben Ergebnisse wie die
+ursprünglichen Varianten in data_transformer_cleansing.py, vermeiden aber
+wiederholte Arbeit pro Aufruf:
+- Regex-Muster werden einmalig auf Modulebene kompiliert.
+- Die Währungserkennung nutzt eine einzige Alternations-Regex statt einer
+  Schleife über alle Einträge von CURRENCY_MAP.
+- Preis-/Versand-/Herkunftstexte wiederholen sich stark (z.B. 'Kostenloser Versand',
+  '+CHF 20,44 Versand', 'aus Deutschland') und werden per LRU-Cache memoisiert.
+
+Bewusst ohne pandas-Abhängigkeit, damit auch der Scraper sie günstig nutzen kann.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+# Grösse der LRU-Caches (Anzahl unterschiedlicher Eingabetexte)
+CACHE_SIZE = 8192
+
+CURRENCY_MAP = {
+    "€": "EUR",
+    "eur": "EUR",
+    "euro": "EUR",
+    "chf": "CHF",
+    "sfr": "CHF",
+    "fr.": "CHF",
+    "fr": "CHF",
+    "$": "USD",
+    "usd": "USD",
+    "£": "GBP",
+    "gbp": "GBP",
+}
+
+# Priorität wie bei der Iteration über CURRENCY_MAP: der erste Schlüssel (in
+# Dict-Reihenfolge), der im Text vorkommt, bestimmt die Währung.
+_CURRENCY_RANK = {key: rank for rank, key in enumerate(CURRENCY_MAP)}
+
+# Eine Alternation über alle Schlüssel (längste zuerst). Überlappende Schlüssel
+# ('eur'/'euro', 'fr'/'fr.'/'sfr', 'chf'/'fr') bilden jeweils auf dieselbe Währung ab,
+# daher genügt finditer über nicht-überlappende Treffer.
+_CURRENCY_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(CURRENCY_MAP, key=len, reverse=True))
+)
+
+_NOISE_WORDS_RE = re.compile(
+    r"(versand|inkl\.?|exkl\.?|inklusive|zzgl\.?|\+)", flags=re.IGNORECASE
+)
+_NON_NUMERIC_RE = re.compile(r"[^0-9\.,\s]")
+_ORIGIN_PREFIX_RE = re.compile(r"^\s*aus\s+", flags=re.IGNORECASE)
+
+GB_BAD_VARIANTS = frozenset(
+    {
+        "GroÃŸbritannien",
+        "GroÃbritannien",
+        "GroÃ£Âbritannien",
+        "GroÃYbritannien",  # Hinweis (Uni-Test): neue Variante
+        "Großbritannien",
+    }
+)
+
+
+# Währung aus Text extrahieren
+def extract_currency(text: str | float | int | None) -> str | None:
+    """
+    Versucht, eine Währung aus dem gegebenen Text zu erkennen.
+    Gibt ISO-ähnliche Kürzel (EUR/CHF/USD/GBP) zurück oder None.
+    """
+    if text is None:
+        return None
+    return _extract_currency_cached(str(text))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _extract_currency_cached(s: str) -> str | None:
+    found = {m.group(0) for m in _CURRENCY_RE.finditer(s.lower())}
+    if not found:
+        return None
+    return CURRENCY_MAP[min(found, key=_CURRENCY_RANK.__getitem__)]
+
+
+# Preise normalisieren
+def parse_number_eu(text: str | float | int | None) -> float | None:
+    """
+    Parst europäische/„gemischte“ Zahlendarstellungen in float.
+    Beispiele:
+        "3.040,06" -> 3040.06
+        "1,234"    -> 1.234  (interpretiert Komma als Dezimalzeichen, wenn
+                               plausible Stellenanzahl)
+        "1.234"    -> 1234.0 (Punkt als Tausender)
+        "+ 12,00 EUR Versand" -> 12.0
+    Gibt None zurück, wenn es nicht parsebar ist.
+    """
+    if text is None:
+        return None
+    return _parse_number_eu_cached(str(text))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_number_eu_cached(raw: str) -> float | None:
+    s = raw.strip()
+    if not s:
+        return None
+
+    # Störwörter/Zeichen entfernen (ohne Ziffern/.,,)
+    s = _NOISE_WORDS_RE.sub(" ", s)
+    s = _NON_NUMERIC_RE.sub("", s)  # nur Ziffern, Punkt, Komma, Space
+
+    s = s.strip()
+    if not s:
+        return None
+
+    # Heuristik: wenn beides vorkommt, '.' als Tausender, ',' als Dezimal
+    if "." in s and "," in s:
+        s = s.replace(".", "").replace(",", ".")
+    elif "," in s:
+        # Prüfe, ob das letzte Segment Dezimalstellen sein könnten
+        parts = s.split(",")
+        if len(parts[-1]) <= 3:
+            s = "".join(parts[:-1]).replace(".", "") + "." + parts[-1]
+        else:
+            # eher Tausendertrennzeichen
+            s = s.replace(",", "")
+
+    s = s.replace(" ", "")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+# Korrigiert fehlerhafte Darstellung von 'Grossbritannien'
+def fix_grossbritannien(value: str | None) -> str | None:
+    """
+    Korrigiert fehlerhafte Encodings von 'Großbritannien' auf 'Grossbritannien'.
+    Wir ändern *nur* bekannte defekte Varianten.
+    """
+    if value is None:
+        return None
+    s = str(value).strip()
+    if s in GB_BAD_VARIANTS:
+        return "Grossbritannien"
+    return s
+
+
+# Herkunft normalisieren ('aus Deutschland' -> 'Deutschland')
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_origin(value: str) -> str:
+    """
+    Entfernt das führende 'aus ', korrigiert 'Grossbritannien' und trimmt.
+    Entspricht der Spaltenlogik für 'product_origin' in transform().
+    """
+    return fix_grossbritannien(_ORIGIN_PREFIX_RE.sub("", value, count=1)).strip()
+
+
+def clear_caches() -> None:
+    """
+    Leert die Memo-Caches (z.B. für Benchmarks oder nach sehr grossen Läufen).
+    """
+    _extract_currency_cached.cache_clear()
+    _parse_number_eu_cached.cache_clear()
+    normalize_origin.cache_clear()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Volltextindex über Angebots-Titel (SQLite FTS5)
+-----------------------------------------------
+Bereinigte Angebote werden nach jedem Scrape in OFFER_DB_PATH übernommen
+(Upsert per eBay-Artikelnummer) und über ein FTS5-Index auf dem normalisierten
+Titel durchsuchbar gemacht. Statt pro Anfrage jeden Titel zu scannen, liefert
+der invertierte Index die passenden Zeilen direkt.
+
+Normalisierung (Titel und Suchtext gleich): Kleinschreibung, Akzente entfernt
+(Tokenizer unicode61), Zahlen und Einheiten getrennt ('176cm' -> '176 cm').
+
+Suchsyntax (match_expression):
+    176 cm        -> alle Wörter müssen vorkommen (AND)
+    expl*         -> Präfixsuche
+    "elan explore" bleibt ebenfalls AND über die Einzelwörter
+
+Zusätzlich merkt sich die Tabelle search_offers, welche Angebote zu welcher
+Suche (main.make_search_id) gehören; iter_offers liest Angebote seitenweise per
+Cursor (Schlüssel = interne id) für /api/offers und /api/searches/<id>/offers.
+
+Beispiel:
+    store = OfferStore()
+    store.index_frame(result.data, search_id="3f2a…")
+    rows = store.search("176 cm", product_name="Ski")
+    for row in store.iter_offers(search_id="3f2a…", fields=["title", "price"]): …
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+try:  # optional: deutlich schnellere JSON-Serialisierung für die API
+    import orjson
+except ImportError:  # pragma: no cover - abhängig von der Umgebung
+    orjson = None
+
+from offers import CLEAN_FIELD_MAP, Offer, item_id_from_link
+
+OFFER_DB_PATH = Path(__file__).resolve().parent / "offers.db"
+SEARCH_LIMIT = 500
+FETCH_SIZE = 500  # Zeilen pro fetchmany beim Streamen
+
+# Spalten der bereinigten CSV, die gespeichert werden
+OFFER_COLUMNS = (
+    "title",
+    "product_condition",
+    "price",
+    "currency",
+    "product_origin",
+    "shipping_cost",
+    "price_with_shipping",
+    "product_name",
+    "link",
+    "image",
+)
+# Felder für die API (Projektion über ?fields=)
+API_FIELDS = ("id", "item_id") + OFFER_COLUMNS
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS offers (
+    id                  INTEGER PRIMARY KEY,
+    item_id             TEXT NOT NULL UNIQUE,
+    title               TEXT NOT NULL,
+    title_norm          TEXT NOT NULL,
+    product_condition   TEXT,
+    price               REAL,
+    currency            TEXT,
+    product_origin      TEXT,
+    shipping_cost       REAL,
+    price_with_shipping REAL,
+    product_name        TEXT,
+    link                TEXT,
+    image               TEXT,
+    updated             REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_offers_product ON offers (product_name);
+CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+    title_norm, content='offers', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS offers_ai AFTER INSERT ON offers BEGIN
+    INSERT INTO offers_fts(rowid, title_norm) VALUES (new.id, new.title_norm);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_ad AFTER DELETE ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title_norm)
+    VALUES ('delete', old.id, old.title_norm);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_au AFTER UPDATE OF title_norm ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title_norm)
+    VALUES ('delete', old.id, old.title_norm);
+    INSERT INTO offers_fts(rowid, title_norm) VALUES (new.id, new.title_norm);
+END;
+CREATE TABLE IF NOT EXISTS search_offers (
+    search_id TEXT NOT NULL,
+    offer_id  INTEGER NOT NULL,
+    PRIMARY KEY (search_id, offer_id)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO offers (item_id, title, title_norm, {cols}, updated)
+VALUES (?, ?, ?, {marks}, ?)
+ON CONFLICT(item_id) DO UPDATE SET
+    title = excluded.title, title_norm = excluded.title_norm, {updates},
+    updated = excluded.updated
+""".format(
+    cols=", ".join(OFFER_COLUMNS[1:]),
+    marks=", ".join("?" for _ in OFFER_COLUMNS[1:]),
+    updates=", ".join(f"{c} = excluded.{c}" for c in OFFER_COLUMNS[1:]),
+)
+
+# Spalten in Reihenfolge der Offer-Felder (cluster_id ist nur pro Suche gültig)
+_OFFER_SELECT = ", ".join(
+    f"o.{CLEAN_FIELD_MAP[field]}" for field in Offer._fields if field != "cluster_id"
+)
+
+_LINK_SEARCH = """
+INSERT OR IGNORE INTO search_offers (search_id, offer_id)
+SELECT ?, id FROM offers WHERE item_id = ?
+"""
+
+_DIGIT_ALPHA_RE = re.compile(r"(?<=\d)(?=[^\W\d_])|(?<=[^\W\d_])(?=\d)")
+_TOKEN_RE = re.compile(r"[^\W_]+\*?")
+
+
+def normalize_title(title: str) -> str:
+    """Kleinschreibung + Zahl/Einheit trennen ('176cm' -> '176 cm')."""
+    return _DIGIT_ALPHA_RE.sub(" ", (title or "").lower())
+
+
+def match_expression(text: str) -> Optional[str]:
+    """
+    Übersetzt Sucheingaben in einen FTS5-Ausdruck (AND über alle Wörter,
+    'wort*' = Präfix). Sonderzeichen werden ignoriert -> keine FTS-Syntaxfehler.
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(normalize_title(text)):
+        prefix = token.endswith("*")
+        word = token.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " AND ".join(terms) or None
+
+
+class OfferStore:
+    """SQLite-Ablage bereinigter Angebote mit FTS5-Index auf dem Titel."""
+
+    def __init__(self, path: Union[str, Path] = OFFER_DB_PATH) -> None:
+        self.path = str(path)
+        self._local = threading.local()
+        self._shared = None
+        if self.path == ":memory:":  # eine gemeinsame Verbindung (Tests/Benchmarks)
+            self._shared = sqlite3.connect(self.path, check_same_thread=False)
+            self._shared.executescript(_SCHEMA)
+        else:
+            self._conn.executescript(_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:  # eine Verbindung pro Thread (Flask-Worker)
+            conn = self._local.conn = sqlite3.connect(self.path)
+        return conn
+
+    # ----------------------------- Schreiben ----------------------------- #
+    def index_rows(
+        self,
+        rows: Iterable[dict],
+        now: Optional[float] = None,
+        search_id: Optional[str] = None,
+    ) -> int:
+        """
+        Übernimmt bereinigte Zeilen (Spalten wie output_clean.csv) per Upsert.
+
+        Args:
+            rows: Zeilen als Dicts.
+            now: Zeitstempel für 'updated' (Standard: jetzt).
+            search_id: Suche, zu der die Zeilen gehören; ersetzt deren bisherige
+                Zuordnung (None = keine Zuordnung).
+
+        Returns:
+            Anzahl verarbeiteter Zeilen.
+        """
+        now = time.time() if now is None else now
+        params = [
+            (
+                item_id_from_link(str(row.get("link") or "")),
+                str(row.get("title") or ""),
+                normalize_title(str(row.get("title") or "")),
+                *(row.get(col) for col in OFFER_COLUMNS[1:]),
+                now,
+            )
+            for row in rows
+        ]
+        with self._conn:
+            self._conn.executemany(_UPSERT, params)
+            if search_id is not None:
+                self._conn.execute(
+                    "DELETE FROM search_offers WHERE search_id = ?", (search_id,)
+                )
+                self._conn.executemany(
+                    _LINK_SEARCH, ((search_id, p[0]) for p in params)
+                )
+        return len(params)
+
+    def index_frame(self, df, search_id: Optional[str] = None) -> int:
+        """Übernimmt einen bereinigten DataFrame (TransformResult.data)."""
+        if df is None or len(df) == 0:
+            return 0
+        cols = [c for c in OFFER_COLUMNS if c in df.columns]
+        frame = df[cols].astype(object).where(df[cols].notna(), None)
+        return self.index_rows(frame.to_dict("records"), search_id=search_id)
+
+    # ----------------------------- Suchen ----------------------------- #
+    def search(
+        self,
+        text: str,
+        product_name: Optional[str] = None,
+        limit: int = SEARCH_LIMIT,
+    ) -> List[Offer]:
+        """
+        Volltextsuche über die Titel (AND/Präfix, siehe match_expression).
+
+        Args:
+            text: Sucheingabe, z.B. '176 cm' oder 'elan expl*'.
+            product_name: Optional nur Angebote dieser Suche (z.B. 'Ski').
+            limit: Maximale Trefferzahl.
+
+        Returns:
+            Angebote (Offer, Felder wie load_rows_for_table).
+        """
+        expression = match_expression(text)
+        if expression is None:
+            return []
+        sql = (
+            f"SELECT {_OFFER_SELECT} "
+            "FROM offers_fts JOIN offers o ON o.id = offers_fts.rowid "
+            "WHERE offers_fts MATCH ?"
+        )
+        params: list = [expression]
+        if product_name:
+            sql += " AND o.product_name = ? COLLATE NOCASE"
+            params.append(product_name)
+        sql += " LIMIT ?"
+        params.append(limit)
+        return [
+            Offer.create(*("" if v is None else _fmt(v) for v in row))
+            for row in self._conn.execute(sql, params)
+        ]
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+
+    # ----------------------------- API ----------------------------- #
+    def has_search(self, search_id: str) -> bool:
+        """True, wenn zu search_id Angebote gespeichert sind."""
+        row = self._conn.execute(
+            "SELECT 1 FROM search_offers WHERE search_id = ? LIMIT 1", (search_id,)
+        ).fetchone()
+        return row is not None
+
+    def iter_offers(
+        self,
+        fields: Sequence[str] = API_FIELDS,
+        search_id: Optional[str] = None,
+        product_name: Optional[str] = None,
+        after: int = 0,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Liefert Angebote aufsteigend nach id (Keyset-Pagination: after = letzte
+        gelieferte id). Zeilen werden in Blöcken von FETCH_SIZE gelesen, der
+        Speicherbedarf ist damit unabhängig von der Treffermenge.
+
+        Args:
+            fields: Felder pro Zeile (Teilmenge von API_FIELDS).
+            search_id: Nur Angebote dieser Suche.
+            product_name: Nur Angebote dieses Produkts (z.B. 'Ski').
+            after: Cursor; nur Angebote mit id > after.
+            limit: Maximale Anzahl (None = alle).
+
+        Yields:
+            Dict pro Angebot mit den gewünschten Feldern.
+        """
+        unknown = [f for f in fields if f not in API_FIELDS]
+        if unknown:
+            raise ValueError(f"Unbekannte Felder: {', '.join(unknown)}")
+        sql = f"SELECT {', '.join(f'o.{f}' for f in fields)} FROM offers o"
+        params: list = []
+        if search_id is not None:
+            sql += " JOIN search_offers s ON s.offer_id = o.id AND s.search_id = ?"
+            params.append(search_id)
+        sql += " WHERE o.id > ?"
+        params.append(after)
+        if product_name:
+            sql += " AND o.product_name = ? COLLATE NOCASE"
+            params.append(product_name)
+        sql += " ORDER BY o.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        cursor = self._conn.execute(sql, params)
+        try:
+            while True:
+                batch = cursor.fetchmany(FETCH_SIZE)
+                if not batch:
+                    return
+                for row in batch:
+                    yield dict(zip(fields, row))
+        finally:
+            cursor.close()
+
+
+def _fmt(value) -> str:
+    # Zahlen wie in output_clean.csv darstellen (31.44, 0.0)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def dumps(obj) -> bytes:
+    """JSON als UTF-8-Bytes (orjson, falls installiert)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
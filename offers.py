@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Angebots-Datensatz für Pricehunter
+----------------------------------
+Kompakter, typisierter Datensatz (NamedTuple -> keine __dict__ pro Zeile) für
+ein eBay-Angebot. Wird durchgängig verwendet:
+- Scraper (main.parse_items_from_html / scrape_all) erzeugt Offer-Objekte
+  mit den Rohwerten (Felder wie CSV_DATA_FIELDS).
+- Transformer (data_transformer_cleansing) wandelt Offer-Listen in DataFrames
+  und bereinigte DataFrames zurück in Offer-Objekte.
+- Templates lesen die Attribute direkt (zeile.titel, zeile.preis, ...).
+
+Wiederkehrende Werte mit geringer Kardinalität (Land, Zustand, Währung) werden
+per sys.intern dedupliziert, damit tausende Zeilen dieselbe String-Instanz teilen.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from typing import Iterable, Iterator, Mapping, NamedTuple, Optional
+
+# Felder der Rohdaten-CSV (Reihenfolge = Spaltenreihenfolge in output_scraper.csv)
+RAW_FIELDS = ("titel", "aktualitaet", "preis", "land", "versand", "link", "image")
+
+# Zuordnung Offer-Feld -> Spalte in der bereinigten CSV (output_clean.csv)
+CLEAN_FIELD_MAP = {
+    "titel": "title",
+    "aktualitaet": "product_condition",
+    "preis": "price",
+    "land": "product_origin",
+    "versand": "shipping_cost",
+    "link": "link",
+    "image": "image",
+    "waehrung": "currency",
+    "cluster_id": "cluster_id",
+}
+
+# eBay-Artikelnummer aus /itm/<id> bzw. /itm/<slug>/<id>
+_ITEM_ID_RE = re.compile(r"/itm/(?:[^/?#]+/)?(\d+)")
+
+
+def item_id_from_link(link: str) -> str:
+    """
+    Liefert die eBay-Artikelnummer eines Angebotslinks (stabil über Tracking-
+    Parameter hinweg). Ohne erkennbare Nummer wird der Link ohne Query verwendet.
+    """
+    match = _ITEM_ID_RE.search(link or "")
+    if match:
+        return match.group(1)
+    return (link or "").split("?", 1)[0]
+
+
+def intern_value(value: Optional[str]) -> str:
+    """
+    Interniert kurze, häufig wiederkehrende Strings (z.B. 'Schweiz', 'Gebraucht', 'CHF').
+    """
+    if not value:
+        return ""
+    return sys.intern(value)
+
+
+class Offer(NamedTuple):
+    """
+    Ein Angebot. Die ersten sieben Felder entsprechen den Rohdaten-Spalten
+    (RAW_FIELDS); 'waehrung' und 'cluster_id' (Gruppe beinahe doppelter
+    Angebote) sind erst nach der Bereinigung gesetzt.
+    """
+
+    titel: str = ""
+    aktualitaet: str = ""
+    preis: str = ""
+    land: str = ""
+    versand: str = ""
+    link: str = ""
+    image: str = ""
+    waehrung: str = ""
+    cluster_id: str = ""
+
+    @classmethod
+    def create(
+        cls,
+        titel: str = "",
+        aktualitaet: str = "",
+        preis: str = "",
+        land: str = "",
+        versand: str = "",
+        link: str = "",
+        image: str = "",
+        waehrung: str = "",
+        cluster_id: str = "",
+    ) -> "Offer":
+        """
+        Erzeugt ein Offer und interniert dabei Zustand, Land und Währung.
+        """
+        return cls(
+            titel,
+            intern_value(aktualitaet),
+            preis,
+            intern_value(land),
+            versand,
+            link,
+            image,
+            intern_value(waehrung),
+            cluster_id,
+        )
+
+    @classmethod
+    def from_raw(cls, data: Mapping) -> "Offer":
+        """
+        Baut ein Offer aus einem Rohdaten-Mapping (Schlüssel wie RAW_FIELDS).
+        """
+        return cls.create(**{f: str(data.get(f) or "") for f in RAW_FIELDS})
+
+    @classmethod
+    def from_clean_row(cls, row: Mapping) -> "Offer":
+        """
+        Baut ein Offer aus einer Zeile der bereinigten CSV (Spalten wie CLEAN_FIELD_MAP).
+        """
+        return cls.create(
+            **{
+                field: (row.get(col) or "").strip()
+                for field, col in CLEAN_FIELD_MAP.items()
+            }
+        )
+
+    @property
+    def item_id(self) -> str:
+        """eBay-Artikelnummer (siehe item_id_from_link)."""
+        return item_id_from_link(self.link)
+
+    def raw_values(self) -> tuple:
+        """
+        Werte in Reihenfolge der Rohdaten-CSV (für csv.writer).
+        """
+        return self[: len(RAW_FIELDS)]
+
+
+def as_offers(items: Iterable) -> Iterator[Offer]:
+    """
+    Normalisiert gemischte Eingaben (Offer oder Dict) zu Offer-Objekten.
+    """
+    for item in items:
+        yield item if isinstance(item, Offer) else Offer.from_raw(item)
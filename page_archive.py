@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Roh-HTML-Archiv für Pricehunter
+-------------------------------
+Ersetzt das synchrone Überschreiben von debug_page1.html: jede geladene Suchseite
+wird komprimiert und inhaltsadressiert (SHA-256 des HTML) abgelegt, zusammen mit
+Suchbegriff, Seitennummer, URL und Zeitstempel im Index.
+
+Aufbau von ARCHIVE_DIR (Standard: <Projekt>/archive):
+    pages/ab/abcdef….html.zst   (zstd, falls 'zstandard' installiert ist)
+    pages/ab/abcdef….html.gz    (sonst gzip)
+    index.jsonl                 eine JSON-Zeile pro gespeicherter Seite
+
+- store() legt die Seite nur in eine Queue; ein Hintergrund-Thread komprimiert und
+  schreibt, damit der Scrape-/Request-Pfad nicht auf die Platte wartet.
+- Identische Seiten werden nur einmal gespeichert (gleicher Digest).
+- Jeder Eintrag trägt die Bewertung der Seite (classify_page: ok, blocked, …);
+  gesperrte oder leere Versuche bleiben so zur Diagnose erhalten, zählen aber
+  nicht als Suchergebnis.
+- prune() begrenzt das Archiv auf MAX_AGE und MAX_BYTES (älteste Seiten zuerst);
+  der Writer-Thread ruft es höchstens alle PRUNE_INTERVAL Sekunden auf.
+- reparse liest das Archiv, parst die Seiten (ohne Sperr-/Leerseiten) parallel in Worker-Prozessen
+  mit main.parse_items_from_html und erzeugt Roh- und Clean-CSV neu – ohne eBay
+  erneut zu scrapen (z.B. nachdem Selektoren repariert wurden).
+
+CLI:
+    python page_archive.py reparse [--query ski] [--workers 4] [--raw PATH] [--output PATH]
+    python page_archive.py prune [--max-age-days 30] [--max-mb 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from rate_governor import OK, RETRY_OUTCOMES
+
+try:  # optional: bessere Kompression und schneller als gzip
+    import zstandard
+except ImportError:  # pragma: no cover - abhängig von der Umgebung
+    zstandard = None
+
+logger = logging.getLogger("ebay_scraper.archive")
+
+ARCHIVE_DIR = Path(__file__).resolve().parent / "archive"
+INDEX_NAME = "index.jsonl"
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+MAX_AGE = 30 * 86400.0  # Sekunden; ältere Seiten werden entfernt
+MAX_BYTES = 500 * 2**20  # komprimierte Seiten insgesamt
+PRUNE_INTERVAL = 3600.0  # Sekunden zwischen zwei automatischen prune()-Läufen
+
+
+class ArchiveEntry(NamedTuple):
+    """Eine Zeile aus index.jsonl."""
+
+    digest: str
+    codec: str  # 'gz' oder 'zst'
+    query: str
+    page: int
+    url: str
+    timestamp: float
+    outcome: str = OK  # classify_page-Ergebnis (ältere Einträge: immer 'ok')
+
+
+def query_from_url(url: str) -> str:
+    """Liest den Suchbegriff (_nkw) aus einer eBay-Such-URL."""
+    values = parse_qs(urlsplit(url).query).get("_nkw")
+    return values[0] if values else ""
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError(
+                "Archivseite ist zstd-komprimiert, 'zstandard' ist nicht installiert."
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """
+    Inhaltsadressiertes Seitenarchiv mit Hintergrund-Writer.
+
+        archive = PageArchive(Path("archive"))
+        archive.store(html, url, page=1, query="ski")
+        archive.flush()  # z.B. in Tests / vor reparse
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path] = ARCHIVE_DIR,
+        codec: Optional[str] = None,
+        max_age: Optional[float] = MAX_AGE,
+        max_bytes: Optional[int] = MAX_BYTES,
+    ) -> None:
+        self.root = Path(root)
+        self.codec = codec or ("zst" if zstandard is not None else "gz")
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()  # Schreiben vs. prune (pro Prozess)
+        self._last_prune: Optional[float] = None
+
+    # ----------------------------- Schreiben ----------------------------- #
+    def store(
+        self,
+        html: str,
+        url: str,
+        page: int,
+        query: Optional[str] = None,
+        outcome: str = OK,
+    ) -> str:
+        """
+        Übergibt eine Seite an den Hintergrund-Writer (blockiert nicht).
+
+        Args:
+            html: Seitenquelltext.
+            url: Geladene URL.
+            page: Seitennummer (1-basiert).
+            query: Suchbegriff (None = aus _nkw der URL).
+            outcome: Bewertung der Seite (rate_governor.classify_page).
+
+        Returns:
+            SHA-256-Digest des HTML (Schlüssel im Archiv).
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        entry = ArchiveEntry(
+            digest=digest,
+            codec=self.codec,
+            query=query if query is not None else query_from_url(url),
+            page=page,
+            url=url,
+            timestamp=time.time(),
+            outcome=outcome,
+        )
+        self._ensure_writer()
+        self._queue.put((entry, data))
+        return digest
+
+    def flush(self) -> None:
+        """Wartet, bis alle eingereihten Seiten geschrieben sind."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Schreibt ausstehende Seiten und beendet den Writer-Thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._writer, name="page-archive-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+                self._maybe_prune()
+            except Exception:
+                logger.exception("Seite konnte nicht archiviert werden.")
+            finally:
+                self._queue.task_done()
+
+    def _maybe_prune(self) -> None:
+        now = time.monotonic()
+        if self._last_prune is None or now - self._last_prune >= PRUNE_INTERVAL:
+            self._last_prune = now
+            self.prune()
+
+    def _write(self, entry: ArchiveEntry, data: bytes) -> None:
+        path = self.blob_path(entry)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(_compress(data, entry.codec))
+            os.replace(tmp, path)
+        # Eine Zeile pro write() mit O_APPEND -> auch bei mehreren Prozessen intakt
+        line = json.dumps(entry._asdict(), ensure_ascii=False) + "\n"
+        with self._index_lock:
+            fd = os.open(
+                self.root / INDEX_NAME, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+
+    def prune(
+        self, max_age: Optional[float] = None, max_bytes: Optional[int] = None
+    ) -> int:
+        """
+        Entfernt Seiten, die älter als max_age sind, und danach die ältesten,
+        bis die komprimierten Seiten höchstens max_bytes belegen.
+
+        Args:
+            max_age: Sekunden (None = self.max_age; beide None = ohne Altersgrenze).
+            max_bytes: Bytes (None = self.max_bytes; beide None = ohne Grössengrenze).
+
+        Returns:
+            Anzahl gelöschter Seitendateien.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        index = self.root / INDEX_NAME
+        with self._index_lock:
+            try:
+                data = index.read_bytes()
+            except FileNotFoundError:
+                return 0
+            lines = [line for line in data.splitlines(keepends=True) if line.strip()]
+            entries = [ArchiveEntry(**json.loads(line)) for line in lines]
+            cutoff = time.time() - max_age if max_age is not None else None
+
+            # Neueste zuerst behalten, solange Alter und Gesamtgrösse passen
+            keep = [False] * len(entries)
+            sizes: Dict[str, int] = {}
+            total = 0
+            for i in range(len(entries) - 1, -1, -1):
+                entry = entries[i]
+                if cutoff is not None and entry.timestamp < cutoff:
+                    continue
+                if entry.digest not in sizes:
+                    try:
+                        size = self.blob_path(entry).stat().st_size
+                    except FileNotFoundError:
+                        continue
+                    if max_bytes is not None and total + size > max_bytes:
+                        continue
+                    sizes[entry.digest] = size
+                    total += size
+                keep[i] = True
+            if all(keep):
+                return 0
+
+            kept = [line for line, k in zip(lines, keep) if k]
+            # Seitendateien, auf die kein behaltener Eintrag mehr zeigt
+            orphans = {e.digest: e for e, k in zip(entries, keep) if not k}
+            for digest in sizes:
+                orphans.pop(digest, None)
+            tmp = index.with_name(index.name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.writelines(kept)
+                # Von anderen Prozessen inzwischen angehängte Zeilen übernehmen
+                with open(index, "rb") as current:
+                    current.seek(len(data))
+                    f.write(current.read())
+            os.replace(tmp, index)
+
+        removed = 0
+        for entry in orphans.values():
+            try:
+                self.blob_path(entry).unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        logger.info("Seitenarchiv bereinigt: %d Seiten entfernt.", removed)
+        return removed
+
+    # ----------------------------- Lesen ----------------------------- #
+    def blob_path(self, entry: ArchiveEntry) -> Path:
+        return (
+            self.root
+            / "pages"
+            / entry.digest[:2]
+            / f"{entry.digest}.html.{entry.codec}"
+        )
+
+    def entries(self, query: Optional[str] = None) -> Iterator[ArchiveEntry]:
+        """
+        Liefert die Indexeinträge in Schreibreihenfolge (optional nur eines Suchbegriffs).
+        """
+        index = self.root / INDEX_NAME
+        if not index.exists():
+            return
+        with open(index, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = ArchiveEntry(**json.loads(line))
+                if query is None or entry.query == query:
+                    yield entry
+
+    def load(self, entry: ArchiveEntry) -> str:
+        """Liest und dekomprimiert eine archivierte Seite."""
+        return _decompress(self.blob_path(entry).read_bytes(), entry.codec).decode(
+            "utf-8"
+        )
+
+
+_ARCHIVES: Dict[Path, PageArchive] = {}
+_ARCHIVES_LOCK = threading.Lock()
+
+
+def open_archive(root: Union[str, Path] = ARCHIVE_DIR) -> PageArchive:
+    """
+    Gemeinsame PageArchive-Instanz pro Verzeichnis (ein Writer-Thread pro Prozess).
+    """
+    root = Path(root).resolve()
+    with _ARCHIVES_LOCK:
+        archive = _ARCHIVES.get(root)
+        if archive is None:
+            archive = _ARCHIVES[root] = PageArchive(root)
+        return archive
+
+
+@atexit.register
+def _close_archives() -> None:
+    for archive in list(_ARCHIVES.values()):
+        archive.close()
+
+
+# ----------------------------- Reparse ----------------------------- #
+def _parse_archived(args: tuple) -> list:
+    """Worker (Prozess): dekomprimiert eine Seite und parst die Angebote."""
+    import main
+
+    root, entry = args
+    html = PageArchive(root).load(ArchiveEntry(*entry))
+    return main.parse_items_from_html(html, set())
+
+
+def reparse(
+    root: Union[str, Path] = ARCHIVE_DIR,
+    query: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> list:
+    """
+    Parst alle (bzw. die zu query gehörenden) archivierten Seiten parallel neu.
+
+    Args:
+        root: Archivverzeichnis.
+        query: Nur Seiten dieses Suchbegriffs (None = alle).
+        workers: Anzahl Worker-Prozesse (None = CPU-Anzahl).
+
+    Returns:
+        Angebote (Offer) in Archivreihenfolge, ohne doppelte Links.
+    """
+    archive = PageArchive(root)
+    unique: Dict[str, ArchiveEntry] = {}
+    for entry in archive.entries(query):
+        if entry.outcome in RETRY_OUTCOMES:  # Captcha-/Sperrseiten, leere Versuche
+            continue
+        unique.setdefault(entry.digest, entry)  # gleiche Seite nur einmal parsen
+    if not unique:
+        return []
+
+    jobs = [(str(archive.root), tuple(entry)) for entry in unique.values()]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(_parse_archived, jobs, chunksize=4))
+
+    rows, seen_links = [], set()
+    for page_rows in pages:
+        for offer in page_rows:
+            if offer.link not in seen_links:
+                seen_links.add(offer.link)
+                rows.append(offer)
+    logger.info("Reparse: %d Seiten, %d Angebote", len(jobs), len(rows))
+    return rows
+
+
+def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    import main
+
+    parser = argparse.ArgumentParser(description="Pricehunter Seitenarchiv")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("reparse", help="Archivierte Seiten neu parsen und bereinigen")
+    rp.add_argument("--archive", type=Path, default=ARCHIVE_DIR)
+    rp.add_argument("--query", default=None, help="Nur Seiten dieses Suchbegriffs")
+    rp.add_argument("--workers", type=int, default=None)
+    rp.add_argument("--raw", type=Path, default=main.CSV_DATA_PATH)
+    rp.add_argument("--output", type=Path, default=main.CLEANED_DATA_PATH)
+    pr = sub.add_parser("prune", help="Alte Seiten entfernen (Alter, Gesamtgrösse)")
+    pr.add_argument("--archive", type=Path, default=ARCHIVE_DIR)
+    pr.add_argument("--max-age-days", type=float, default=MAX_AGE / 86400)
+    pr.add_argument("--max-mb", type=float, default=MAX_BYTES / 2**20)
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    import main
+    from data_transformer_cleansing import cleanup
+
+    args = parse_cli_args(argv)
+    if args.command == "prune":
+        removed = PageArchive(args.archive).prune(
+            max_age=args.max_age_days * 86400, max_bytes=int(args.max_mb * 2**20)
+        )
+        print(f"{removed} Seiten entfernt.")
+        return 0
+    rows = reparse(args.archive, query=args.query, workers=args.workers)
+    if not rows:
+        logger.error("Keine archivierten Seiten gefunden (%s).", args.archive)
+        return 1
+    main.save_to_csv(rows, args.raw)
+    result = cleanup(args.raw, args.output)
+    logger.info(
+        "Neu erzeugt: %s (%d Zeilen, %d in Quarantäne)",
+        args.output,
+        len(result.data),
+        len(result.quarantine),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vorwärmen beliebter Suchen
+--------------------------
+Das Such-Log (search_log.py) zeigt, welche Suchen – normalisierter Suchbegriff
+wie in der eBay-URL (main.encode_query_limit_5) + Maximalpreis – immer wieder
+eingegeben werden. Der Prewarmer scrapt und bereinigt diese Suchen vorab und legt
+das Ergebnis als versioniertes Ausgabeverzeichnis ab (main.finish_scrape mit
+publish=False). Kommt die Suche wieder, veröffentlicht main.serve_warm dieses
+Verzeichnis, statt den Browser zu starten.
+
+Rücksicht auf laufende Suchen:
+- nur im Leerlauf: letzte Suche länger als IDLE_AFTER her und Systemlast pro
+  CPU unter MAX_LOAD (vor jeder einzelnen Suche erneut geprüft)
+- niedrige Priorität: nice PREWARM_NICE für den Prewarm-Thread und damit auch
+  für den von ihm gestarteten Browser
+- Budget: höchstens MAX_PER_CYCLE Suchen pro Durchgang und HOURLY_BUDGET
+  Sekunden Scrape-Zeit pro Stunde
+
+Der Bericht (report) zeigt die Trefferquote der Nachfragen und die eingesparte
+Wartezeit (Dauer des Vorab-Scrapes minus Zeit fürs Veröffentlichen) – auch über
+/api/prewarm.
+
+CLI:
+    python prewarm.py [--once] [--report]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Set, Union
+
+from offers import Offer
+from search_log import PopularSearch, SearchLog, open_search_log
+
+logger = logging.getLogger("ebay_scraper.prewarm")
+
+# ----------------------------- Konfiguration ----------------------------- #
+PREWARM_DB_PATH = Path(__file__).resolve().parent / "prewarm.db"
+TOP_N = 10  # so viele beliebte Suchen werden betrachtet …
+MIN_HITS = 2  # … sofern sie mindestens so oft eingegeben wurden
+POPULAR_WINDOW = 7 * 86400.0  # Sekunden Such-Log, die zählen
+MAX_AGE = 1800.0  # so lange gilt eine vorgewärmte Suche als aktuell
+REFRESH_AFTER = 1200.0  # danach wird sie im nächsten Leerlauf erneuert
+IDLE_AFTER = 120.0  # Sekunden seit der letzten Suche
+MAX_LOAD = 0.5  # Load Average (1 min) pro CPU
+PREWARM_NICE = 10
+MAX_PER_CYCLE = 3
+HOURLY_BUDGET = 900.0  # Sekunden Scrape-Zeit pro Stunde
+CHECK_INTERVAL = 60.0
+BUSY_TIMEOUT_MS = 5000
+CLEAN_FILE_NAME = (
+    "output_clean.csv"  # wie main.CLEANED_DATA_PATH im Versionsverzeichnis
+)
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS warm_searches (
+    search_id      TEXT PRIMARY KEY,
+    query          TEXT NOT NULL,
+    preis          TEXT NOT NULL,
+    out_dir        TEXT NOT NULL,
+    offers         INTEGER NOT NULL,
+    scrape_seconds REAL NOT NULL,
+    warmed_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prewarm_runs (
+    id        INTEGER PRIMARY KEY,
+    ts        REAL NOT NULL,
+    search_id TEXT NOT NULL,
+    seconds   REAL NOT NULL,
+    ok        INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lookups (
+    id            INTEGER PRIMARY KEY,
+    ts            REAL NOT NULL,
+    search_id     TEXT NOT NULL,
+    hit           INTEGER NOT NULL,
+    saved_seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prewarm_runs_ts ON prewarm_runs (ts);
+CREATE INDEX IF NOT EXISTS idx_lookups_ts ON lookups (ts);
+"""
+
+
+class WarmSearch(NamedTuple):
+    """Eine vorab gescrapte und bereinigte Suche."""
+
+    search_id: str
+    query: str
+    preis: str
+    out_dir: str  # Versionsverzeichnis (main.new_output_dir)
+    offers: int  # Anzahl Angebote (Rohdaten)
+    scrape_seconds: float  # so lange hätte die Suche sonst gedauert
+    warmed_at: float
+
+
+class PrewarmReport(NamedTuple):
+    """Trefferquote und Aufwand des Vorwärmens."""
+
+    lookups: int
+    hits: int
+    hit_rate: float
+    saved_seconds: float
+    runs: int
+    failed_runs: int
+    scrape_seconds: float
+
+
+# ----------------------------- Speicher ----------------------------- #
+class PrewarmStore:
+    """Vorgewärmte Suchen, Läufe und Nachfragen (SQLite, von allen Prozessen geteilt)."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = PREWARM_DB_PATH,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = str(path)
+        self.clock = clock
+        self._local = threading.local()
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:  # eine Verbindung pro Thread, Autocommit
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def save(self, warm: WarmSearch) -> None:
+        """Speichert (bzw. ersetzt) die vorgewärmte Version einer Suche."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO warm_searches VALUES (?, ?, ?, ?, ?, ?, ?)", warm
+        )
+
+    def lookup(self, search_id: str, max_age: float = MAX_AGE) -> Optional[WarmSearch]:
+        """
+        Vorgewärmte Suche, falls sie jünger als max_age ist und ihre bereinigte
+        CSV noch existiert (ältere Versionen räumt main.prune_output_versions ab).
+        """
+        row = self._conn.execute(
+            "SELECT * FROM warm_searches WHERE search_id = ? AND warmed_at >= ?",
+            (search_id, self.clock() - max_age),
+        ).fetchone()
+        if row is None:
+            return None
+        warm = WarmSearch(*row)
+        if not (Path(warm.out_dir) / CLEAN_FILE_NAME).exists():
+            return None
+        return warm
+
+    def fresh_ids(self, since: float) -> Set[str]:
+        """Suchen, die seit since vorgewärmt wurden."""
+        rows = self._conn.execute(
+            "SELECT search_id FROM warm_searches WHERE warmed_at >= ?", (since,)
+        )
+        return {search_id for (search_id,) in rows}
+
+    def record_run(self, search_id: str, seconds: float, ok: bool) -> None:
+        self._conn.execute(
+            "INSERT INTO prewarm_runs (ts, search_id, seconds, ok) VALUES (?, ?, ?, ?)",
+            (self.clock(), search_id, seconds, int(ok)),
+        )
+
+    def spent(self, since: float) -> float:
+        """Scrape-Zeit aller Läufe seit since (für das Stundenbudget)."""
+        (seconds,) = self._conn.execute(
+            "SELECT COALESCE(SUM(seconds), 0) FROM prewarm_runs WHERE ts >= ?",
+            (since,),
+        ).fetchone()
+        return seconds
+
+    def record_lookup(
+        self, search_id: str, warm: Optional[WarmSearch], serve_seconds: float
+    ) -> None:
+        """Zählt eine Nachfrage; bei einem Treffer mit eingesparter Wartezeit."""
+        saved = 0.0 if warm is None else max(0.0, warm.scrape_seconds - serve_seconds)
+        self._conn.execute(
+            "INSERT INTO lookups (ts, search_id, hit, saved_seconds) VALUES (?, ?, ?, ?)",
+            (self.clock(), search_id, int(warm is not None), saved),
+        )
+
+    def report(self, since: Optional[float] = None) -> PrewarmReport:
+        """
+        Bericht über Nachfragen und Läufe.
+
+        Args:
+            since: Nur ab diesem Zeitpunkt (Unix-Sekunden); None = alles.
+        """
+        since = since or 0.0
+        lookups, hits, saved = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(hit), 0), COALESCE(SUM(saved_seconds), 0) "
+            "FROM lookups WHERE ts >= ?",
+            (since,),
+        ).fetchone()
+        runs, failed, spent = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(1 - ok), 0), COALESCE(SUM(seconds), 0) "
+            "FROM prewarm_runs WHERE ts >= ?",
+            (since,),
+        ).fetchone()
+        return PrewarmReport(
+            lookups=lookups,
+            hits=hits,
+            hit_rate=round(hits / lookups, 3) if lookups else 0.0,
+            saved_seconds=round(saved, 1),
+            runs=runs,
+            failed_runs=failed,
+            scrape_seconds=round(spent, 1),
+        )
+
+
+# ----------------------------- Prewarmer ----------------------------- #
+def _default_runner(query: str, preis: str) -> List[Offer]:
+    import main
+
+    return main.run_scrape(query, preis, write_output=False)
+
+
+def _default_finisher(rows: List[Offer], search_id: str) -> Path:
+    import main
+
+    return main.finish_scrape(rows, search_id=search_id, publish=False)
+
+
+def _search_id(query: str, preis: str) -> str:
+    import main
+
+    return main.make_search_id(query, preis)
+
+
+def load_per_cpu() -> float:
+    """Load Average (1 min) pro CPU; 0.0, wo das System keinen liefert."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+def lower_priority(nice: int = PREWARM_NICE) -> None:
+    """
+    Senkt die CPU-Priorität des aufrufenden Threads (Linux; sonst des Prozesses).
+    Von hier gestartete Prozesse (Browser) erben den Wert.
+    """
+    who = threading.get_native_id() if sys.platform.startswith("linux") else 0
+    try:
+        os.setpriority(
+            os.PRIO_PROCESS, who, max(nice, os.getpriority(os.PRIO_PROCESS, who))
+        )
+    except (AttributeError, OSError) as e:
+        logger.debug("Priorität nicht geändert: %s", e)
+
+
+class Prewarmer:
+    """
+    Wärmt beliebte Suchen im Leerlauf vor (beliebteste zuerst, im Rahmen des Budgets).
+    """
+
+    def __init__(
+        self,
+        store: PrewarmStore,
+        search_log: SearchLog,
+        runner: Callable[[str, str], List[Offer]] = _default_runner,
+        finisher: Callable[[List[Offer], str], Path] = _default_finisher,
+        clock: Callable[[], float] = time.time,
+        load: Callable[[], float] = load_per_cpu,
+        max_per_cycle: int = MAX_PER_CYCLE,
+        hourly_budget: float = HOURLY_BUDGET,
+        idle_after: float = IDLE_AFTER,
+    ) -> None:
+        self.store = store
+        self.search_log = search_log
+        self.runner = runner
+        self.finisher = finisher
+        self.clock = clock
+        self.load = load
+        self.max_per_cycle = max_per_cycle
+        self.hourly_budget = hourly_budget
+        self.idle_after = idle_after
+
+    def is_idle(self) -> bool:
+        """Keine Suche seit idle_after Sekunden und geringe Systemlast."""
+        last = self.search_log.last_search()
+        if last is not None and self.clock() - last < self.idle_after:
+            return False
+        return self.load() < MAX_LOAD
+
+    def budget_left(self) -> float:
+        """Verbleibende Scrape-Sekunden der laufenden Stunde."""
+        return self.hourly_budget - self.store.spent(self.clock() - 3600)
+
+    def candidates(self) -> List[PopularSearch]:
+        """Beliebte Suchen ohne aktuelle vorgewärmte Version (beliebteste zuerst)."""
+        now = self.clock()
+        fresh = self.store.fresh_ids(now - REFRESH_AFTER)
+        return [
+            p
+            for p in self.search_log.popular(TOP_N, since=now - POPULAR_WINDOW)
+            if p.hits >= MIN_HITS and _search_id(p.query_key, p.preis) not in fresh
+        ]
+
+    def warm(self, search: PopularSearch) -> Optional[WarmSearch]:
+        """Scrapt und bereinigt eine Suche und speichert sie als vorgewärmt."""
+        search_id = _search_id(search.query_key, search.preis)
+        started = time.monotonic()
+        try:
+            rows = self.runner(search.query, search.preis)
+            out_dir = self.finisher(rows, search_id)
+        except Exception:
+            self.store.record_run(search_id, time.monotonic() - started, ok=False)
+            logger.exception("Vorwärmen fehlgeschlagen: %s", search.query)
+            return None
+        seconds = time.monotonic() - started
+        ok = (Path(out_dir) / CLEAN_FILE_NAME).exists()
+        self.store.record_run(search_id, seconds, ok=ok)
+        if not ok:
+            logger.warning("Vorwärmen ohne bereinigte Daten: %s", search.query)
+            return None
+        warm = WarmSearch(
+            search_id,
+            search.query,
+            search.preis,
+            str(out_dir),
+            len(rows),
+            seconds,
+            self.clock(),
+        )
+        self.store.save(warm)
+        logger.info(
+            "Vorgewärmt: '%s' (%s) – %d Angebote in %.1f s",
+            search.query,
+            search.preis,
+            len(rows),
+            seconds,
+        )
+        return warm
+
+    def run_once(self, force: bool = False) -> List[WarmSearch]:
+        """
+        Ein Durchgang: wärmt bis zu max_per_cycle Suchen vor, solange Leerlauf
+        (force=True: ohne Leerlauf-Prüfung) und Budget reichen.
+
+        Returns:
+            Neu vorgewärmte Suchen.
+        """
+        warmed: List[WarmSearch] = []
+        for search in self.candidates()[: self.max_per_cycle]:
+            if not force and not self.is_idle():
+                logger.debug("Kein Leerlauf – Vorwärmen pausiert.")
+                break
+            if self.budget_left() <= 0:
+                logger.info("Stundenbudget fürs Vorwärmen aufgebraucht.")
+                break
+            warm = self.warm(search)
+            if warm is not None:
+                warmed.append(warm)
+        return warmed
+
+    def run_forever(self, stop: Optional[threading.Event] = None) -> None:
+        """Blockierende Schleife mit niedriger Priorität (bis stop gesetzt ist)."""
+        stop = stop or threading.Event()
+        lower_priority()
+        while not stop.is_set():
+            try:
+                self.run_once()
+            except sqlite3.Error as e:
+                logger.warning("Vorwärmen übersprungen: %s", e)
+            stop.wait(CHECK_INTERVAL)
+
+
+# ----------------------------- CLI ----------------------------- #
+def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pricehunter Vorwärmen")
+    parser.add_argument("--db", type=Path, default=PREWARM_DB_PATH)
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Einen Durchgang ausführen (ohne Leerlauf-Prüfung) und beenden",
+    )
+    parser.add_argument(
+        "--report", action="store_true", help="Bericht als JSON ausgeben und beenden"
+    )
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_cli_args(argv)
+    store = PrewarmStore(args.db)
+    if args.report:
+        print(json.dumps(store.report()._asdict(), indent=2))
+        return 0
+
+    import main
+
+    prewarmer = Prewarmer(store, open_search_log(main.CSV_PATH, main.SEARCH_DB_PATH))
+    if args.once:
+        lower_priority()
+        prewarmer.run_once(force=True)
+    else:
+        prewarmer.run_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Preisverlauf (Zeitreihen) für Pricehunter
+-----------------------------------------
+Jeder Scrape ersetzt output_clean.csv. Damit Fragen wie "wie hat sich das
+günstigste 'Ski'-Angebot entwickelt?" beantwortbar bleiben, werden die
+bereinigten Preise zusätzlich als Beobachtungen fortgeschrieben.
+
+Ablage pro product_name (HISTORY_DIR/<product_name>/):
+    observations.bin   append-only, feste Datensätze (OBS_DTYPE): Zeit, Artikel-
+                       nummer, price, price_with_shipping (zeitlich sortiert)
+    hour.npy, day.npy  vorberechnete Rollups pro Stunde/Tag (ROLLUP_DTYPE):
+                       Anzahl sowie min/median/p90 für beide Preise
+
+Mehrere Threads und Prozesse dürfen gleichzeitig anhängen: append hält pro
+product_name eine Dateisperre (fcntl.flock auf HISTORY_DIR/<product_name>/.lock)
+über Lesen, Prüfen und Schreiben; der Zeitpunkt wird erst unter der Sperre
+bestimmt.
+
+Rollups werden inkrementell gepflegt: beim Anhängen werden nur die Buckets
+neu berechnet, die die neuen Beobachtungen berühren; die dafür nötigen Rohdaten
+werden per np.memmap + searchsorted gelesen. Abfragen für Charts lesen nur die
+kleinen Rollup-Dateien (Monate mit Stundenauflösung = wenige tausend Zeilen).
+
+Beispiel:
+    history = PriceHistory()
+    days = history.rollup("Ski", "day")
+    days["bucket"], days["price_min"]
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from offers import item_id_from_link
+
+try:  # POSIX: Sperre über Prozesse hinweg
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: nur innerhalb eines Prozesses
+    fcntl = None
+
+HISTORY_DIR = Path(__file__).resolve().parent / "history"
+OBSERVATIONS_NAME = "observations.bin"
+LOCK_NAME = ".lock"
+
+# Auflösung der Rollups in Sekunden
+RESOLUTIONS: Dict[str, int] = {"hour": 3600, "day": 86400}
+PRICE_FIELDS = ("price", "price_with_shipping")
+
+OBS_DTYPE = np.dtype(
+    [
+        ("ts", "<f8"),
+        ("item", "<i8"),
+        ("price", "<f8"),
+        ("price_with_shipping", "<f8"),
+    ]
+)
+ROLLUP_DTYPE = np.dtype(
+    [("bucket", "<i8"), ("count", "<i8")]
+    + [
+        (f"{field}_{stat}", "<f8")
+        for field in PRICE_FIELDS
+        for stat in ("min", "median", "p90")
+    ]
+)
+
+
+def item_code(item_id: str) -> int:
+    """
+    eBay-Artikelnummern als int64; andere Kennungen über einen stabilen Hash.
+    """
+    if item_id.isdigit() and len(item_id) < 19:
+        return int(item_id)
+    digest = hashlib.blake2b(item_id.encode("utf-8"), digest_size=8).digest()
+    # negativ: kollidiert nie mit einer echten Artikelnummer
+    return -(int.from_bytes(digest, "little") >> 2) - 1
+
+
+def _key_dir(root: Path, product_name: str) -> Path:
+    return root / quote(product_name.strip().lower(), safe="")
+
+
+# Offene Sperrdateien dieses Prozesses. Ein per fork gestarteter Kindprozess
+# (z.B. ProcessPoolExecutor) erbt sie samt flock und schliesst sie sofort, sonst
+# bliebe die Sperre bis zu seinem Ende bestehen.
+_HELD_LOCKS: set = set()
+
+
+def _close_inherited_locks() -> None:
+    for fd in list(_HELD_LOCKS):
+        with contextlib.suppress(OSError):
+            os.close(fd)
+    _HELD_LOCKS.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_close_inherited_locks)
+
+
+@contextlib.contextmanager
+def _locked(key_dir: Path) -> Iterator[None]:
+    """Exklusive Sperre einer Zeitreihe (auch gegenüber anderen Prozessen)."""
+    fd = os.open(key_dir / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+    _HELD_LOCKS.add(fd)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)  # beim Schliessen freigegeben
+        yield
+    finally:
+        _HELD_LOCKS.discard(fd)
+        os.close(fd)
+
+
+def compute_rollup(observations: np.ndarray, seconds: int) -> np.ndarray:
+    """
+    Aggregiert Beobachtungen (OBS_DTYPE, nach Zeit sortiert) in Buckets.
+
+    Returns:
+        Array mit ROLLUP_DTYPE, ein Eintrag pro Bucket mit Beobachtungen.
+    """
+    if len(observations) == 0:
+        return np.empty(0, dtype=ROLLUP_DTYPE)
+    buckets = (observations["ts"] // seconds).astype(np.int64) * seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    out = np.empty(len(starts), dtype=ROLLUP_DTYPE)
+    out["bucket"] = buckets[starts]
+    out["count"] = np.diff(np.r_[starts, len(buckets)])
+    for field in PRICE_FIELDS:
+        groups = np.split(np.asarray(observations[field]), starts[1:])
+        stats = np.array(
+            [
+                (
+                    np.nanpercentile(g, (0, 50, 90))
+                    if np.isfinite(g).any()
+                    else (np.nan,) * 3
+                )
+                for g in groups
+            ]
+        )
+        out[f"{field}_min"], out[f"{field}_median"], out[f"{field}_p90"] = stats.T
+    return out
+
+
+class PriceHistory:
+    """Append-only Beobachtungen + inkrementelle Rollups pro product_name."""
+
+    def __init__(self, root: Union[str, Path] = HISTORY_DIR) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    # ----------------------------- Schreiben ----------------------------- #
+    def append(
+        self,
+        product_name: str,
+        item_ids: Iterable[str],
+        prices: Iterable[float],
+        prices_with_shipping: Iterable[float],
+        ts: Optional[float] = None,
+    ) -> int:
+        """
+        Hängt Beobachtungen eines Zeitpunkts an und aktualisiert die Rollups.
+
+        Args:
+            product_name: Schlüssel der Zeitreihe (z.B. 'Ski').
+            item_ids: eBay-Artikelnummern.
+            prices: Preise (gleiche Länge wie item_ids).
+            prices_with_shipping: Preise inkl. Versand.
+            ts: Zeitpunkt (Unix-Sekunden, Standard: jetzt, unter der Sperre
+                bestimmt); darf nicht vor der letzten Beobachtung liegen.
+
+        Returns:
+            Anzahl angehängter Beobachtungen.
+        """
+        items = [item_code(str(i)) for i in item_ids]
+        batch = np.empty(len(items), dtype=OBS_DTYPE)
+        if len(batch) == 0:
+            return 0
+        batch["item"] = items
+        batch["price"] = np.asarray(list(prices), dtype=np.float64)
+        batch["price_with_shipping"] = np.asarray(
+            list(prices_with_shipping), dtype=np.float64
+        )
+
+        key_dir = _key_dir(self.root, product_name)
+        key_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock, _locked(key_dir):
+            obs_path = key_dir / OBSERVATIONS_NAME
+            last = self._observations(obs_path)
+            last_ts = float(last["ts"][-1]) if len(last) else None
+            del last
+            if ts is None:  # Uhr darf nicht hinter die letzte Beobachtung fallen
+                ts = time.time() if last_ts is None else max(time.time(), last_ts)
+            ts = float(ts)
+            if last_ts is not None and ts < last_ts:
+                raise ValueError(
+                    f"Beobachtung vor letztem Zeitpunkt ({ts} < {last_ts})."
+                )
+            batch["ts"] = ts
+            with open(obs_path, "ab") as f:
+                batch.tofile(f)
+            for name, seconds in RESOLUTIONS.items():
+                self._update_rollup(key_dir, obs_path, name, seconds, ts)
+        return len(batch)
+
+    def record_frame(self, df, ts: Optional[float] = None) -> int:
+        """
+        Übernimmt einen bereinigten DataFrame (TransformResult.data) in den Verlauf.
+        """
+        if df is None or len(df) == 0:
+            return 0
+        total = 0
+        for product_name, group in df.groupby("product_name", sort=False):
+            total += self.append(
+                str(product_name),
+                (item_id_from_link(str(link)) for link in group["link"]),
+                group["price"].astype(float),
+                group["price_with_shipping"].astype(float),
+                ts=ts,
+            )
+        return total
+
+    def _update_rollup(
+        self, key_dir: Path, obs_path: Path, name: str, seconds: int, ts: float
+    ) -> None:
+        bucket = int(ts // seconds) * seconds
+        observations = self._observations(obs_path)
+        start = int(np.searchsorted(observations["ts"], bucket, side="left"))
+        fresh = compute_rollup(observations[start:], seconds)  # nur betroffene Buckets
+        del observations
+
+        path = key_dir / f"{name}.npy"
+        current = np.load(path) if path.exists() else np.empty(0, dtype=ROLLUP_DTYPE)
+        keep = current[current["bucket"] < bucket]
+        fd, tmp = tempfile.mkstemp(dir=key_dir, prefix=f".{name}.", suffix=".npy")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.concatenate([keep, fresh]))
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp)
+            raise
+
+    # ----------------------------- Lesen ----------------------------- #
+    @staticmethod
+    def _observations(path: Path) -> np.ndarray:
+        if not path.exists() or path.stat().st_size == 0:
+            return np.empty(0, dtype=OBS_DTYPE)
+        return np.memmap(path, dtype=OBS_DTYPE, mode="r")
+
+    def observations(
+        self,
+        product_name: str,
+        item_id: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Rohbeobachtungen in [start, end) (optional nur eines Artikels).
+        """
+        data = self._observations(_key_dir(self.root, product_name) / OBSERVATIONS_NAME)
+        lo = 0 if start is None else int(np.searchsorted(data["ts"], start, "left"))
+        hi = len(data) if end is None else int(np.searchsorted(data["ts"], end, "left"))
+        result = np.array(data[lo:hi])
+        if item_id is not None:
+            result = result[result["item"] == item_code(item_id)]
+        return result
+
+    def rollup(
+        self,
+        product_name: str,
+        resolution: str = "day",
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Vorberechnete Aggregate einer Zeitreihe (ohne Rohdaten zu lesen).
+
+        Args:
+            product_name: Schlüssel der Zeitreihe.
+            resolution: 'hour' oder 'day'.
+            start, end: Zeitfenster [start, end) in Unix-Sekunden.
+
+        Returns:
+            Array mit ROLLUP_DTYPE (bucket = Beginn des Buckets in Unix-Sekunden).
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unbekannte Auflösung: {resolution!r}")
+        path = _key_dir(self.root, product_name) / f"{resolution}.npy"
+        if not path.exists():
+            return np.empty(0, dtype=ROLLUP_DTYPE)
+        data = np.load(path, mmap_mode="r")
+        lo = 0 if start is None else int(np.searchsorted(data["bucket"], start, "left"))
+        hi = (
+            len(data)
+            if end is None
+            else int(np.searchsorted(data["bucket"], end, "left"))
+        )
+        return np.array(data[lo:hi])
+
+    def product_names(self) -> list:
+        """Alle Zeitreihen-Schlüssel (wie in den Verzeichnisnamen, klein geschrieben)."""
+        if not self.root.exists():
+            return []
+        return sorted(unquote(p.name) for p in self.root.iterdir() if p.is_dir())
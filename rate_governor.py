@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptive Drosselung pro Host für alle Scraper
+---------------------------------------------
+Bisher pausierte jeder Scraper fest 1.1 s zwischen zwei Seiten. Mehrere
+gleichzeitige Suchen (Worker, Tabs, asyncio) addieren sich so zu einer Rate, die
+eBay nicht unbedingt toleriert; eine Sperr- oder Captcha-Seite wurde nach 25 s
+Timeout trotzdem geparst.
+
+RateGovernor teilt pro Host ein Tempo zwischen allen Scrapern. Mit path liegt
+der Zustand (Token, Rate, Backoff, Circuit Breaker) in einer SQLite-Datei (WAL),
+die alle Prozesse eines Rechners teilen – Web-Worker, scheduler.py und
+prewarm.py zusammen halten so *eine* Rate pro Host ein; get_governor() nutzt
+GOVERNOR_DB_PATH. Ohne path bleibt der Zustand im Prozess (Tests, Benchmarks).
+- Token-Bucket: höchstens rate Seitenaufrufe pro Sekunde (Burst bis burst).
+- AIMD: jede gute Seite erhöht rate um INCREASE_STEP, eine gesperrte, leere
+  oder abgelaufene halbiert sie (DECREASE_FACTOR, einmal pro Überlast-Episode –
+  parallel laufende Aufrufe zählen nicht doppelt); langsame Antworten senken
+  sie leicht. So pendelt sich das Tempo knapp unter der tolerierten Rate ein.
+  reserve vergibt Aufrufe erst, wenn ein Token frei ist: wartende Scraper
+  übernehmen ein gesenktes Tempo sofort.
+- Exponentieller Backoff: nach n Fehlschlägen in Folge wartet der Host
+  BACKOFF_BASE * 2^(n-1) Sekunden (mit Jitter, höchstens BACKOFF_MAX).
+- Circuit Breaker: ab FAILURE_THRESHOLD Fehlschlägen in Folge ist der Host
+  COOLDOWN Sekunden gesperrt (CircuitOpenError); danach darf genau ein
+  Probeaufruf durch, der über Schliessen oder erneutes Öffnen entscheidet.
+
+classify_page bewertet eine geladene Seite (ok, leer, gesperrt, Timeout, Fehler).
+
+Beispiel:
+    governor = get_governor()
+    governor.wait(url)
+    html = load(url)
+    governor.record(url, classify_page(html, len(offers)))
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("ebay_scraper.rate_governor")
+
+# ----------------------------- Konfiguration ----------------------------- #
+# Gemeinsamer Zustand aller Prozesse (get_governor)
+GOVERNOR_DB_PATH = Path(__file__).resolve().parent / "governor.db"
+BUSY_TIMEOUT_MS = 5000
+# Seiten pro Sekunde (Standard entspricht der bisherigen Pause); SCRAPE_RATE
+# erlaubt höhere Raten gegen lokale Hosts (mock_ebay.py, Lasttests)
+INITIAL_RATE = float(os.environ.get("SCRAPE_RATE", 1 / 1.1))
+MIN_RATE = 0.05
+MAX_RATE = max(4.0, INITIAL_RATE)
+BURST = 2.0
+INCREASE_STEP = 0.05  # additiv pro guter Seite
+DECREASE_FACTOR = 0.5  # multiplikativ pro Fehlschlag
+SLOW_RESPONSE = 8.0  # Sekunden; langsamere Seiten senken die Rate leicht …
+SLOW_FACTOR = 0.8  # … um diesen Faktor
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 300.0
+FAILURE_THRESHOLD = 5
+COOLDOWN = 120.0
+PAGE_RETRIES = 2  # gesperrte/leere Seiten so oft erneut laden (nach Backoff)
+_EPSILON = (
+    1e-9  # Rundungstoleranz: nach exakt berechneter Wartezeit nicht erneut warten
+)
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS host_states (
+    host          TEXT PRIMARY KEY,
+    rate          REAL NOT NULL,
+    tokens        REAL NOT NULL,
+    updated       REAL NOT NULL,
+    failures      INTEGER NOT NULL,
+    backoff_until REAL NOT NULL,
+    open_until    REAL NOT NULL,
+    probe_until   REAL NOT NULL,
+    pages         INTEGER NOT NULL,
+    blocked       INTEGER NOT NULL
+);
+"""
+_STATE_FIELDS = (
+    "rate",
+    "tokens",
+    "updated",
+    "failures",
+    "backoff_until",
+    "open_until",
+    "probe_until",
+    "pages",
+    "blocked",
+)
+
+# ----------------------------- Seitenbewertung ----------------------------- #
+OK = "ok"
+EMPTY = "empty"  # keine Karten, aber auch keine "keine Treffer"-Meldung
+BLOCKED = "blocked"  # Captcha, Sperrseite, 403/429/503
+TIMEOUT = "timeout"  # Trefferliste nicht rechtzeitig erschienen
+ERROR = "error"  # Netzwerk-/HTTP-Fehler
+RETRY_OUTCOMES = frozenset({EMPTY, BLOCKED})
+BLOCK_STATUSES = frozenset({403, 429, 503})
+
+# Strukturmerkmale von Captcha-/Sperrseiten (nicht nur "captcha": normale
+# eBay-Seiten enthalten CSS-Klassen wie 'ifh-captcha')
+_BLOCK_MARKUP_RE = re.compile(
+    r"splashui/(?:captcha|challenge)|px-captcha|g-recaptcha|(?<![\w-])h-captcha|cf-chl-",
+    re.IGNORECASE,
+)
+_BLOCK_TITLE_RE = re.compile(
+    r"pardon our interruption|access denied|security measure|"
+    r"sicherheitsma(?:ss|ß)nahme|bitte bestätigen sie",
+    re.IGNORECASE,
+)
+# Für den Browser: erkennt Sperrseiten, ohne den Quelltext zu laden (wait_for_results)
+BLOCK_PAGE_SELECTOR = (
+    "iframe[src*='captcha'], iframe[src*='challenge'], #px-captcha, "
+    ".g-recaptcha, .h-captcha, form[action*='splashui']"
+)
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_CARD_RE = re.compile(r"class=\"[^\"]*\bs-(?:card|item)\b")
+_NO_RESULTS_RE = re.compile(
+    r"srp-save-null-search|keine genauen treffer|no exact matches found",
+    re.IGNORECASE,
+)
+
+
+def is_block_title(title: str) -> bool:
+    """Seitentitel einer Sperr-/Captcha-Seite?"""
+    return bool(_BLOCK_TITLE_RE.search(title or ""))
+
+
+def is_block_page(html: str) -> bool:
+    """Captcha- oder Sperrseite statt Suchergebnis?"""
+    if _BLOCK_MARKUP_RE.search(html):
+        return True
+    if _CARD_RE.search(html):  # Titel nur ohne Karten prüfen (Suchbegriff im Titel)
+        return False
+    title = _TITLE_RE.search(html)
+    return bool(title and is_block_title(title.group(1)))
+
+
+def classify_page(
+    html: str, offers: int, timed_out: bool = False, status: Optional[int] = None
+) -> str:
+    """
+    Bewertet eine geladene Suchseite.
+
+    Args:
+        html: Quelltext der Seite.
+        offers: Anzahl geparster Angebote.
+        timed_out: True, wenn wait_for_results abgelaufen ist.
+        status: HTTP-Status (nur ohne Browser bekannt).
+
+    Returns:
+        OK, EMPTY, BLOCKED, TIMEOUT oder ERROR.
+    """
+    if status in BLOCK_STATUSES:
+        return BLOCKED
+    if status is not None and status >= 400:
+        return ERROR
+    if is_block_page(html):
+        return BLOCKED
+    if offers or _CARD_RE.search(html) or _NO_RESULTS_RE.search(html):
+        return OK
+    return TIMEOUT if timed_out else EMPTY
+
+
+# ----------------------------- Governor ----------------------------- #
+class CircuitOpenError(RuntimeError):
+    """Host nach zu vielen Fehlschlägen vorübergehend gesperrt."""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"{host} gesperrt, neuer Versuch in {retry_after:.0f} s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class _HostState:
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+        self.failures = 0  # Fehlschläge in Folge
+        self.backoff_until = 0.0
+        self.open_until = 0.0  # > 0: Circuit Breaker offen bzw. halb offen
+        # Probeaufruf im halb offenen Zustand läuft (bis dahin; endet auch, wenn
+        # der prüfende Prozess abstürzt, ohne ein Ergebnis zu melden)
+        self.probe_until = 0.0
+        self.pages = 0
+        self.blocked = 0
+
+    def as_row(self) -> tuple:
+        return tuple(getattr(self, field) for field in _STATE_FIELDS)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "_HostState":
+        state = cls.__new__(cls)
+        for field, value in zip(_STATE_FIELDS, row):
+            setattr(state, field, value)
+        return state
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class RateGovernor:
+    """
+    Tempo pro Host (Token-Bucket + AIMD, Backoff, Circuit Breaker), thread-sicher;
+    mit path auch prozessübergreifend (SQLite, eine Transaktion pro Aufruf).
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = INITIAL_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        burst: float = BURST,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        clock: Optional[Callable[[], float]] = None,
+        rng: Optional[random.Random] = None,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Prozessübergreifend nur die Uhrzeit vergleichbar (auch nach Neustart)
+        self.clock = clock or (time.monotonic if path is None else time.time)
+        self.rng = rng or random.Random()
+        self.path = None if path is None else str(path)
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if self.path is not None:
+            self._conn.executescript(_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:  # eine Verbindung pro Thread, Transaktionen explizit
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA synchronous = NORMAL")  # Tempo, kein Archiv
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _host(self, host: str) -> Iterator[Tuple[_HostState, float]]:
+        """
+        Zustand eines Hosts samt aktueller Zeit; Änderungen werden beim Verlassen
+        übernommen (mit path: in einer Transaktion, die andere Prozesse sperrt).
+        """
+        with self._lock:
+            now = self.clock()
+            if self.path is None:
+                state = self._hosts.get(host)
+                if state is None:
+                    state = self._hosts[host] = _HostState(
+                        self.initial_rate, self.burst, now
+                    )
+                yield state, now
+                return
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT {', '.join(_STATE_FIELDS)} FROM host_states "
+                    "WHERE host = ?",
+                    (host,),
+                ).fetchone()
+                if row is None:
+                    state = _HostState(self.initial_rate, self.burst, now)
+                else:
+                    state = _HostState.from_row(row)
+                yield state, now
+                conn.execute(
+                    "INSERT OR REPLACE INTO host_states VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (host, *state.as_row()),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _states(self) -> Dict[str, _HostState]:
+        if self.path is None:
+            return dict(self._hosts)
+        rows = self._conn.execute(
+            f"SELECT host, {', '.join(_STATE_FIELDS)} FROM host_states"
+        ).fetchall()
+        return {row[0]: _HostState.from_row(row[1:]) for row in rows}
+
+    def _refill(self, state: _HostState, now: float) -> None:
+        # Token seit dem letzten Aufruf zum bisherigen Tempo gutschreiben
+        state.tokens = min(
+            self.burst, state.tokens + (now - state.updated) * state.rate
+        )
+        state.updated = now
+
+    def reserve(self, url: str) -> float:
+        """
+        Versucht, einen Seitenaufruf zu reservieren (blockiert nicht).
+
+        Returns:
+            0.0, wenn der Aufruf sofort erfolgen darf (Token genommen); sonst
+            Sekunden bis zum nächsten Versuch – es wird dann nichts reserviert.
+            So gilt nach einer Sperrseite sofort das neue Tempo auch für alle
+            Scraper, die bereits warten.
+
+        Raises:
+            CircuitOpenError: Host ist gesperrt.
+        """
+        host = host_of(url)
+        with self._host(host) as (state, now):
+            if state.open_until:
+                if now < state.open_until or now < state.probe_until:
+                    retry = max(state.open_until - now, 1.0)
+                    raise CircuitOpenError(host, retry)
+            if now < state.backoff_until - _EPSILON:
+                return state.backoff_until - now
+            self._refill(state, now)
+            if state.tokens < 1.0 - _EPSILON:
+                return (1.0 - state.tokens) / state.rate
+            state.tokens -= 1.0
+            if state.open_until:  # halb offen: genau ein Probeaufruf
+                state.probe_until = now + self.cooldown
+            return 0.0
+
+    def wait(self, url: str) -> float:
+        """Wie reserve, wartet aber selbst (time.sleep). Gibt die Wartezeit zurück."""
+        waited = 0.0
+        delay = self.reserve(url)
+        while delay > 0:
+            time.sleep(delay)
+            waited += delay
+            delay = self.reserve(url)
+        return waited
+
+    def record(self, url: str, outcome: str, latency: Optional[float] = None) -> None:
+        """
+        Meldet das Ergebnis eines Seitenaufrufs und passt das Tempo an.
+
+        Args:
+            url: Geladene Seite.
+            outcome: Ergebnis von classify_page (bzw. ERROR).
+            latency: Ladezeit in Sekunden (optional).
+        """
+        host = host_of(url)
+        with self._host(host) as (state, now):
+            self._refill(state, now)
+            state.pages += 1
+            state.probe_until = 0.0
+            if outcome == OK:
+                if state.open_until:
+                    logger.info(
+                        "%s: Probeaufruf erfolgreich – Sperre aufgehoben.", host
+                    )
+                state.failures = 0
+                state.open_until = 0.0
+                state.backoff_until = 0.0
+                if latency is not None and latency > SLOW_RESPONSE:
+                    state.rate = max(self.min_rate, state.rate * SLOW_FACTOR)
+                else:
+                    state.rate = min(self.max_rate, state.rate + INCREASE_STEP)
+                return
+
+            state.blocked += outcome == BLOCKED
+            if not state.open_until and now < state.backoff_until:
+                # Aufruf lief schon vor dem Backoff: gleiche Überlast-Episode,
+                # Rate nicht erneut senken
+                return
+            state.failures += 1
+            state.rate = max(self.min_rate, state.rate * DECREASE_FACTOR)
+            state.tokens = min(state.tokens, 0.0)
+            backoff = min(
+                self.backoff_max, self.backoff_base * 2 ** (state.failures - 1)
+            )
+            state.backoff_until = now + backoff * self.rng.uniform(0.5, 1.0)
+            if state.open_until or state.failures >= self.failure_threshold:
+                state.open_until = now + self.cooldown
+                logger.warning(
+                    "%s: %d Fehlschläge in Folge (%s) – Host %.0f s gesperrt.",
+                    host,
+                    state.failures,
+                    outcome,
+                    self.cooldown,
+                )
+            else:
+                logger.warning(
+                    "%s: Seite %s – Rate %.2f/s, Backoff %.1f s.",
+                    host,
+                    outcome,
+                    state.rate,
+                    backoff,
+                )
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Aktueller Zustand pro Host (für Logs und Statistiken)."""
+        with self._lock:
+            now = self.clock()
+            return {
+                host: {
+                    "rate": round(state.rate, 3),
+                    "failures": state.failures,
+                    "open": state.open_until > now,
+                    "pages": state.pages,
+                    "blocked": state.blocked,
+                }
+                for host, state in self._states().items()
+            }
+
+
+_GOVERNOR: Optional[RateGovernor] = None
+_GOVERNOR_LOCK = threading.Lock()
+
+
+def get_governor() -> RateGovernor:
+    """
+    Gemeinsamer RateGovernor aller Scraper (Zustand in GOVERNOR_DB_PATH, von
+    allen Prozessen des Rechners geteilt).
+    """
+    global _GOVERNOR
+    with _GOVERNOR_LOCK:
+        if _GOVERNOR is None or _GOVERNOR.path != str(GOVERNOR_DB_PATH):
+            _GOVERNOR = RateGovernor(path=GOVERNOR_DB_PATH)
+        return _GOVERNOR
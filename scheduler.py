@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Preisüberwachung gespeicherter Suchen
+-------------------------------------
+Führt die in data.csv geloggten Suchen periodisch erneut über main.run_scrape aus
+und speichert nur die Änderungen gegenüber dem letzten Lauf:
+- 'new':     Angebot (Artikelnummer) taucht erstmals auf
+- 'price':   Preis eines bekannten Angebots hat sich geändert
+- 'removed': bekanntes Angebot ist nicht mehr in den Ergebnissen (nur nach
+             vollständigen Läufen, d.h. bis zur letzten Seite der Suche)
+
+Der aktuelle Stand pro Suche liegt in einer SQLite-Datenbank (MONITOR_DB_PATH);
+pro Lauf werden nur neue/geänderte/entfernte Zeilen geschrieben, d.h. Speicher-
+und Folgeaufwand wachsen mit dem Änderungsvolumen, nicht mit der Trefferzahl.
+
+Planung:
+- Jede Suche hat ein Intervall mit Zufalls-Jitter (±JITTER), damit nicht alle
+  Suchen gleichzeitig laufen.
+- Häufig eingegebene ("heisse") Suchen laufen öfter und werden bei gleichzeitiger
+  Fälligkeit zuerst ausgeführt.
+
+Abgebrochene Läufe (WebDriver-Absturz, Neustart) setzen dank checkpoint.py ab
+der letzten erledigten Seite fort.
+
+CLI:
+    python scheduler.py [--interval 3600] [--once]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import logging
+import math
+import random
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import main
+from checkpoint import CHECKPOINT_DB_PATH, CheckpointStore
+from normalization import parse_number_eu
+from offers import Offer
+
+logger = logging.getLogger("ebay_scraper.scheduler")
+
+# ----------------------------- Konfiguration ----------------------------- #
+MONITOR_DB_PATH = main.BASE_DIR / "monitor.db"
+BASE_INTERVAL = 3600.0  # Sekunden zwischen zwei Läufen einer normalen Suche
+MIN_INTERVAL = 600.0  # untere Grenze auch für sehr heisse Suchen
+JITTER = 0.2  # ±20 % Zufallsanteil pro Intervall
+CHECKPOINT_SCOPE = "scheduler"  # Checkpoints der Läufe (checkpoint.py)
+RESUME_DELAY = 300.0  # Sekunden bis zum erneuten Versuch eines abgebrochenen Laufs
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS monitored_offers (
+    search_id TEXT NOT NULL,
+    item_id   TEXT NOT NULL,
+    titel     TEXT NOT NULL,
+    preis     TEXT NOT NULL,
+    link      TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (search_id, item_id)
+);
+CREATE TABLE IF NOT EXISTS offer_deltas (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_id TEXT NOT NULL,
+    item_id   TEXT NOT NULL,
+    kind      TEXT NOT NULL,
+    titel     TEXT NOT NULL,
+    link      TEXT NOT NULL,
+    old_preis TEXT,
+    new_preis TEXT,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_offer_deltas_search ON offer_deltas (search_id, id);
+"""
+
+
+class SavedSearch(NamedTuple):
+    """Eine überwachte Suche; hits = Anzahl Eingaben in data.csv."""
+
+    query: str
+    preis: str
+    hits: int = 1
+
+    @property
+    def search_id(self) -> str:
+        return main.make_search_id(self.query, self.preis)
+
+
+class Delta(NamedTuple):
+    """Eine Änderung zwischen zwei Läufen einer Suche."""
+
+    kind: str  # 'new' | 'price' | 'removed'
+    item_id: str
+    titel: str
+    link: str
+    old_preis: Optional[str]
+    new_preis: Optional[str]
+
+
+def load_saved_searches(path: Path = main.CSV_PATH) -> List[SavedSearch]:
+    """
+    Liest die Eingaben aus data.csv und fasst gleiche Suchen zusammen.
+
+    Returns:
+        Suchen, absteigend nach Anzahl Eingaben sortiert.
+    """
+    if not path.exists():
+        return []
+    counts: Dict[str, SavedSearch] = {}
+    with path.open("r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            query = (row.get("Produkt") or "").strip()
+            if not query:
+                continue
+            preis = (row.get("Preis") or "").strip()
+            search = SavedSearch(query, preis)
+            known = counts.get(search.search_id)
+            counts[search.search_id] = (
+                known._replace(hits=known.hits + 1) if known else search
+            )
+    return sorted(counts.values(), key=lambda s: -s.hits)
+
+
+# ----------------------------- Delta-Speicher ----------------------------- #
+class MonitorStore:
+    """Letzter Stand pro Suche + Änderungsprotokoll (SQLite)."""
+
+    def __init__(self, path: Path = MONITOR_DB_PATH) -> None:
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def apply(
+        self,
+        search_id: str,
+        offers: Iterable[Offer],
+        complete: bool = True,
+        now: Optional[float] = None,
+    ) -> List[Delta]:
+        """
+        Vergleicht die Angebote eines Laufs mit dem gespeicherten Stand (per
+        Artikelnummer) und schreibt nur die Unterschiede.
+
+        Args:
+            complete: Lauf hat alle Seiten der Suche gesehen. False (z.B. nach
+                max_pages oder einem Abbruchkriterium): nur 'new'/'price', nicht
+                gesehene Angebote bleiben gespeichert statt 'removed'.
+
+        Returns:
+            Liste der Änderungen dieses Laufs.
+        """
+        now = time.time() if now is None else now
+        current: Dict[str, Offer] = {}
+        for offer in offers:
+            current.setdefault(offer.item_id, offer)
+
+        with self._lock, self._conn:
+            stored = {
+                item_id: (titel, preis, link)
+                for item_id, titel, preis, link in self._conn.execute(
+                    "SELECT item_id, titel, preis, link FROM monitored_offers "
+                    "WHERE search_id = ?",
+                    (search_id,),
+                )
+            }
+            deltas: List[Delta] = []
+            for item_id, offer in current.items():
+                old = stored.get(item_id)
+                if old is None:
+                    deltas.append(
+                        Delta(
+                            "new", item_id, offer.titel, offer.link, None, offer.preis
+                        )
+                    )
+                elif _price_changed(old[1], offer.preis):
+                    deltas.append(
+                        Delta(
+                            "price",
+                            item_id,
+                            offer.titel,
+                            offer.link,
+                            old[1],
+                            offer.preis,
+                        )
+                    )
+            # Teilergebnisse und leere Ergebnisse (z.B. Captcha/Fehler) nicht als
+            # "alles Übrige entfernt" werten
+            if complete and current:
+                deltas.extend(
+                    Delta("removed", item_id, titel, link, preis, None)
+                    for item_id, (titel, preis, link) in stored.items()
+                    if item_id not in current
+                )
+            self._write(search_id, deltas, current, now)
+        return deltas
+
+    def _write(
+        self, search_id: str, deltas: List[Delta], current: Dict[str, Offer], now: float
+    ) -> None:
+        upserts = [
+            (search_id, d.item_id, current[d.item_id].titel, d.new_preis, d.link, now)
+            for d in deltas
+            if d.kind != "removed"
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO monitored_offers "
+            "(search_id, item_id, titel, preis, link, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            upserts,
+        )
+        self._conn.executemany(
+            "DELETE FROM monitored_offers WHERE search_id = ? AND item_id = ?",
+            [(search_id, d.item_id) for d in deltas if d.kind == "removed"],
+        )
+        self._conn.executemany(
+            "INSERT INTO offer_deltas "
+            "(search_id, item_id, kind, titel, link, old_preis, new_preis, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    search_id,
+                    d.item_id,
+                    d.kind,
+                    d.titel,
+                    d.link,
+                    d.old_preis,
+                    d.new_preis,
+                    now,
+                )
+                for d in deltas
+            ],
+        )
+
+    def deltas(self, search_id: str, since_id: int = 0) -> List[Delta]:
+        """Änderungen einer Suche (optional erst ab einer Protokoll-ID)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, item_id, titel, link, old_preis, new_preis "
+                "FROM offer_deltas WHERE search_id = ? AND id > ? ORDER BY id",
+                (search_id, since_id),
+            ).fetchall()
+        return [Delta(*row) for row in rows]
+
+
+def _price_changed(old: str, new: str) -> bool:
+    old_value, new_value = parse_number_eu(old), parse_number_eu(new)
+    if old_value is None or new_value is None:
+        return old.strip() != new.strip()
+    return not math.isclose(old_value, new_value)
+
+
+# ----------------------------- Scheduler ----------------------------- #
+def _default_runner(query: str, preis: str, checkpoint=None) -> main.ScrapeResult:
+    return main.run_search(query, preis, checkpoint=checkpoint)
+
+
+class Scheduler:
+    """
+    Prioritätswarteschlange (heapq) nach Fälligkeit; bei gleicher Fälligkeit
+    laufen Suchen mit mehr Eingaben zuerst. runner liefert (Angebote,
+    vollständig) wie main.run_search.
+
+    Mit checkpoints hält jeder Lauf seine Seiten fest (runner erhält das
+    Argument checkpoint); nach einem Absturz laufen Suchen mit offenem
+    Checkpoint sofort und setzen ab der ersten nicht erledigten Seite fort.
+    Bricht ein Lauf ab (main.ScrapeInterrupted), bleibt der Checkpoint offen
+    und die Suche wird nach RESUME_DELAY erneut versucht.
+    """
+
+    def __init__(
+        self,
+        searches: Iterable[SavedSearch],
+        store: MonitorStore,
+        runner: Callable[..., main.ScrapeResult] = _default_runner,
+        base_interval: float = BASE_INTERVAL,
+        jitter: float = JITTER,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.time,
+        checkpoints: Optional[CheckpointStore] = None,
+    ) -> None:
+        self.store = store
+        self.runner = runner
+        self.base_interval = base_interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.checkpoints = checkpoints
+        self._heap: List[tuple] = []
+        self._seq = 0
+        now = self.clock()
+        interrupted = set()
+        if checkpoints is not None:
+            interrupted = {c.key for c in checkpoints.pending(CHECKPOINT_SCOPE)}
+        for search in searches:
+            if search.search_id in interrupted:  # abgebrochener Lauf: sofort fortsetzen
+                self._push(search, now)
+                continue
+            # Erster Lauf gestaffelt über ein Intervall verteilt
+            self._push(search, now + self.rng.uniform(0, self.interval_for(search)))
+
+    def interval_for(self, search: SavedSearch) -> float:
+        """Basisintervall, verkürzt für häufig eingegebene Suchen."""
+        return max(MIN_INTERVAL, self.base_interval / (1 + math.log2(search.hits)))
+
+    def _push(self, search: SavedSearch, due: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (due, -search.hits, self._seq, search))
+
+    def _next_due(self, search: SavedSearch, now: float) -> float:
+        interval = self.interval_for(search)
+        return now + interval * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def seconds_until_next(self) -> Optional[float]:
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def run_pending(self) -> Dict[str, List[Delta]]:
+        """
+        Führt alle fälligen Suchen aus (heisseste zuerst) und plant sie neu ein.
+
+        Returns:
+            Dict search_id -> Änderungen des Laufs.
+        """
+        now = self.clock()
+        due: List[tuple] = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        due.sort(key=lambda entry: (entry[1], entry[2]))
+
+        results: Dict[str, List[Delta]] = {}
+        for _, _, _, search in due:
+            checkpoint = None
+            try:
+                if self.checkpoints is None:
+                    offers, complete = self.runner(search.query, search.preis)
+                else:
+                    checkpoint = self.checkpoints.checkpoint(
+                        CHECKPOINT_SCOPE, search.search_id
+                    )
+                    offers, complete = self.runner(
+                        search.query, search.preis, checkpoint=checkpoint
+                    )
+            except main.ScrapeInterrupted as e:
+                logger.warning(
+                    "Suche '%s' abgebrochen (%s) – neuer Versuch in %.0f s",
+                    search.query,
+                    e,
+                    RESUME_DELAY,
+                )
+                self._push(search, self.clock() + RESUME_DELAY)
+                continue
+            except Exception:
+                logger.exception("Aktualisierung fehlgeschlagen: %s", search.query)
+            else:
+                deltas = self.store.apply(search.search_id, offers, complete)
+                if checkpoint is not None:  # Ergebnis gespeichert
+                    checkpoint.discard()
+                results[search.search_id] = deltas
+                logger.info(
+                    "Suche '%s' (%s): %d Angebote%s, %d Änderungen",
+                    search.query,
+                    search.preis,
+                    len(offers),
+                    "" if complete else " (Teilergebnis)",
+                    len(deltas),
+                )
+            self._push(search, self._next_due(search, self.clock()))
+        return results
+
+    def run_all(self) -> Dict[str, List[Delta]]:
+        """Führt sofort alle Suchen aus (unabhängig von der Fälligkeit)."""
+        self._heap = [(float("-inf"), *entry[1:]) for entry in self._heap]
+        heapq.heapify(self._heap)
+        return self.run_pending()
+
+    def run_forever(self, stop: Optional[threading.Event] = None) -> None:
+        """Blockierende Schleife (bis stop gesetzt ist)."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.run_pending()
+            wait = self.seconds_until_next()
+            stop.wait(60.0 if wait is None else min(wait, 60.0))
+
+
+def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pricehunter Preisüberwachung")
+    parser.add_argument("--interval", type=float, default=BASE_INTERVAL)
+    parser.add_argument("--db", type=Path, default=MONITOR_DB_PATH)
+    parser.add_argument("--checkpoints", type=Path, default=CHECKPOINT_DB_PATH)
+    parser.add_argument(
+        "--once", action="store_true", help="Alle Suchen einmal ausführen und beenden"
+    )
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_cli_args(argv)
+    searches = load_saved_searches()
+    if not searches:
+        logger.error("Keine gespeicherten Suchen in %s.", main.CSV_PATH)
+        return 1
+    store = MonitorStore(args.db)
+    scheduler = Scheduler(
+        searches,
+        store,
+        base_interval=args.interval,
+        checkpoints=CheckpointStore(args.checkpoints),
+    )
+    try:
+        if args.once:
+            scheduler.run_all()
+        else:
+            scheduler.run_forever()
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Such-Log mit Hintergrund-Writer für Pricehunter
+-----------------------------------------------
+Bisher öffnete jede Suche data.csv, prüfte den Header (stat) und schrieb genau
+eine Zeile – im Request-Pfad. SearchLog.record legt die Eingabe nur in eine
+Queue; ein Hintergrund-Thread schreibt gesammelt (alle FLUSH_INTERVAL Sekunden
+oder ab BATCH_SIZE Einträgen):
+
+- data.csv        unverändertes Format (Produkt, Preis, Region, Link), ein
+                  einziges O_APPEND-write pro Batch (scheduler.py liest weiter daraus)
+- search_log.db   SQLite-Tabelle 'searches' mit Zeitstempel und normalisiertem
+                  Suchbegriff, abfragbar für Beliebtheits-Statistiken (popular)
+
+Beim Beenden (atexit bzw. close) werden ausstehende Einträge garantiert
+geschrieben. Eine neue search_log.db wird einmalig aus data.csv befüllt.
+
+Beispiel:
+    log = open_search_log()
+    log.record("Ski Elan", "200")
+    log.popular(limit=5)
+"""
+
+from __future__ import annotations
+
+import atexit
+import csv
+import io
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from atomic_files import append_line, create_with_content
+
+logger = logging.getLogger("ebay_scraper.search_log")
+
+BASE_DIR = Path(__file__).resolve().parent
+SEARCH_CSV_PATH = BASE_DIR / "data.csv"
+SEARCH_DB_PATH = BASE_DIR / "search_log.db"
+CSV_FIELDS = ["Produkt", "Preis", "Region", "Link"]
+
+FLUSH_INTERVAL = 1.0  # Sekunden
+BATCH_SIZE = 200
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS searches (
+    id        INTEGER PRIMARY KEY,
+    ts        REAL NOT NULL,
+    query     TEXT NOT NULL,
+    query_key TEXT NOT NULL,
+    preis     TEXT NOT NULL,  -- nur Ziffern (normalize_preis)
+    region    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_searches_key ON searches (query_key, preis);
+CREATE INDEX IF NOT EXISTS idx_searches_ts ON searches (ts);
+"""
+
+
+class SearchEntry(NamedTuple):
+    """Eine Sucheingabe aus dem Formular."""
+
+    ts: float
+    query: str
+    preis: str
+    region: str
+
+
+class PopularSearch(NamedTuple):
+    """Aggregat gleicher Suchen (gleicher normalisierter Begriff + Maximalpreis)."""
+
+    query_key: str
+    preis: str
+    hits: int
+    last_seen: float
+    query: str  # zuletzt eingegebene Schreibweise
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalisierter Suchbegriff wie in der eBay-URL: die ersten 5 Wörter
+    (siehe main.encode_query_limit_5), klein geschrieben.
+    """
+    return " ".join((query or "").lower().split()[:5])
+
+
+def normalize_preis(preis: str) -> str:
+    """Maximalpreis nur mit Ziffern (wie main.build_search_url)."""
+    return "".join(ch for ch in str(preis or "") if ch.isdigit())
+
+
+def _csv_lines(entries: List[SearchEntry]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows((e.query, e.preis, e.region, "") for e in entries)
+    return buf.getvalue()
+
+
+class SearchLog:
+    """Gepuffertes Such-Log (data.csv + SQLite) mit Hintergrund-Writer."""
+
+    def __init__(
+        self,
+        csv_path: Union[str, Path] = SEARCH_CSV_PATH,
+        db_path: Union[str, Path] = SEARCH_DB_PATH,
+        flush_interval: float = FLUSH_INTERVAL,
+        batch_size: int = BATCH_SIZE,
+    ) -> None:
+        self.csv_path = Path(csv_path)
+        self.db_path = Path(db_path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[SearchEntry]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._backfill_from_csv()
+
+    # ----------------------------- Schreiben ----------------------------- #
+    def record(
+        self, query: str, preis: str, region: str = "", ts: Optional[float] = None
+    ) -> None:
+        """Reiht eine Sucheingabe ein (blockiert nicht)."""
+        entry = SearchEntry(
+            time.time() if ts is None else ts,
+            (query or "").strip(),
+            str(preis or "").strip(),
+            (region or "").strip(),
+        )
+        self._ensure_writer()
+        self._queue.put(entry)
+
+    def flush(self) -> None:
+        """Wartet, bis alle eingereihten Einträge geschrieben sind."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Schreibt ausstehende Einträge und beendet den Writer-Thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._writer, name="search-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _writer(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[SearchEntry] = []
+            item = self._queue.get()  # blockiert bis zum ersten Eintrag
+            deadline = time.monotonic() + self.flush_interval
+            taken = 1
+            while True:
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                    taken += 1
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception:
+                logger.exception("Such-Log konnte nicht geschrieben werden.")
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _write(self, batch: List[SearchEntry]) -> None:
+        header = io.StringIO()
+        csv.writer(header).writerow(CSV_FIELDS)
+        create_with_content(self.csv_path, header.getvalue())
+        append_line(self.csv_path, _csv_lines(batch))  # ein write() pro Batch
+        self._insert(batch)
+
+    def _insert(self, entries: List[SearchEntry]) -> None:
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO searches (ts, query, query_key, preis, region) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        e.ts,
+                        e.query,
+                        normalize_query(e.query),
+                        normalize_preis(e.preis),
+                        e.region,
+                    )
+                    for e in entries
+                ],
+            )
+
+    def _backfill_from_csv(self) -> None:
+        """Übernimmt bestehende data.csv-Zeilen in eine neue, leere Datenbank."""
+        with self._db_lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()
+        if count or not self.csv_path.exists():
+            return
+        with self.csv_path.open("r", newline="", encoding="utf-8") as f:
+            entries = [
+                SearchEntry(0.0, row["Produkt"].strip(), row["Preis"].strip(), "")
+                for row in csv.DictReader(f)
+                if (row.get("Produkt") or "").strip()
+            ]
+        if entries:
+            self._insert(entries)
+            logger.info(
+                "Such-Log aus %s übernommen: %d Einträge", self.csv_path, len(entries)
+            )
+
+    # ----------------------------- Abfragen ----------------------------- #
+    def popular(
+        self, limit: int = 10, since: Optional[float] = None
+    ) -> List[PopularSearch]:
+        """
+        Häufigste Suchen (normalisierter Begriff + Maximalpreis).
+
+        Args:
+            limit: Anzahl Einträge.
+            since: Nur Suchen ab diesem Zeitpunkt (Unix-Sekunden).
+
+        Returns:
+            Absteigend nach Anzahl, bei Gleichstand die zuletzt gesuchte zuerst.
+        """
+        sql = (
+            "SELECT query_key, preis, COUNT(*) AS hits, MAX(ts) AS last_seen, "
+            "(SELECT s2.query FROM searches s2 WHERE s2.query_key = s.query_key "
+            " AND s2.preis = s.preis ORDER BY s2.id DESC LIMIT 1) "
+            "FROM searches s WHERE ts >= ? "
+            "GROUP BY query_key, preis ORDER BY hits DESC, last_seen DESC LIMIT ?"
+        )
+        with self._db_lock:
+            rows = self._conn.execute(sql, (since or 0.0, limit)).fetchall()
+        return [PopularSearch(*row) for row in rows]
+
+    def last_search(self) -> Optional[float]:
+        """Zeitpunkt der letzten geschriebenen Suche (None = noch keine)."""
+        with self._db_lock:
+            (ts,) = self._conn.execute("SELECT MAX(ts) FROM searches").fetchone()
+        return ts
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Anzahl Suchen pro (query_key, Maximalpreis)."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT query_key, preis, COUNT(*) FROM searches GROUP BY query_key, preis"
+            ).fetchall()
+        return {(key, preis): hits for key, preis, hits in rows}
+
+
+_LOGS: Dict[Tuple[Path, Path], SearchLog] = {}
+_LOGS_LOCK = threading.Lock()
+
+
+def open_search_log(
+    csv_path: Union[str, Path] = SEARCH_CSV_PATH,
+    db_path: Union[str, Path] = SEARCH_DB_PATH,
+) -> SearchLog:
+    """
+    Gemeinsame SearchLog-Instanz pro Pfadpaar (ein Writer-Thread pro Prozess).
+    """
+    key = (Path(csv_path).resolve(), Path(db_path).resolve())
+    with _LOGS_LOCK:
+        log = _LOGS.get(key)
+        if log is None:
+            log = _LOGS[key] = SearchLog(*key)
+        return log
+
+
+@atexit.register
+def _close_logs() -> None:
+    for log in list(_LOGS.values()):
+        log.close()
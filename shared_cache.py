@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prozessübergreifender Cache für Pricehunter (SQLite)
+----------------------------------------------------
+Im Betrieb laufen mehrere Flask-Worker-Prozesse. Ohne gemeinsamen Cache lädt und
+bereinigt jeder Worker dieselben Daten selbst (CSV parsen, Offer-Objekte bauen,
+Suchen ausführen). SharedCache legt solche Ergebnisse einmal pro Rechner in einer
+SQLite-Datei (WAL) ab; alle Worker lesen dieselbe Version.
+
+Zwei Arten von Einträgen:
+- Datensätze (publish / get_or_build): versionierte Werte mit Fingerabdruck der
+  Quelle (z.B. mtime + Grösse von output_clean.csv). Eine neue Version wird in
+  einer einzigen Transaktion geschrieben und aktiviert (atomarer Wechsel); Leser
+  sehen immer entweder die alte oder die neue Version vollständig.
+- Einträge (get / set): einfache Schlüssel/Wert-Paare pro Namespace mit Ablaufzeit,
+  z.B. Resultate von Stichwortsuchen.
+
+Werte werden mit pickle serialisiert (nur eigene Daten, keine externen Eingaben).
+Bauen zwei Worker gleichzeitig denselben Datensatz, gewinnt die zuletzt
+veröffentlichte Version – bei gleichem Fingerabdruck ist der Inhalt identisch.
+
+Beispiel:
+    cache = SharedCache()
+    rows = cache.get_or_build("rows", file_fingerprint(path), lambda: load(path))
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+CACHE_DB_PATH = Path(__file__).resolve().parent / "cache.db"
+KEEP_VERSIONS = 2  # aktuelle + vorherige Version je Datensatz
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS dataset_versions (
+    name        TEXT NOT NULL,
+    version     INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    value       BLOB NOT NULL,
+    published   REAL NOT NULL,
+    PRIMARY KEY (name, version)
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    name    TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    value     BLOB NOT NULL,
+    expires   REAL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+_CURRENT = """
+SELECT v.version, v.fingerprint, v.value
+FROM datasets d JOIN dataset_versions v ON v.name = d.name AND v.version = d.version
+WHERE d.name = ?
+"""
+
+
+class DatasetInfo(NamedTuple):
+    """Aktive Version eines Datensatzes."""
+
+    version: int
+    fingerprint: str
+
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """
+    Fingerabdruck einer Datei (Pfad, mtime in ns, Grösse); '' wenn sie fehlt.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{Path(path).resolve()}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class SharedCache:
+    """SQLite-Cache, den alle Prozesse eines Rechners gemeinsam nutzen."""
+
+    def __init__(self, path: Union[str, Path] = CACHE_DB_PATH) -> None:
+        self.path = str(path)
+        self._local = threading.local()
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:  # eine Verbindung pro Thread, Transaktionen explizit
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            # Cache: bei Stromausfall darf die letzte Version fehlen (WAL bleibt konsistent)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ----------------------------- Datensätze ----------------------------- #
+    def publish(self, name: str, value: Any, fingerprint: str) -> int:
+        """
+        Veröffentlicht eine neue Version von name (atomar für alle Leser).
+
+        Args:
+            name: Name des Datensatzes (z.B. 'rows:/pfad/output_clean.csv').
+            value: Beliebiges picklebares Objekt.
+            fingerprint: Kennzeichen der Quelle (siehe file_fingerprint).
+
+        Returns:
+            Neue Versionsnummer.
+        """
+        blob = _dumps(value)  # ausserhalb der Schreibsperre serialisieren
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (last,) = conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM dataset_versions WHERE name = ?",
+                (name,),
+            ).fetchone()
+            version = last + 1
+            conn.execute(
+                "INSERT INTO dataset_versions VALUES (?, ?, ?, ?, ?)",
+                (name, version, fingerprint, blob, time.time()),
+            )
+            conn.execute(
+                "INSERT INTO datasets VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET version = excluded.version",
+                (name, version),
+            )
+            conn.execute(
+                "DELETE FROM dataset_versions WHERE name = ? AND version <= ?",
+                (name, version - KEEP_VERSIONS),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def info(self, name: str) -> Optional[DatasetInfo]:
+        """Aktive Version und Fingerabdruck (ohne den Wert zu laden)."""
+        row = self._conn.execute(
+            "SELECT v.version, v.fingerprint FROM datasets d JOIN dataset_versions v "
+            "ON v.name = d.name AND v.version = d.version WHERE d.name = ?",
+            (name,),
+        ).fetchone()
+        return DatasetInfo(*row) if row else None
+
+    def load(self, name: str, fingerprint: Optional[str] = None) -> Optional[Any]:
+        """
+        Wert der aktiven Version; None, wenn es keine gibt oder der
+        Fingerabdruck nicht (mehr) passt.
+        """
+        row = self._conn.execute(_CURRENT, (name,)).fetchone()
+        if row is None or (fingerprint is not None and row[1] != fingerprint):
+            return None
+        return pickle.loads(row[2])
+
+    def get_or_build(
+        self, name: str, fingerprint: str, build: Callable[[], Any]
+    ) -> Any:
+        """
+        Liefert den Datensatz zum Fingerabdruck; baut und veröffentlicht ihn nur,
+        wenn noch kein Prozess das getan hat.
+        """
+        value = self.load(name, fingerprint)
+        if value is None:
+            value = build()
+            self.publish(name, value, fingerprint)
+        return value
+
+    # ----------------------------- Einträge ----------------------------- #
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Wert eines Eintrags oder None (fehlt / abgelaufen)."""
+        row = self._conn.execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? "
+            "AND (expires IS NULL OR expires > ?)",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """Speichert einen Eintrag (ttl in Sekunden, None = ohne Ablauf)."""
+        expires = None if ttl is None else time.time() + ttl
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (namespace, key, _dumps(value), expires),
+        )
+
+    def clear(self, namespace: str) -> int:
+        """Entfernt alle Einträge eines Namespace (z.B. nach neuem Index)."""
+        return self._conn.execute(
+            "DELETE FROM entries WHERE namespace = ?", (namespace,)
+        ).rowcount
+
+    def purge_expired(self) -> int:
+        """Entfernt abgelaufene Einträge."""
+        return self._conn.execute(
+            "DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?",
+            (time.time(),),
+        ).rowcount
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Abbruchkriterien für die Paginierung
+------------------------------------
+scrape_all (und die async-/Tab-Varianten) laden bis zu MAX_PAGES Seiten, solange
+ein "Weiter"-Link existiert. Viele Suchen liefern aber schon vorher nichts Neues
+mehr. Die hier definierten, zustandslosen Bedingungen werden nach jeder Seite mit
+den PageStats der Suche geprüft; die erste zutreffende beendet die Paginierung
+und ihr Grund wird geloggt.
+
+Eigene Bedingungen: Unterklasse von StopCondition mit check(stats) -> Grund | None.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from normalization import parse_number_eu
+from offers import Offer
+
+
+class PageStats(NamedTuple):
+    """Kennzahlen einer Suche nach dem Parsen einer Seite."""
+
+    page: int  # Seitennummer (1-basiert)
+    parsed: int  # verwertbare Angebote auf der Seite (vor seen_links-Filter)
+    new_rows: int  # davon neu (Link noch nicht gesehen)
+    total_rows: int  # Summe neuer Angebote über alle bisherigen Seiten
+    elapsed: float  # Sekunden seit Start der Suche
+    min_price: Optional[float] = None  # günstigster neuer Preis der Seite
+
+    @property
+    def duplicates(self) -> int:
+        return self.parsed - self.new_rows
+
+    @property
+    def duplicate_ratio(self) -> float:
+        return self.duplicates / self.parsed if self.parsed else 0.0
+
+
+class StopCondition:
+    """Basisklasse: check() liefert einen Abbruchgrund oder None."""
+
+    def check(self, stats: PageStats) -> Optional[str]:
+        raise NotImplementedError
+
+
+class NoNewItems(StopCondition):
+    """Stoppt, wenn eine Seite keine neuen Angebote mehr liefert."""
+
+    def check(self, stats: PageStats) -> Optional[str]:
+        if stats.new_rows == 0:
+            return f"keine neuen Angebote auf Seite {stats.page}"
+        return None
+
+
+class DuplicateRatioAbove(StopCondition):
+    """Stoppt, wenn der Anteil bereits gesehener Angebote einer Seite zu hoch ist."""
+
+    def __init__(self, threshold: float = 0.8) -> None:
+        self.threshold = threshold
+
+    def check(self, stats: PageStats) -> Optional[str]:
+        if stats.parsed and stats.duplicate_ratio > self.threshold:
+            return (
+                f"Duplikatanteil {stats.duplicate_ratio:.0%} > {self.threshold:.0%} "
+                f"auf Seite {stats.page}"
+            )
+        return None
+
+
+class EnoughResults(StopCondition):
+    """Stoppt, sobald genügend Angebote gesammelt wurden."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+
+    def check(self, stats: PageStats) -> Optional[str]:
+        if stats.total_rows >= self.limit:
+            return f"{stats.total_rows} Angebote gesammelt (Ziel {self.limit})"
+        return None
+
+
+class TimeBudget(StopCondition):
+    """Stoppt, wenn das Zeitbudget der Suche aufgebraucht ist."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    def check(self, stats: PageStats) -> Optional[str]:
+        if stats.elapsed >= self.seconds:
+            return f"Zeitbudget {self.seconds:.0f}s erschöpft ({stats.elapsed:.1f}s)"
+        return None
+
+
+class PriceAboveLimit(StopCondition):
+    """
+    Für nach Preis aufsteigend sortierte Suchen: stoppt, wenn schon das günstigste
+    neue Angebot einer Seite über dem Limit liegt.
+    """
+
+    def __init__(self, limit: float) -> None:
+        self.limit = limit
+
+    def check(self, stats: PageStats) -> Optional[str]:
+        if stats.min_price is not None and stats.min_price > self.limit:
+            return f"günstigster Preis {stats.min_price:.2f} > Limit {self.limit:.2f}"
+        return None
+
+
+def default_stop_conditions() -> List[StopCondition]:
+    """Standard für scrape_all: keine neuen Angebote oder >80 % Duplikate."""
+    return [NoNewItems(), DuplicateRatioAbove(0.8)]
+
+
+def min_offer_price(rows: Iterable[Offer]) -> Optional[float]:
+    """Günstigster parsebarer Preis einer Angebotsliste (oder None)."""
+    prices = [p for p in (parse_number_eu(r.preis) for r in rows) if p is not None]
+    return min(prices) if prices else None
+
+
+def track_page(
+    page: int,
+    page_rows: List[Offer],
+    seen_links: set,
+    total_rows: int,
+    started: float,
+) -> Tuple[List[Offer], PageStats]:
+    """
+    Filtert bereits gesehene Links (seen_links wird ergänzt) und berechnet PageStats.
+
+    Args:
+        page: Seitennummer.
+        page_rows: Geparste Angebote der Seite.
+        seen_links: Links aller bisherigen Seiten der Suche.
+        total_rows: Anzahl Angebote vor dieser Seite.
+        started: time.monotonic() beim Start der Suche.
+    """
+    new_rows = [r for r in page_rows if r.link not in seen_links]
+    seen_links.update(r.link for r in new_rows)
+    stats = PageStats(
+        page=page,
+        parsed=len(page_rows),
+        new_rows=len(new_rows),
+        total_rows=total_rows + len(new_rows),
+        elapsed=time.monotonic() - started,
+        min_price=min_offer_price(new_rows),
+    )
+    return new_rows, stats
+
+
+def first_stop_reason(
+    conditions: Iterable[StopCondition], stats: PageStats
+) -> Optional[str]:
+    """Prüft die Bedingungen der Reihe nach und liefert den ersten Abbruchgrund."""
+    for condition in conditions:
+        reason = condition.check(stats)
+        if reason:
+            return reason
+    return None
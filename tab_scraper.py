@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-Tab-Scraping in einer Browser-Session
+-------------------------------------------
+Statt pro gleichzeitiger Suche einen eigenen Chrome-Prozess zu starten (mehrere
+hundert MB RSS pro Prozess), öffnet scrape_in_tabs mehrere Tabs in *einem*
+WebDriver (z.B. aus main.start_chrome) und lädt darin parallel verschiedene
+Suchen bzw. Ergebnisseiten.
+
+Ablauf:
+- Navigation wird per JavaScript (window.location) gestartet und blockiert nicht,
+  d.h. alle Tabs laden gleichzeitig.
+- Eine Schleife wechselt reihum die Window-Handles und prüft, ob die neue Seite
+  fertig ist (neuer performance.timeOrigin + readyState 'complete' + Trefferliste).
+- Fertige Seiten: einmal scrollen, page_source holen, mit main.parse_page parsen,
+  danach im selben Tab die Folgeseite bzw. die nächste Suche starten.
+- Seitenaufrufe aller Tabs teilen sich das Tempo des RateGovernor
+  (rate_governor.py): ein Tab navigiert erst, wenn sein reservierter Zeitpunkt
+  erreicht ist, ohne die übrigen Tabs zu blockieren. Gesperrte oder leere Seiten
+  werden nach Backoff im selben Tab erneut geladen.
+
+Beispiel:
+    driver = main.start_chrome(headless=True)
+    results = scrape_in_tabs(driver, [url_ski, url_schuhe, url_stoecke], max_tabs=3)
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, List, Optional, Sequence
+from urllib.parse import urljoin
+
+import main
+from offers import Offer
+from page_archive import PageArchive, open_archive
+from rate_governor import (
+    PAGE_RETRIES,
+    RETRY_OUTCOMES,
+    CircuitOpenError,
+    RateGovernor,
+    classify_page,
+    get_governor,
+)
+from stop_conditions import (
+    StopCondition,
+    default_stop_conditions,
+    first_stop_reason,
+    track_page,
+)
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger("ebay_scraper.tabs")
+
+MAX_TABS = 4  # Tabs pro Browser-Session
+POLL_INTERVAL = 0.2  # Sekunden zwischen zwei Runden über alle Tabs
+PAGE_TIMEOUT = 25  # Sekunden bis eine Seite trotz fehlender Trefferliste geparst wird
+
+_STATE_SCRIPT = (
+    "return [String(performance.timeOrigin), document.readyState, "
+    "!!document.querySelector(arguments[0])];"
+)
+
+
+class _Job:
+    """Zustand einer Suche (Paginierung) über mehrere Seitenaufrufe."""
+
+    def __init__(self, index: int, start_url: str) -> None:
+        self.index = index
+        self.url = start_url
+        self.page = 1
+        self.seen_links: set = set()
+        self.rows: List[Offer] = []
+        self.started = 0.0  # time.monotonic() beim ersten Seitenaufruf
+        self.attempts = 0  # Wiederholungen der aktuellen Seite
+
+
+class _Tab:
+    """Ein Browser-Tab mit aktuell zugewiesener Suche."""
+
+    def __init__(self, handle: str) -> None:
+        self.handle = handle
+        self.job: Optional[_Job] = None
+        self.origin = ""  # performance.timeOrigin der vorherigen Seite
+        self.started = 0.0
+        self.scrolled = False
+        self.timed_out = False
+        self.not_before: Optional[float] = None  # geplante Navigation (RateGovernor)
+
+
+def _navigate(driver: WebDriver, tab: _Tab, url: str) -> None:
+    driver.switch_to.window(tab.handle)
+    tab.origin = str(driver.execute_script("return String(performance.timeOrigin);"))
+    driver.execute_script("window.location.href = arguments[0];", url)
+    tab.started = time.monotonic()
+    tab.scrolled = False
+    tab.timed_out = False
+    tab.not_before = None
+
+
+def _schedule(governor: RateGovernor, tab: _Tab, url: str) -> None:
+    """
+    Plant den nächsten Seitenaufruf des Tabs (blockiert nicht); ohne freies
+    Token wird zum angegebenen Zeitpunkt erneut reserviert.
+    """
+    tab.not_before = time.monotonic() + governor.reserve(url)
+
+
+def _is_ready(driver: WebDriver, tab: _Tab, timeout: float) -> bool:
+    driver.switch_to.window(tab.handle)
+    origin, state, has_results = driver.execute_script(
+        _STATE_SCRIPT, main.RESULTS_CONTAINER_SELECTOR
+    )
+    if str(origin) == tab.origin or state != "complete":
+        return False
+    if has_results:
+        return True
+    if time.monotonic() - tab.started > timeout:
+        logger.warning("Trefferliste nicht rechtzeitig erschienen – parse trotzdem …")
+        tab.timed_out = True
+        return True
+    return False
+
+
+def scrape_in_tabs(
+    driver: WebDriver,
+    start_urls: Sequence[str],
+    max_pages: int = main.MAX_PAGES,
+    max_tabs: int = MAX_TABS,
+    page_timeout: float = PAGE_TIMEOUT,
+    poll_interval: float = POLL_INTERVAL,
+    stop_conditions: Optional[List[StopCondition]] = None,
+    archive: Optional[PageArchive] = None,
+    governor: Optional[RateGovernor] = None,
+) -> List[List[Offer]]:
+    """
+    Scrapt mehrere Suchen gleichzeitig in Tabs einer Browser-Session.
+
+    Args:
+        driver: Initialisierter WebDriver (z.B. main.start_chrome).
+        start_urls: Erste Suchseite je Suche.
+        max_pages: Maximale Seitenanzahl pro Suche.
+        max_tabs: Maximale Anzahl gleichzeitig offener Tabs.
+        page_timeout: Sekunden bis eine Seite ohne Trefferliste trotzdem geparst wird.
+        poll_interval: Pause zwischen zwei Runden über alle Tabs.
+        stop_conditions: Abbruchkriterien pro Suche (None = default_stop_conditions()).
+        archive: Seitenarchiv für das Roh-HTML (None = nicht archivieren).
+        governor: Tempo pro Host (None = gemeinsamer RateGovernor des Prozesses).
+
+    Returns:
+        Angebotslisten in der Reihenfolge von start_urls.
+    """
+    if stop_conditions is None:
+        stop_conditions = default_stop_conditions()
+    if governor is None:
+        governor = get_governor()
+    jobs = [_Job(i, url) for i, url in enumerate(start_urls)]
+    pending = list(reversed(jobs))
+    if not pending:
+        return []
+
+    # Tabs öffnen: der bestehende Tab + (n-1) neue
+    tabs = [_Tab(driver.current_window_handle)]
+    for _ in range(min(max_tabs, len(jobs)) - 1):
+        driver.switch_to.new_window("tab")
+        tabs.append(_Tab(driver.current_window_handle))
+
+    def next_job(tab: _Tab, job: Optional[_Job]) -> None:
+        """Plant job (bzw. die nächsten wartenden Suchen) im Tab ein."""
+        while job is not None:
+            try:
+                _schedule(governor, tab, job.url)
+            except CircuitOpenError as e:
+                logger.warning("Suche %d abgebrochen: %s", job.index, e)
+                job = pending.pop() if pending else None
+                continue
+            if not job.started:
+                job.started = time.monotonic()
+            tab.job = job
+            return
+        tab.job = None
+
+    for tab in tabs:
+        next_job(tab, pending.pop() if pending else None)
+
+    cookies_done = False
+    try:
+        while any(tab.job for tab in tabs):
+            for tab in tabs:
+                job = tab.job
+                if job is None:
+                    continue
+                if tab.not_before is not None:
+                    if time.monotonic() >= tab.not_before:
+                        next_job(tab, job)  # erneut reservieren (Backoff seither?)
+                        if tab.job is job and tab.not_before <= time.monotonic():
+                            _navigate(driver, tab, job.url)
+                    continue
+                if not _is_ready(driver, tab, page_timeout):
+                    continue
+                if not tab.scrolled:
+                    # Lazy-Loading anstossen, Quelltext in der nächsten Runde holen
+                    driver.execute_script(
+                        "window.scrollTo(0, document.body.scrollHeight);"
+                    )
+                    tab.scrolled = True
+                    continue
+                if not cookies_done:
+                    main.accept_cookies(driver)  # Consent gilt für die ganze Session
+                    cookies_done = True
+
+                html = driver.page_source
+                page_rows, next_url = main.parse_page(html, set())
+                outcome = classify_page(html, len(page_rows), timed_out=tab.timed_out)
+                if archive is not None:
+                    archive.store(html, job.url, job.page, outcome=outcome)
+                governor.record(job.url, outcome, time.monotonic() - tab.started)
+                if outcome in RETRY_OUTCOMES:
+                    job.attempts += 1
+                    logger.warning(
+                        "Tab %s, Suche %d, Seite %d: %s (Versuch %d/%d)",
+                        tab.handle,
+                        job.index,
+                        job.page,
+                        outcome,
+                        job.attempts,
+                        PAGE_RETRIES + 1,
+                    )
+                    if job.attempts <= PAGE_RETRIES:
+                        next_job(tab, job)  # gleiche Seite nach Backoff erneut
+                    else:
+                        next_job(tab, pending.pop() if pending else None)
+                    continue
+                job.attempts = 0
+
+                page_rows, stats = track_page(
+                    job.page, page_rows, job.seen_links, len(job.rows), job.started
+                )
+                job.rows.extend(page_rows)
+                logger.info(
+                    "Tab %s, Suche %d, Seite %d: %d Angebote",
+                    tab.handle,
+                    job.index,
+                    job.page,
+                    len(page_rows),
+                )
+
+                reason = first_stop_reason(stop_conditions, stats) if next_url else None
+                if reason:
+                    logger.info(
+                        "Suche %d: Paginierung beendet nach Seite %d: %s",
+                        job.index,
+                        job.page,
+                        reason,
+                    )
+                if next_url and not reason and job.page < max_pages:
+                    job.page += 1
+                    job.url = urljoin(job.url, next_url)
+                    next_job(tab, job)
+                else:
+                    next_job(tab, pending.pop() if pending else None)
+            time.sleep(poll_interval)
+    finally:
+        # Zusätzliche Tabs schliessen, ersten Tab aktiv lassen
+        for tab in tabs[1:]:
+            try:
+                driver.switch_to.window(tab.handle)
+                driver.close()
+            except Exception:
+                logger.debug("Tab %s konnte nicht geschlossen werden.", tab.handle)
+        driver.switch_to.window(tabs[0].handle)
+
+    return [job.rows for job in jobs]
+
+
+def run_scrape_tabs(
+    searches: Sequence[tuple], max_tabs: int = MAX_TABS, headless: bool = True
+) -> List[List[Offer]]:
+    """
+    Startet einen Chrome-Prozess und scrapt alle (query, preis)-Suchen in Tabs.
+    """
+    driver = main.start_chrome(headless)
+    try:
+        urls = [main.build_search_url(q, p) for q, p in searches]
+        return scrape_in_tabs(
+            driver, urls, max_tabs=max_tabs, archive=open_archive(main.ARCHIVE_DIR)
+        )
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            logger.debug("WebDriver konnte nicht sauber geschlossen werden.")
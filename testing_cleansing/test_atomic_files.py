@@ -0,0 +1,163 @@
+# ---------------------------------------------------------------------------------------------------
+# Unit-Tests für atomic_files.py und die versionierten Ausgaben in main.finish_scrape
+# Testet atomares Ersetzen, O_APPEND-Zeilen und gleichzeitige Suchen mit einem Leser ohne Sperre
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import threading
+
+import pytest
+
+from atomic_files import (
+    append_line,
+    atomic_write,
+    create_with_content,
+    publish_file,
+    replace_symlink,
+)
+from offers import Offer
+
+
+# ----------------------- Test 1 – Atomares Schreiben + Veröffentlichen ----------------------- #
+
+
+def test_atomic_write_replaces_or_keeps_old_content(tmp_path):
+    path = tmp_path / "output_clean.csv"
+    path.write_text("alt\n", encoding="utf-8")
+
+    with open(path, encoding="utf-8") as reader:  # Leser hat die alte Datei offen
+        with atomic_write(path) as f:
+            f.write("neu\n")
+        assert reader.read() == "alt\n"  # alter, vollständiger Stand
+    assert path.read_text(encoding="utf-8") == "neu\n"
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("halb")
+            raise RuntimeError("Abbruch")
+    assert path.read_text(encoding="utf-8") == "neu\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["output_clean.csv"]
+
+    src = tmp_path / "v1.csv"
+    src.write_text("v1\n", encoding="utf-8")
+    publish_file(src, path)
+    assert path.read_text(encoding="utf-8") == "v1\n" and src.exists()
+
+
+def test_publish_file_and_replace_symlink_from_many_threads(tmp_path):
+    """Gleichzeitiges Veröffentlichen derselben Datei: keine Fehler, keine Reste."""
+    sources = []
+    for n in range(16):
+        src = tmp_path / "src" / f"v{n}"
+        src.mkdir(parents=True)
+        (src / "data.csv").write_text(f"v{n}\n", encoding="utf-8")
+        sources.append(src)
+    dest, link = tmp_path / "data.csv", tmp_path / "current"
+    errors = []
+
+    def worker(src):
+        try:
+            for _ in range(50):
+                publish_file(src / "data.csv", dest)
+                replace_symlink(src.relative_to(tmp_path), link)
+        except Exception as e:  # pragma: no cover - nur bei Fehlschlag
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(src,)) for src in sources]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["current", "data.csv", "src"]
+    versions = {f"v{n}\n" for n in range(16)}
+    assert dest.read_text(encoding="utf-8") in versions
+    assert (link / "data.csv").read_text(encoding="utf-8") in versions
+
+
+def test_append_line_from_many_threads(tmp_path):
+    path = tmp_path / "data.csv"
+    assert create_with_content(path, "Produkt,Preis\n")
+    assert not create_with_content(path, "doppelt\n")
+
+    def worker(n):
+        for i in range(200):
+            append_line(path, f"Ski {n}-{i},{'9' * 50}\n")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    rows = list(csv.reader(path.open(encoding="utf-8")))
+    assert len(rows) == 1 + 8 * 200
+    assert all(len(r) == 2 and r[1] == "9" * 50 for r in rows[1:])
+
+
+# ----------------------- Test 2 – Gleichzeitige Suchen, Leser ohne Sperre ----------------------- #
+
+
+def test_concurrent_finish_scrape_publishes_complete_snapshots(tmp_path, monkeypatch):
+    import main
+
+    for name, value in {
+        "CSV_DATA_PATH": tmp_path / "output_scraper.csv",
+        "CLEANED_DATA_PATH": tmp_path / "output_clean.csv",
+        "CLEANED_STATS_PATH": tmp_path / "output_clean.stats.json",
+        "OUTPUT_DIR": tmp_path / "outputs",
+        "HISTORY_DIR": tmp_path / "history",
+        "OFFER_DB_PATH": tmp_path / "offers.db",
+        "CACHE_DB_PATH": tmp_path / "cache.db",
+    }.items():
+        monkeypatch.setattr(main, name, value)
+
+    def offers(query, n):
+        return [
+            Offer.create(
+                titel=f"{query} Angebot {i}",
+                preis=f"CHF {i},00",
+                land="aus Schweiz",
+                link=f"https://www.ebay.ch/itm/{i}?_skw={query}",
+            )
+            for i in range(1, n + 1)
+        ]
+
+    sizes = {"ski": 40, "jacke": 70}
+    stop = threading.Event()
+    seen = set()
+
+    def reader():
+        while not stop.is_set():
+            out_dir = main.published_output_dir()
+            if out_dir is not None:
+                clean = main.published_file(main.CLEANED_DATA_PATH, out_dir)
+                stats = main.load_stats(
+                    main.published_file(main.CLEANED_STATS_PATH, out_dir)
+                )
+                seen.add((len(list(main.iter_rows_for_table(clean))), stats["rows"]))
+
+    reading = threading.Thread(target=reader)
+    reading.start()
+    writers = [
+        threading.Thread(
+            target=lambda q=q, n=n: [
+                main.finish_scrape(offers(q, n), search_id=q) for _ in range(3)
+            ]
+        )
+        for q, n in sizes.items()
+    ]
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    stop.set()
+    reading.join()
+
+    # nie eine halbe Datei, Kennzahlen immer vom selben Lauf wie die Zeilen
+    assert seen and seen <= {(n, n) for n in sizes.values()}
+    assert len(list((tmp_path / "outputs" / "ski").iterdir())) <= 3
+    raw_path = main.published_file(main.CSV_DATA_PATH)
+    raw = list(csv.reader(raw_path.open(encoding="utf-8")))
+    assert len(raw) - 1 in sizes.values()
+    assert raw_path.parent == main.published_output_dir()
+    assert not main.CLEANED_DATA_PATH.exists()  # feste Pfade nur als Ausgangsstand
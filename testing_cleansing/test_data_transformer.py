@@ -81,3 +81,173 @@ def test_find_col_handles_case_and_whitespace():
 
     # Erwartung: nicht vorhandene Spalten liefern None
     assert find_col(df, ["foobar"]) is None
+
+
+# ----------------------- Test 5 – URL-Spalte + product_name (vektorisiert) --------------------------- #
+
+
+def test_find_first_url_column_and_skw_series_match_rowwise_extraction():
+    """
+    Prüft, ob die URL-Spalte auch hinter Nicht-URL-Spalten gefunden wird und die vektorisierte
+    _skw-Extraktion dieselben Werte liefert wie extract_skw_from_url pro Zeile.
+    """
+    import pandas as pd
+    from data_transformer_cleansing import (
+        extract_skw_from_url,
+        extract_skw_series,
+        find_first_url_column,
+    )
+
+    urls = [
+        "https://www.ebay.ch/itm/1?_skw=ski&hash=abc",
+        "https://www.ebay.ch/itm/2?skw=ski+schuhe&_skw=other",
+        "https://www.ebay.ch/itm/3?_skw=sk%C3%B6cke",
+        "https://www.ebay.ch/itm/4?x=1",
+        "https://www.ebay.ch/itm/5?_skw=&skw=",
+        None,
+    ]
+    df = pd.DataFrame(
+        {"Titel": ["a"] * 6, "Preis": [1.0] * 6, "link": urls, "image": ["x"] * 6}
+    )
+
+    assert find_first_url_column(df) == "link"
+
+    vectorized = extract_skw_series(df["link"]).tolist()
+    rowwise = [extract_skw_from_url(u) for u in urls]
+    assert [v if isinstance(v, str) else None for v in vectorized] == rowwise
+    assert vectorized[:3] == ["Ski", "Ski schuhe", "Sköcke"]
+
+
+# ----------------------- Test 6 – Quarantäne statt Prozessabbruch ------------------------------------ #
+
+
+def _raw_frame():
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "titel": ["Ski A", "Ski B", "Ski C"],
+            "aktualitaet": ["Neu |", "Gebraucht |", ""],
+            "preis": ["CHF 10,00", "kein Preis", "CHF 30,50"],
+            "land": ["aus Deutschland", "aus Schweiz", "aus GroÃYbritannien"],
+            "versand": ["+CHF 5,00 Versand", "", "Kostenloser Versand"],
+            "link": [
+                "https://www.ebay.ch/itm/1?_skw=ski",
+                "https://www.ebay.ch/itm/2?_skw=ski",
+                "https://www.ebay.ch/itm/3",
+            ],
+        }
+    )
+
+
+def test_transform_frame_quarantines_invalid_rows():
+    """Ungültige Zeilen landen in der Quarantäne, gültige werden bereinigt."""
+    from data_transformer_cleansing import transform_frame
+
+    result = transform_frame(_raw_frame())
+
+    assert not result.ok
+    assert result.data["title"].tolist() == ["Ski A"]
+    assert result.data["price_with_shipping"].tolist() == [15.0]
+    assert sorted(result.quarantine["quarantine_reason"]) == ["price", "product_name"]
+    assert {(i.row, i.field) for i in result.issues} == {
+        (1, "price"),
+        (2, "product_name"),
+    }
+
+
+def test_transform_frame_raises_on_missing_price_column():
+    """Fehlende Pflichtspalte löst TransformError aus (kein sys.exit)."""
+    import pytest
+    from data_transformer_cleansing import TransformError, transform_frame
+
+    with pytest.raises(TransformError):
+        transform_frame(_raw_frame().drop(columns=["preis"]))
+
+
+def test_transform_runs_in_parallel_threads(tmp_path):
+    """Mehrere Bereinigungen laufen parallel mit expliziten Ein-/Ausgabepfaden."""
+    from concurrent.futures import ThreadPoolExecutor
+    from data_transformer_cleansing import transform
+
+    jobs = []
+    for i in range(4):
+        src = tmp_path / f"raw_{i}.csv"
+        _raw_frame().to_csv(src, index=False)
+        jobs.append((src, tmp_path / f"clean_{i}.csv", tmp_path / f"quar_{i}.csv"))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda job: transform(*job), jobs))
+
+    for (_src, out, quar), result in zip(jobs, results):
+        assert out.exists() and quar.exists()
+        assert len(result.data) == 1 and len(result.quarantine) == 2
+
+
+# ----------------------- Test 7 – Kennzahlen pro Suche (TransformResult.stats + stats.json) ----------------------- #
+
+
+def test_transform_computes_and_persists_stats(tmp_path):
+    """Quantile, Häufigkeiten und günstigste Angebote werden vektorisiert berechnet."""
+    import json
+
+    import pandas as pd
+    from data_transformer_cleansing import compute_stats, default_stats_path, transform
+
+    df = pd.DataFrame(
+        {
+            "title": ["A", "B", "C", "D"],
+            "product_condition": ["Neu", "Neu", "Gebraucht", "Neu"],
+            "price": [10.0, 20.0, 30.0, 40.0],
+            "currency": ["CHF", "CHF", "EUR", "CHF"],
+            "product_origin": ["Schweiz", "Deutschland", "Schweiz", "Schweiz"],
+            "price_with_shipping": [15.0, 20.0, 30.0, 41.0],
+            "link": ["l1", "l2", "l3", "l4"],
+        }
+    )
+    stats = compute_stats(df, cheapest_n=2)
+    assert stats["rows"] == 4
+    assert stats["counts"]["currency"] == {"CHF": 3, "EUR": 1}
+    assert stats["counts"]["origin"] == {"Schweiz": 3, "Deutschland": 1}
+    assert stats["price"]["min"] == 10.0 and stats["price"]["max"] == 40.0
+    assert stats["price"]["median"] == 25.0 and stats["price"]["p25"] == 17.5
+    assert [row["title"] for row in stats["cheapest"]] == ["A", "B"]
+    assert compute_stats(df.iloc[0:0])["price"]["median"] is None
+
+    src, out = tmp_path / "raw.csv", tmp_path / "clean.csv"
+    _raw_frame().to_csv(src, index=False)
+    result = transform(src, out)
+    with open(default_stats_path(out), encoding="utf-8") as f:
+        assert json.load(f) == result.stats
+    assert result.stats["rows"] == 1
+
+
+# ----------------------- Test 8 – URL-Spalte: 'link' vor 'image' --------------------------- #
+
+
+def test_find_first_url_column_keeps_column_order_with_link_and_image():
+    """
+    Enthalten 'link' und 'image' URLs, gewinnt die vordere Spalte – auch nachdem eine
+    Eingabe mit gleichen Spalten, aber leerer 'link'-Spalte 'image' geliefert hat.
+    """
+    import pandas as pd
+    from data_transformer_cleansing import find_first_url_column
+
+    links = [f"https://www.ebay.ch/itm/{i}?_skw=ski" for i in range(200)]
+    images = [f"https://i.ebayimg.com/images/g/{i}/s-l500.jpg" for i in range(200)]
+
+    df = pd.DataFrame({"title": ["Ski"] * 200, "link": links, "image": images})
+    assert find_first_url_column(df) == "link"
+    assert find_first_url_column(df[["title", "image", "link"]]) == "image"
+
+    empty_links = pd.DataFrame(
+        {"title": ["Ski"] * 200, "link": [None] * 200, "image": images}
+    )
+    assert find_first_url_column(empty_links) == "image"
+    assert find_first_url_column(df) == "link"
+
+    # 'link' nur ausserhalb der Stichprobe: Volltextsuche, wenn keine Stichprobe trifft
+    sparse = [None] * 200
+    sparse[1] = links[1]
+    df = pd.DataFrame({"title": ["Ski"] * 200, "link": sparse, "image": ["x"] * 200})
+    assert find_first_url_column(df, sample_size=10) == "link"
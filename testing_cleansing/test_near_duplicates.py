@@ -0,0 +1,59 @@
+# ---------------------------------------------------------------------------------------------------
+# Unit-Tests für near_duplicates.py
+# Testet MinHash-Signaturen, Cluster-Bildung (Titel + Preisnähe) und die cluster_id im Transformer
+# ---------------------------------------------------------------------------------------------------
+
+import numpy as np
+
+from near_duplicates import cluster_ids, minhash_signatures, normalize
+
+ELAN_A = "SKI ELAN EXPLORE 6 - 2024 - 160 cm   -USED (022JG)"
+ELAN_B = "SKI ELAN EXPLORE 6 - 2024 - 160 cm   -USED (MC013)"
+OTHER = "Dynastar Skifelle mit Tasche"
+
+
+# ----------------------- Test 1 – Normalisierung und Signaturen ----------------------- #
+
+
+def test_signatures_are_deterministic_and_similar_for_variants():
+    assert normalize("  SKI-Elan, 160cm!") == "ski elan 160cm"
+    sig = minhash_signatures([ELAN_A, ELAN_B, OTHER, ELAN_A])
+    assert sig.shape == (4, 64)
+    assert (sig[0] == sig[3]).all()  # gleicher Titel -> gleiche Signatur
+    assert np.mean(sig[0] == sig[1]) > 0.6
+    assert np.mean(sig[0] == sig[2]) < 0.3
+
+
+# ----------------------- Test 2 – Cluster (SKU-Suffix, Preisabstand) ----------------------- #
+
+
+def test_cluster_ids_group_variants_with_close_prices():
+    titles = [ELAN_A, OTHER, ELAN_B, ELAN_A]
+    assert cluster_ids(titles, [31.44, 26.87, 32.10, 31.44]) == [0, 1, 0, 0]
+    # gleicher Titel, aber deutlich anderer Preis -> eigenes Angebot
+    assert cluster_ids(titles, [31.44, 26.87, 80.0, 31.44]) == [0, 1, 2, 0]
+    # ohne Preise nur nach Titel
+    assert cluster_ids(titles) == [0, 1, 0, 0]
+    assert cluster_ids([]) == []
+
+
+# ----------------------- Test 3 – cluster_id im Transformer ----------------------- #
+
+
+def test_transform_frame_adds_cluster_id():
+    import pandas as pd
+
+    from data_transformer_cleansing import offers_from_frame, transform_frame
+
+    link = "https://www.ebay.ch/itm/{}?_skw=ski"
+    raw = pd.DataFrame(
+        {
+            "titel": [ELAN_A, ELAN_B, OTHER],
+            "preis": ["CHF 31,44", "CHF 31,44", "CHF 26,87"],
+            "link": [link.format(1), link.format(2), link.format(3)],
+        }
+    )
+    result = transform_frame(raw)
+    assert result.data["cluster_id"].tolist() == [0, 0, 1]
+    assert result.stats["clusters"] == 2
+    assert [o.cluster_id for o in offers_from_frame(result.data)] == ["0", "0", "1"]
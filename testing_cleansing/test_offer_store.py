@@ -0,0 +1,85 @@
+# ---------------------------------------------------------------------------------------------------
+# Unit-Tests für offer_store.py
+# Testet Titel-Normalisierung, FTS5-Ausdrücke (AND/Präfix), Upsert per Artikelnummer und Suche
+# ---------------------------------------------------------------------------------------------------
+
+from offer_store import OfferStore, match_expression, normalize_title
+
+
+def _row(item: int, title: str, product_name: str = "Ski", price: float = 10.0):
+    return {
+        "title": title,
+        "price": price,
+        "currency": "CHF",
+        "product_origin": "Schweiz",
+        "product_name": product_name,
+        "link": f"https://www.ebay.ch/itm/{item}?_skw={product_name.lower()}",
+    }
+
+
+# ----------------------- Test 1 – Normalisierung und Suchausdruck ----------------------- #
+
+
+def test_normalize_title_and_match_expression():
+    assert normalize_title("SKI Elan 176cm") == "ski elan 176 cm"
+    assert match_expression("176cm") == '"176" AND "cm"'
+    assert match_expression("Elan expl*") == '"elan" AND "expl"*'
+    assert match_expression('"a" OR (b') == '"a" AND "or" AND "b"'  # keine FTS-Syntax
+    assert match_expression("  ") is None
+
+
+# ----------------------- Test 2 – Upsert + Suche ----------------------- #
+
+
+def test_search_and_upsert(tmp_path):
+    store = OfferStore(tmp_path / "offers.db")
+    store.index_rows(
+        [
+            _row(1, "SKI ELAN ELEMENT 176 - 2023 - 176 cm -USED"),
+            _row(2, "SKI ELAN EXPLORE 6 - 2024 - 160cm"),
+            _row(3, "Völkl Deacon 176 cm"),
+            _row(4, "Daunenjacke 176 cm", product_name="Jacke"),
+        ]
+    )
+    assert {o.titel[:8] for o in store.search("176 cm")} == {
+        "SKI ELAN",
+        "Völkl De",
+        "Daunenja",
+    }
+    assert len(store.search("176 cm", product_name="ski")) == 2
+    assert [o.link[-8:] for o in store.search("elan expl*")] == ["_skw=ski"]
+    assert len(store.search("volkl")) == 1  # Akzente werden ignoriert
+    assert store.search("") == []
+
+    # Erneutes Indexieren derselben Artikelnummer aktualisiert statt zu duplizieren
+    store.index_rows([_row(2, "SKI ELAN EXPLORE 6 - 2024 - 166cm", price=9.5)])
+    assert store.count() == 4
+    assert store.search("160 cm") == []
+    assert store.search("166 cm")[0].preis == "9.5"
+
+
+# ----------------------- Test 3 – Zuordnung zu Suchen + Cursor-Pagination ----------------------- #
+
+
+def test_iter_offers_pages_by_cursor_and_search(tmp_path):
+    store = OfferStore(tmp_path / "offers.db")
+    store.index_rows([_row(i, f"Ski {i}") for i in range(1, 6)], search_id="a")
+    store.index_rows([_row(4, "Ski 4"), _row(9, "Jacke", "Jacke")], search_id="b")
+
+    first = list(store.iter_offers(["id", "title"], limit=2))
+    assert [r["title"] for r in first] == ["Ski 1", "Ski 2"]
+    rest = list(store.iter_offers(["id", "title"], after=first[-1]["id"]))
+    assert [r["title"] for r in rest] == ["Ski 3", "Ski 4", "Ski 5", "Jacke"]
+
+    assert [r["item_id"] for r in store.iter_offers(["item_id"], search_id="b")] == [
+        "4",
+        "9",
+    ]
+    assert [r["price"] for r in store.iter_offers(["price"], product_name="jacke")] == [
+        10.0
+    ]
+    assert store.has_search("a") and not store.has_search("c")
+
+    # Neuer Lauf derselben Suche ersetzt deren Zuordnung
+    store.index_rows([_row(1, "Ski 1")], search_id="a")
+    assert len(list(store.iter_offers(["id"], search_id="a"))) == 1
@@ -0,0 +1,130 @@
+# ---------------------------------------------------------------------------------------------------
+# Unit-Tests für price_history.py
+# Testet append-only Beobachtungen, inkrementelle Rollups (Stunde/Tag) und die Abfrage-API
+# ---------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_history import PriceHistory, compute_rollup
+
+DAY = 86400
+T0 = 1_700_006_400  # Beginn eines UTC-Tages
+
+
+# ----------------------- Test 1 – Inkrementelle Rollups = Neuberechnung aus Rohdaten ----------------------- #
+
+
+def test_incremental_rollups_match_full_recompute(tmp_path):
+    history = PriceHistory(tmp_path)
+    rng = np.random.default_rng(7)
+    for step in range(30):  # 30 Scrapes im Abstand von 2 Stunden
+        prices = rng.uniform(10, 100, size=20).round(2)
+        history.append(
+            "Ski",
+            [str(1000 + i) for i in range(20)],
+            prices,
+            prices + 5.0,
+            ts=T0 + step * 7200,
+        )
+
+    raw = history.observations("Ski")
+    assert len(raw) == 600
+    for resolution, seconds in (("hour", 3600), ("day", DAY)):
+        expected = compute_rollup(raw, seconds)
+        stored = history.rollup("Ski", resolution)
+        assert stored["bucket"].tolist() == expected["bucket"].tolist()
+        for name in expected.dtype.names:
+            np.testing.assert_allclose(stored[name], expected[name])
+
+    days = history.rollup(
+        "ski", "day"
+    )  # Schlüssel unabhängig von Gross-/Kleinschreibung
+    assert days["count"].tolist() == [240, 240, 120]
+    assert days["price_min"][0] == raw["price"][raw["ts"] < T0 + DAY].min()
+
+
+# ----------------------- Test 2 – Abfragen: Zeitfenster, einzelner Artikel, Validierung ----------------------- #
+
+
+def test_query_api(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.append("Ski", ["1", "2"], [10.0, 20.0], [12.0, 22.0], ts=T0)
+    history.append("Ski", ["1", "2"], [9.0, 21.0], [11.0, 23.0], ts=T0 + DAY)
+
+    assert history.observations("Ski", item_id="1")["price"].tolist() == [10.0, 9.0]
+    assert len(history.observations("Ski", start=T0 + 1)) == 2
+    assert history.rollup("Ski", "day", start=T0 + DAY)["price_min"].tolist() == [9.0]
+    assert len(history.rollup("Unbekannt", "day")) == 0
+
+    with pytest.raises(ValueError):
+        history.rollup("Ski", "minute")
+    with pytest.raises(ValueError):
+        history.append("Ski", ["1"], [1.0], [1.0], ts=T0)  # vor letzter Beobachtung
+
+
+# ----------------------- Test 3 – Übernahme der bereinigten Daten (output_clean.csv) ----------------------- #
+
+
+def test_record_frame_groups_by_product_name(tmp_path):
+    df = pd.DataFrame(
+        {
+            "product_name": ["Ski", "Ski", "Jacke"],
+            "price": [31.44, 40.0, 70.0],
+            "price_with_shipping": [33.99, 40.0, 75.0],
+            "link": [
+                "https://www.ebay.ch/itm/277557977505?_skw=ski",
+                "https://www.ebay.ch/itm/277557977506?_skw=ski",
+                "https://www.ebay.ch/itm/1?_skw=jacke",
+            ],
+        }
+    )
+    history = PriceHistory(tmp_path)
+    assert history.record_frame(df, ts=T0) == 3
+    assert history.product_names() == ["jacke", "ski"]
+    ski = history.observations("Ski", item_id="277557977505")
+    assert ski["price_with_shipping"].tolist() == [33.99]
+
+
+# ----------------------- Test 4 – Gleichzeitiges Anhängen (Threads und Prozesse) ----------------------- #
+
+
+def _append_many(root, worker, count):
+    history = PriceHistory(root)  # eigene Instanz wie ein eigener Worker-Prozess
+    for i in range(count):
+        history.append("Ski", [f"{worker}{i:04d}"], [10.0 + i], [12.0 + i])
+
+
+def test_concurrent_appends_keep_every_observation(tmp_path):
+    import multiprocessing
+    import threading
+
+    threads = [
+        threading.Thread(target=_append_many, args=(tmp_path, n, 8)) for n in range(4)
+    ]
+    processes = [
+        multiprocessing.get_context("spawn").Process(
+            target=_append_many, args=(tmp_path, 10 + n, 5)
+        )
+        for n in range(2)
+    ]
+    for worker in threads + processes:
+        worker.start()
+    for worker in threads + processes:
+        worker.join()
+    assert all(p.exitcode == 0 for p in processes)
+
+    history = PriceHistory(tmp_path)
+    observations = history.observations("Ski")
+    assert len(observations) == 4 * 8 + 2 * 5
+    assert np.all(np.diff(observations["ts"]) >= 0)
+    for resolution, seconds in (("hour", 3600), ("day", 86400)):
+        expected = compute_rollup(observations, seconds)
+        np.testing.assert_array_equal(history.rollup("Ski", resolution), expected)
+    assert sorted(p.name for p in (tmp_path / "ski").iterdir()) == [
+        ".lock",
+        "day.npy",
+        "hour.npy",
+        "observations.bin",
+    ]
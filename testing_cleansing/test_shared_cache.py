@@ -0,0 +1,112 @@
+# ---------------------------------------------------------------------------------------------------
+# Unit-Tests für shared_cache.py
+# Testet versionierte Datensätze (Fingerabdruck, atomarer Wechsel über Prozesse) und Einträge mit Ablauf
+# ---------------------------------------------------------------------------------------------------
+
+import multiprocessing
+import time
+
+from shared_cache import SharedCache, file_fingerprint
+
+
+# ----------------------- Test 1 – Datensätze + Fingerabdruck ----------------------- #
+
+
+def test_get_or_build_only_builds_for_new_fingerprint(tmp_path):
+    cache = SharedCache(tmp_path / "cache.db")
+    source = tmp_path / "output_clean.csv"
+    source.write_text("title\nSki\n", encoding="utf-8")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return source.read_text(encoding="utf-8").splitlines()
+
+    fp = file_fingerprint(source)
+    assert cache.get_or_build("rows", fp, build) == ["title", "Ski"]
+    # zweiter "Worker" (eigene Instanz) liest die veröffentlichte Version
+    assert SharedCache(tmp_path / "cache.db").get_or_build("rows", fp, build) == [
+        "title",
+        "Ski",
+    ]
+    assert len(builds) == 1
+
+    time.sleep(0.01)
+    source.write_text("title\nSki\nJacke\n", encoding="utf-8")
+    assert cache.load("rows", file_fingerprint(source)) is None  # veraltet
+    assert cache.get_or_build("rows", file_fingerprint(source), build)[-1] == "Jacke"
+    assert cache.info("rows").version == 2
+    assert file_fingerprint(tmp_path / "fehlt.csv") == ""
+
+
+# ----------------------- Test 2 – Atomarer Wechsel über Prozesse ----------------------- #
+
+
+def _publisher(path, versions):
+    cache = SharedCache(path)
+    for v in range(versions):
+        cache.publish("rows", [v] * 5000, fingerprint=str(v))
+
+
+def test_readers_never_see_partial_versions(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = SharedCache(path)
+    cache.publish("rows", [-1] * 5000, fingerprint="start")
+
+    writer = multiprocessing.get_context("spawn").Process(
+        target=_publisher, args=(path, 30)
+    )
+    writer.start()
+    seen = set()
+    while writer.is_alive():
+        value = cache.load("rows")
+        assert len(value) == 5000 and len(set(value)) == 1  # immer vollständig
+        seen.add(value[0])
+    writer.join()
+    assert writer.exitcode == 0
+    assert cache.load("rows")[0] == 29
+    assert cache.info("rows").fingerprint == "29"
+
+
+# ----------------------- Test 3 – Einträge mit Ablauf ----------------------- #
+
+
+def test_entries_expire_and_clear(tmp_path):
+    cache = SharedCache(tmp_path / "cache.db")
+    cache.set("search", "176 cm", ["a"], ttl=60)
+    cache.set("search", "alt", ["b"], ttl=-1)
+    assert cache.get("search", "176 cm") == ["a"]
+    assert cache.get("search", "alt") is None
+    assert cache.purge_expired() == 1
+    assert cache.clear("search") == 1
+    assert cache.get("search", "176 cm") is None
+
+
+# ----------------------- Test 4 – Suchcache in main.cached_search ----------------------- #
+
+
+def test_cached_search_survives_cache_write_errors(tmp_path, monkeypatch):
+    import sqlite3
+
+    import main
+
+    monkeypatch.setattr(main, "CACHE_DB_PATH", tmp_path / "cache.db")
+    calls = []
+
+    class _Store:
+        def search(self, q, product_name=None):
+            calls.append(q)
+            return [q]
+
+    monkeypatch.setattr(main, "get_offer_store", lambda: _Store())
+    cache = main.get_shared_cache()
+    cache.set("search", "abgelaufen", ["x"], ttl=-1)
+    assert main.cached_search("ski") == ["ski"]
+    assert main.cached_search("ski") == ["ski"] and calls == ["ski"]  # Treffer
+    assert cache.purge_expired() == 0  # beim Schreiben bereits entfernt
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "set", locked)
+    assert main.cached_search("jacke") == ["jacke"]  # kein Fehler für den Aufrufer
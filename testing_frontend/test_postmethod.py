@@ -29,3 +29,135 @@ def test_submit_post_redirects_correctly(mock_run_scrape, client):
 
     # 3) Sicherstellen, dass run_scrape genau 1× aufgerufen wurde
     mock_run_scrape.assert_called_once()
+
+
+def test_api_stats_serves_precomputed_stats(client, tmp_path, monkeypatch):
+    import json
+
+    import main
+
+    path = tmp_path / "output_clean.stats.json"
+    monkeypatch.setattr(main, "CLEANED_STATS_PATH", path)
+    monkeypatch.setattr(
+        main, "OUTPUT_DIR", tmp_path / "outputs"
+    )  # nichts veröffentlicht
+    assert client.get("/api/stats").status_code == 404
+
+    path.write_text(
+        json.dumps({"rows": 2, "price": {"median": 12.5}}), encoding="utf-8"
+    )
+    response = client.get("/api/stats")
+    assert response.status_code == 200
+    assert response.get_json()["price"]["median"] == 12.5
+
+
+def test_results_page_filters_by_keyword(client, tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "OFFER_DB_PATH", tmp_path / "offers.db")
+    monkeypatch.setattr(main, "CACHE_DB_PATH", tmp_path / "cache.db")
+    main.get_offer_store().index_rows(
+        [
+            {
+                "title": "Elan Ski 176 cm",
+                "product_name": "Ski",
+                "link": "https://x/itm/1",
+            },
+            {
+                "title": "Elan Ski 160 cm",
+                "product_name": "Ski",
+                "link": "https://x/itm/2",
+            },
+        ]
+    )
+    html = client.get("/suchresultat?q=176cm&produkt=Ski").get_data(as_text=True)
+    assert "Elan Ski 176 cm" in html
+    assert "Elan Ski 160 cm" not in html
+
+
+def test_stream_pushes_rows_per_page(client, monkeypatch):
+    import json
+
+    import main
+    from offers import Offer
+
+    pages = [
+        [Offer.create(titel="Ski A", preis="10.0", link="https://x/itm/1")],
+        [Offer.create(titel="Ski B", preis="12.0", link="https://x/itm/2")],
+    ]
+    monkeypatch.setattr(main, "run_scrape_stream", lambda query, preis: iter(pages))
+
+    response = client.get("/suchresultat/stream?produkt=Ski&preis=100")
+    assert response.mimetype == "text/event-stream"
+    events = [
+        (block.split("\n")[0][len("event: ") :], json.loads(block.split("data: ")[1]))
+        for block in response.get_data(as_text=True).strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["page", "page", "done"]
+    assert events[0][1]["rows"][0]["titel"] == "Ski A"
+    assert events[1][1]["total"] == 2
+    assert events[2][1]["url"] == "/suchresultat"
+
+
+def test_live_page_links_stream(client, monkeypatch):
+    import main
+
+    logged = []
+    monkeypatch.setattr(main, "log_search", lambda *args: logged.append(args))
+    html = client.get("/suchresultat/live?produkt=Ski&preis=100").get_data(as_text=True)
+    assert "/suchresultat/stream?produkt=Ski" in html
+    assert logged == []  # GET (Neuladen, Prefetch) zählt nicht als Sucheingabe
+    assert client.get("/suchresultat/live").status_code == 302
+
+
+def test_api_offers_pages_and_streams(client, tmp_path, monkeypatch):
+    import json
+
+    import main
+
+    monkeypatch.setattr(main, "OFFER_DB_PATH", tmp_path / "offers.db")
+    search_id = main.make_search_id("Ski", "100")
+    main.get_offer_store().index_rows(
+        [
+            {"title": f"Ski {i}", "price": float(i), "link": f"https://x/itm/{i}"}
+            for i in range(1, 4)
+        ],
+        search_id=search_id,
+    )
+
+    page = client.get("/api/offers?fields=title,price&limit=2").get_json()
+    assert page["items"] == [
+        {"title": "Ski 1", "price": 1.0},
+        {"title": "Ski 2", "price": 2.0},
+    ]
+    page = client.get(f"/api/offers?limit=2&cursor={page['next_cursor']}").get_json()
+    assert [r["title"] for r in page["items"]] == ["Ski 3"]
+    assert page["next_cursor"] is None
+
+    response = client.get(f"/api/searches/{search_id}/offers?format=ndjson&fields=id")
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    assert client.get("/api/searches/unbekannt/offers").status_code == 404
+    assert client.get("/api/offers?fields=passwort").status_code == 400
+    for bad in ("limit=-5", "limit=0", "limit=viele", "cursor=-1", "cursor=x"):
+        assert client.get(f"/api/offers?{bad}").status_code == 400, bad
+    assert client.get("/api/offers?format=ndjson&limit=-1").status_code == 400
+
+
+def test_api_popular_searches(client, tmp_path, monkeypatch):
+    import main
+    from search_log import open_search_log
+
+    monkeypatch.setattr(main, "CSV_PATH", tmp_path / "data.csv")
+    monkeypatch.setattr(main, "SEARCH_DB_PATH", tmp_path / "search_log.db")
+    for query in ("Ski", "ski", "Jacke"):
+        main.log_search(query, "100", "")
+    open_search_log(main.CSV_PATH, main.SEARCH_DB_PATH).flush()
+
+    top = client.get("/api/searches/popular?limit=1").get_json()
+    assert len(top) == 1
+    assert len(client.get("/api/searches/popular?limit=-5").get_json()) == 1
+    assert (top[0]["query"], top[0]["hits"]) == ("ski", 2)
+    assert top[0]["search_id"] == main.make_search_id("Ski", "100")
@@ -0,0 +1,30 @@
+# ---------------------------------------------------------------------------------------------------
+# Lasttest-Smoke: load_test.py gegen mock_ebay.py (App als Unterprozess, HTTP-Scraper, /submit End-to-End)
+# Kleine Last mit Captcha-Seiten; alle Requests müssen durchlaufen und der Bericht vollständig sein.
+# Volle Last direkt ausführen: python load_test.py --requests 40 --concurrency 8 --rate 20
+# ---------------------------------------------------------------------------------------------------
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from load_test import format_report, percentile, run_load_test  # noqa: E402
+from mock_ebay import MockConfig, MockEbay  # noqa: E402
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([4.0, 1.0], 100) == 4.0
+
+
+def test_submit_load_end_to_end():
+    mock = MockEbay(
+        MockConfig(pages=2, cards=20, latency=0.02, captcha_rate=0.05, seed=7)
+    )
+    report = run_load_test(mock, requests=6, concurrency=3, queries=3, rate=50)
+    print(format_report(report))
+    assert report.ok == report.requests and not report.errors
+    assert report.mock["pages"] == 6 * 2  # jede Suche bis zur letzten Seite
+    assert 0 < report.latency["p50"] <= report.latency["p95"] <= report.latency["max"]
+    assert report.throughput > 0 and report.pages_per_s > 0
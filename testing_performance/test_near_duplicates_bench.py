@@ -0,0 +1,104 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark für near_duplicates.py
+# Vergleicht MinHash/LSH mit dem paarweisen Vergleich aller Titel (exakte Jaccard-Ähnlichkeit):
+# gleiche Cluster auf den echten Daten, deutlich schneller bei wachsender Zeilenzahl.
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_near_duplicates_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import random
+import time
+from pathlib import Path
+
+from near_duplicates import (
+    SHINGLE_SIZE,
+    SIMILARITY_THRESHOLD,
+    _prices_close,
+    _UnionFind,
+    cluster_ids,
+    normalize,
+)
+
+CLEAN_CSV = Path(__file__).resolve().parent.parent / "output_clean.csv"
+
+
+# ----------------------- Referenz: paarweiser Vergleich (quadratisch) ----------------------- #
+
+
+def _shingle_set(title):
+    text = normalize(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def pairwise_cluster_ids(titles, prices):
+    sets = [_shingle_set(t) for t in titles]
+    uf = _UnionFind(len(titles))
+    for i in range(len(titles)):
+        for j in range(i + 1, len(titles)):
+            jaccard = len(sets[i] & sets[j]) / len(sets[i] | sets[j])
+            if jaccard >= SIMILARITY_THRESHOLD and _prices_close(prices[i], prices[j]):
+                uf.union(i, j)
+    ids = {}
+    return [ids.setdefault(uf.find(i), len(ids)) for i in range(len(titles))]
+
+
+def _corpus():
+    with open(CLEAN_CSV, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return [r["title"] for r in rows], [float(r["price"]) for r in rows]
+
+
+def _scaled(copies: int, seed: int = 7):
+    """Vervielfacht die echten Titel mit zufälligen SKU-Suffixen (Wiedereinstellungen)."""
+    rng = random.Random(seed)
+    titles, prices = _corpus()
+    out_t, out_p = [], []
+    for _ in range(copies):
+        for title, price in zip(titles, prices):
+            out_t.append(f"{title} ({rng.randrange(16**5):05X})")
+            out_p.append(round(price * rng.uniform(0.97, 1.03), 2))
+    return out_t, out_p
+
+
+def _partition(ids):
+    groups = {}
+    for pos, cid in enumerate(ids):
+        groups.setdefault(cid, []).append(pos)
+    return sorted(tuple(g) for g in groups.values())
+
+
+def test_lsh_matches_pairwise_on_real_titles():
+    """Auf output_clean.csv findet LSH (fast) dieselben Cluster wie der Vollvergleich."""
+    titles, prices = _corpus()
+    lsh, exact = _partition(cluster_ids(titles, prices)), _partition(
+        pairwise_cluster_ids(titles, prices)
+    )
+    agree = len(set(lsh) & set(exact)) / len(exact)
+    assert agree >= 0.95
+
+
+def _bench(copies: int):
+    titles, prices = _scaled(copies)
+    start = time.perf_counter()
+    cluster_ids(titles, prices)
+    t_lsh = time.perf_counter() - start
+    start = time.perf_counter()
+    pairwise_cluster_ids(titles, prices)
+    t_pair = time.perf_counter() - start
+    return len(titles), t_lsh, t_pair
+
+
+def test_lsh_is_faster_than_pairwise():
+    _, t_lsh, t_pair = _bench(copies=4)
+    assert t_lsh < t_pair
+
+
+if __name__ == "__main__":
+    for copies in (1, 4, 16):
+        n, t_lsh, t_pair = _bench(copies)
+        print(
+            f"{n:>6} Angebote | paarweise {t_pair * 1000:9.1f} ms"
+            f" | MinHash/LSH {t_lsh * 1000:8.1f} ms | Faktor {t_pair / t_lsh:6.1f}x"
+        )
@@ -0,0 +1,167 @@
+# ---------------------------------------------------------------------------------------------------
+# Mikro-Benchmarks für die Normalisierungs-Engine (normalization.py)
+# Vergleicht jede Hilfsfunktion mit der ursprünglichen Implementierung (Referenz unten):
+# identische Ergebnisse + Laufzeit auf realistischen, stark repetitiven Eingaben.
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_normalization_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import re
+import timeit
+from pathlib import Path
+
+import normalization
+from normalization import (
+    CURRENCY_MAP,
+    extract_currency,
+    fix_grossbritannien,
+    normalize_origin,
+    parse_number_eu,
+)
+
+RAW_CSV = Path(__file__).resolve().parent.parent / "output_scraper.csv"
+
+
+# ----------------------- Referenz: ursprüngliche Implementierungen ----------------------- #
+
+
+def legacy_extract_currency(text):
+    if text is None:
+        return None
+    s = str(text).lower()
+    for key, code in CURRENCY_MAP.items():
+        if key in s:
+            return code
+    return None
+
+
+def legacy_parse_number_eu(text):
+    if text is None:
+        return None
+    s = str(text).strip()
+    if not s:
+        return None
+    s = re.sub(
+        r"(versand|inkl\.?|exkl\.?|inklusive|zzgl\.?|\+)", " ", s, flags=re.IGNORECASE
+    )
+    s = re.sub(r"[^0-9\.,\s]", "", s)
+    s = s.strip()
+    if not s:
+        return None
+    if "." in s and "," in s:
+        s = s.replace(".", "").replace(",", ".")
+    elif "," in s:
+        parts = s.split(",")
+        if len(parts[-1]) <= 3:
+            s = "".join(parts[:-1]).replace(".", "") + "." + parts[-1]
+        else:
+            s = s.replace(",", "")
+    s = s.replace(" ", "")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def legacy_fix_grossbritannien(value):
+    if value is None:
+        return None
+    s = str(value).strip()
+    bad = {
+        "GroÃŸbritannien",
+        "GroÃbritannien",
+        "GroÃ£Âbritannien",
+        "GroÃYbritannien",
+        "Großbritannien",
+    }
+    if s in bad:
+        return "Grossbritannien"
+    return s
+
+
+def legacy_normalize_origin(value):
+    value = re.sub(r"^\s*aus\s+", "", value, flags=re.IGNORECASE)
+    return legacy_fix_grossbritannien(value).strip()
+
+
+# ----------------------- Eingabedaten ----------------------- #
+
+EDGE_CASES = [
+    None,
+    "",
+    "   ",
+    12,
+    3.5,
+    float("nan"),
+    "3.040,06",
+    "12,5",
+    "1,2345",
+    "1.234",
+    "+ 12,00 EUR Versand",
+    "inkl. MwSt. 9,90 €",
+    "Fr. 15.-",
+    "sFr 20",
+    "EURO 5",
+    "fr. 10 €",
+    "USD 1,000.50",
+    "£15",
+    "GBP 7",
+    "chfr",
+    "Kostenloser Versand",
+    " aus  Deutschland ",
+    "AUS Großbritannien",
+    "GroÃYbritannien",
+    "Schweiz",
+]
+
+
+def _corpus() -> list:
+    with RAW_CSV.open("r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    values = [r[c] for r in rows for c in ("preis", "versand", "land")]
+    return values + EDGE_CASES
+
+
+# ----------------------- Tests ----------------------- #
+
+
+def test_helpers_match_legacy_results():
+    """Neue Helfer liefern exakt dieselben Ergebnisse wie die Referenz."""
+    for value in _corpus():
+        new_num, old_num = parse_number_eu(value), legacy_parse_number_eu(value)
+        assert new_num == old_num or (new_num != new_num and old_num != old_num)
+        assert extract_currency(value) == legacy_extract_currency(value)
+        assert fix_grossbritannien(value) == legacy_fix_grossbritannien(value)
+        if isinstance(value, str):
+            assert normalize_origin(value) == legacy_normalize_origin(value)
+
+
+def _bench(func, values, number: int) -> float:
+    normalization.clear_caches()
+    return timeit.timeit(lambda: [func(v) for v in values], number=number)
+
+
+BENCH_PAIRS = [
+    ("parse_number_eu", parse_number_eu, legacy_parse_number_eu),
+    ("extract_currency", extract_currency, legacy_extract_currency),
+    ("fix_grossbritannien", fix_grossbritannien, legacy_fix_grossbritannien),
+    ("normalize_origin", normalize_origin, legacy_normalize_origin),
+]
+
+
+def test_cached_helpers_are_faster_on_repetitive_input():
+    """Auf repetitiven Scraper-Daten ist die Engine schneller als die Referenz."""
+    values = [v for v in _corpus() if isinstance(v, str)]
+    for name, new, old in BENCH_PAIRS:
+        assert _bench(new, values, number=20) < _bench(old, values, number=20), name
+
+
+if __name__ == "__main__":
+    values = [v for v in _corpus() if isinstance(v, str)]
+    for name, new, old in BENCH_PAIRS:
+        t_new = _bench(new, values, number=200)
+        t_old = _bench(old, values, number=200)
+        print(
+            f"{name:<20} alt {t_old * 1000:8.1f} ms | neu {t_new * 1000:8.1f} ms"
+            f" | Faktor {t_old / t_new:5.1f}x"
+        )
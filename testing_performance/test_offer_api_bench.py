@@ -0,0 +1,67 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: /api/offers?format=ndjson – Durchsatz und Speicherbedarf beim Streamen aus offer_store.py
+# Der Spitzenspeicher (tracemalloc) darf mit der Zeilenzahl nicht wachsen (FETCH_SIZE-Blöcke).
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_offer_api_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import time
+import tracemalloc
+
+import main
+from offer_store import OfferStore
+
+
+def _rows(n: int):
+    for i in range(n):
+        yield {
+            "title": f"Elan Explore 6 {150 + i % 40}cm USED #{i}",
+            "price": round(5 + (i * 7.3) % 900, 2),
+            "currency": "CHF",
+            "product_origin": "Schweiz",
+            "product_name": "Ski",
+            "link": f"https://www.ebay.ch/itm/{100000 + i}?_skw=ski",
+            "image": f"https://i.ebayimg.com/images/g/{i}/s-l500.webp",
+        }
+
+
+def _stream(client):
+    """Liest die NDJSON-Antwort blockweise; liefert (Zeilen, Sekunden, Spitzenspeicher)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get("/api/offers?format=ndjson", buffered=False)
+    lines = sum(chunk.count(b"\n") for chunk in response.response)
+    response.close()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return lines, elapsed, peak
+
+
+def _measure(tmp_path, monkeypatch, n: int):
+    path = tmp_path / f"offers_{n}.db"
+    OfferStore(path).index_rows(_rows(n))
+    monkeypatch.setattr(main, "OFFER_DB_PATH", path)
+    with main.app.test_client() as client:
+        return _stream(client)
+
+
+def test_ndjson_memory_is_independent_of_result_size(tmp_path, monkeypatch):
+    small = _measure(tmp_path, monkeypatch, 2_000)
+    large = _measure(tmp_path, monkeypatch, 20_000)
+    assert (small[0], large[0]) == (2_000, 20_000)
+    assert large[2] < small[2] * 2  # 10x Zeilen, kein 10x Speicher
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    import pytest
+
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as mp:
+        for n in (10_000, 100_000):
+            lines, elapsed, peak = _measure(Path(tmp), mp, n)
+            print(
+                f"{lines:>7} Zeilen | {elapsed * 1000:8.1f} ms"
+                f" | {lines / elapsed:9.0f} Zeilen/s | Spitze {peak / 1024:7.1f} KiB"
+            )
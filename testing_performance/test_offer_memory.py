@@ -0,0 +1,74 @@
+# ---------------------------------------------------------------------------------------------------
+# Speicher-Benchmark: Offer-Datensätze (NamedTuple + interning) vs. Dict pro Zeile
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_offer_memory.py
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import tracemalloc
+from pathlib import Path
+
+from offers import Offer
+
+CLEAN_CSV = Path(__file__).resolve().parent.parent / "output_clean.csv"
+
+
+def _load_as_dicts(repeat: int) -> list:
+    rows = []
+    for _ in range(repeat):
+        with CLEAN_CSV.open("r", newline="", encoding="utf-8") as f:
+            for r in csv.DictReader(f):
+                rows.append(
+                    {
+                        "produkt": (r.get("title") or "").strip(),
+                        "preis": (r.get("price") or "").strip(),
+                        "region": (r.get("product_origin") or "").strip(),
+                        "link": (r.get("link") or "").strip(),
+                        "image": (r.get("image") or "").strip(),
+                        "aktualitaet": (r.get("product_condition") or "").strip(),
+                        "versand": (r.get("shipping_cost") or "").strip(),
+                        "währung": (r.get("currency") or "").strip(),
+                    }
+                )
+    return rows
+
+
+def _load_as_offers(repeat: int) -> list:
+    rows = []
+    for _ in range(repeat):
+        with CLEAN_CSV.open("r", newline="", encoding="utf-8") as f:
+            rows.extend(Offer.from_clean_row(r) for r in csv.DictReader(f))
+    return rows
+
+
+def _measure(loader, repeat: int) -> int:
+    tracemalloc.start()
+    rows = loader(repeat)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert rows
+    return current
+
+
+def test_offers_use_less_memory_than_dicts():
+    """Offer-Zeilen müssen deutlich weniger Speicher belegen als Dict-Zeilen."""
+    dict_bytes = _measure(_load_as_dicts, repeat=5)
+    offer_bytes = _measure(_load_as_offers, repeat=5)
+    assert offer_bytes < dict_bytes * 0.8
+
+
+def test_low_cardinality_values_are_interned():
+    """Land/Zustand/Währung teilen sich pro Wert dieselbe String-Instanz."""
+    offers = _load_as_offers(repeat=2)
+    same_country = [o.land for o in offers if o.land == offers[0].land]
+    assert all(value is offers[0].land for value in same_country)
+    assert all(o.waehrung is offers[0].waehrung for o in offers if o.waehrung == "CHF")
+
+
+if __name__ == "__main__":
+    for repeat in (1, 10, 50):
+        d = _measure(_load_as_dicts, repeat)
+        o = _measure(_load_as_offers, repeat)
+        print(
+            f"{repeat * 240:>6} Zeilen: dict {d / 1024:8.0f} KiB | Offer {o / 1024:8.0f} KiB"
+            f" | Ersparnis {100 * (1 - o / d):5.1f} %"
+        )
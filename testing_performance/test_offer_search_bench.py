@@ -0,0 +1,107 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: Stichwortsuche über Angebots-Titel – FTS5-Index (offer_store.py) vs. linearer Scan
+# Standard: 100'000 Angebote; PRICEHUNTER_SEARCH_BENCH_ROWS=1000000 für die 1M-Messung.
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_offer_search_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import random
+import statistics
+import time
+
+from offer_store import OfferStore, normalize_title
+
+ROWS = int(os.environ.get("PRICEHUNTER_SEARCH_BENCH_ROWS", "100000"))
+QUERIES = ["176 cm", "elan expl*", "atomic redster 170", "völkl", "kurzski rot"]
+
+BRANDS = [
+    "Elan",
+    "Atomic",
+    "Völkl",
+    "Rossignol",
+    "Head",
+    "Fischer",
+    "Salomon",
+    "Kneissl",
+]
+MODELS = ["Explore 6", "Element", "Redster", "Deacon", "Supershape", "Big Foot", "QST"]
+WORDS = [
+    "Ski",
+    "Kurzski",
+    "rot",
+    "schwarz",
+    "USED",
+    "2023",
+    "2024",
+    "Bindung",
+    "Allmountain",
+]
+
+
+def _offers(n: int):
+    rng = random.Random(42)
+    for i in range(n):
+        length = rng.choice((150, 160, 166, 170, 176, 180))
+        words = " ".join(rng.sample(WORDS, 3))
+        yield {
+            "title": f"{rng.choice(BRANDS)} {rng.choice(MODELS)} {length}cm {words} #{i}",
+            "price": round(rng.uniform(5, 900), 2),
+            "currency": "CHF",
+            "product_name": "Ski",
+            "link": f"https://www.ebay.ch/itm/{100000000000 + i}?_skw=ski",
+        }
+
+
+def _build(n: int):
+    store = OfferStore(":memory:")
+    titles = []
+    batch = []
+    for row in _offers(n):
+        titles.append(row["title"])
+        batch.append(row)
+        if len(batch) == 50_000:
+            store.index_rows(batch)
+            batch = []
+    store.index_rows(batch)
+    return store, titles
+
+
+def _scan(titles, text: str):
+    words = normalize_title(text).split()
+    result = []
+    for title in titles:
+        norm = normalize_title(title)
+        if all(w.rstrip("*") in norm for w in words):
+            result.append(title)
+    return result[:500]
+
+
+def _median_ms(func, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def _run(n: int):
+    store, titles = _build(n)
+    results = []
+    for q in QUERIES:
+        t_index = _median_ms(lambda: store.search(q, product_name="Ski", limit=50))
+        t_scan = _median_ms(lambda: _scan(titles, q), repeat=1)
+        results.append((q, t_index, t_scan))
+    return results
+
+
+def test_fts_search_is_fast_and_beats_scan():
+    """Indexsuche (erste 50 Treffer) unter 10 ms und schneller als der Titel-Scan."""
+    for q, t_index, t_scan in _run(min(ROWS, 100_000)):
+        assert t_index < 10, q
+        assert t_index < t_scan, q
+
+
+if __name__ == "__main__":
+    for q, t_index, t_scan in _run(ROWS):
+        print(f"{ROWS} Angebote, '{q}': FTS5 {t_index:6.2f} ms | Scan {t_scan:8.1f} ms")
@@ -0,0 +1,58 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: Chart-Abfrage über Monate Preisverlauf – vorberechnete Rollups vs. Scan der Rohdaten
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_price_history_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import tempfile
+import time
+
+import numpy as np
+
+from price_history import PriceHistory, compute_rollup
+
+T0 = 1_700_006_400
+
+
+def _fill(history: PriceHistory, days: int, scrapes_per_day: int, offers: int) -> float:
+    rng = np.random.default_rng(1)
+    items = [str(100000 + i) for i in range(offers)]
+    start = time.perf_counter()
+    for step in range(days * scrapes_per_day):
+        prices = rng.uniform(20, 400, size=offers)
+        history.append(
+            "Ski", items, prices, prices + 9.9, ts=T0 + step * 86400 / scrapes_per_day
+        )
+    return (time.perf_counter() - start) / (days * scrapes_per_day)
+
+
+def _timed(func, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def _run(days: int, scrapes_per_day: int, offers: int):
+    with tempfile.TemporaryDirectory() as root:
+        history = PriceHistory(root)
+        t_append = _fill(history, days, scrapes_per_day, offers)
+        t_raw = _timed(lambda: compute_rollup(history.observations("Ski"), 86400))
+        t_rollup = _timed(lambda: history.rollup("Ski", "day"))
+        assert len(history.rollup("Ski", "day")) == days
+        return t_append, t_raw, t_rollup
+
+
+def test_rollup_query_is_faster_than_raw_scan():
+    """45 Tage, 2 Scrapes/Tag: Rollup-Abfrage deutlich schneller als Rohdaten-Scan."""
+    _, t_raw, t_rollup = _run(days=45, scrapes_per_day=2, offers=120)
+    assert t_rollup * 5 < t_raw
+
+
+if __name__ == "__main__":
+    for days, per_day, offers in ((90, 4, 120), (180, 24, 200)):
+        t_append, t_raw, t_rollup = _run(days, per_day, offers)
+        print(
+            f"{days:>3} Tage x {per_day:>2} Scrapes x {offers} Angebote: "
+            f"append {t_append * 1000:5.2f} ms | Rohdaten-Scan {t_raw * 1000:8.2f} ms"
+            f" | Rollup {t_rollup * 1000:5.3f} ms"
+        )
@@ -0,0 +1,99 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark für rate_governor.py (Simulation mit virtueller Uhr, ohne Netzwerk)
+# Mehrere Scraper teilen sich einen Host, der nur CAPACITY Seiten/s toleriert (darüber: Sperrseite).
+# Feste Pause (1.1 s pro Scraper, Sperrseite erst nach 25 s Timeout erkannt) vs. gemeinsamer
+# RateGovernor (AIMD, Backoff, Sperrseite sofort erkannt): Seiten mit Angeboten pro Minute.
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_rate_governor_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import heapq
+import itertools
+import random
+
+from rate_governor import BLOCKED, OK, CircuitOpenError, RateGovernor
+
+PAGE_TIME = 2.0  # Sekunden Laden + Parsen einer Seite
+TIMEOUT = 25.0  # bisher: wait_for_results läuft auf Sperrseiten in den Timeout
+URL = "https://www.ebay.ch/sch/i.html"
+
+
+class _Host:
+    """Server, der CAPACITY Aufrufe/s (Burst 3) toleriert; darüber Sperrseiten."""
+
+    def __init__(self, capacity: float) -> None:
+        self.capacity = capacity
+        self.tokens = 3.0
+        self.updated = 0.0
+
+    def request(self, now: float) -> str:
+        self.tokens = min(3.0, self.tokens + (now - self.updated) * self.capacity)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return OK
+        self.tokens = max(self.tokens - 0.5, -3.0)  # Überlast bestraft weitere Aufrufe
+        return BLOCKED
+
+
+def simulate(workers: int, capacity: float, governed: bool, duration: float = 1800.0):
+    """
+    Ereignisgesteuerte Simulation: jeder Scraper reserviert (nur mit Governor),
+    startet den Aufruf und meldet nach dem Laden das Ergebnis.
+
+    Returns:
+        (gute Seiten pro Minute, Anteil gesperrter Aufrufe)
+    """
+    host = _Host(capacity)
+    now = [0.0]
+    governor = RateGovernor(clock=lambda: now[0], rng=random.Random(1))
+    events: list = []
+    seq = itertools.count()
+
+    def push(t, worker, kind, outcome=None):
+        heapq.heappush(events, (t, next(seq), worker, kind, outcome))
+
+    for worker in range(workers):
+        push(worker * 0.1, worker, "reserve" if governed else "start")
+    good = blocked = 0
+    while events:
+        t, _, worker, kind, outcome = heapq.heappop(events)
+        if t > duration:
+            break
+        now[0] = t
+        if kind == "reserve":
+            try:
+                delay = governor.reserve(URL)
+            except CircuitOpenError as e:
+                delay = e.retry_after
+            push(t + delay, worker, "reserve" if delay > 0 else "start")
+        elif kind == "start":
+            outcome = host.request(t)
+            good += outcome == OK
+            blocked += outcome == BLOCKED
+            slow = outcome == BLOCKED and not governed  # Timeout statt Erkennung
+            push(t + (TIMEOUT if slow else PAGE_TIME), worker, "done", outcome)
+        elif governed:
+            governor.record(URL, outcome)
+            push(t, worker, "reserve")
+        else:
+            push(t + 1.1, worker, "start")  # bisherige feste Pause
+    return good / (duration / 60), blocked / max(1, good + blocked)
+
+
+def test_governor_keeps_throughput_near_capacity():
+    fixed, fixed_blocked = simulate(workers=8, capacity=1.0, governed=False)
+    governed, governed_blocked = simulate(workers=8, capacity=1.0, governed=True)
+    assert governed > 1.5 * fixed
+    assert governed > 0.6 * 60  # mindestens 60 % der tolerierten Rate
+    assert governed_blocked < fixed_blocked
+
+
+if __name__ == "__main__":
+    for workers, capacity in [(1, 1.0), (4, 1.0), (8, 1.0), (8, 2.0), (16, 2.0)]:
+        fixed, fixed_blocked = simulate(workers, capacity, governed=False)
+        governed, governed_blocked = simulate(workers, capacity, governed=True)
+        print(
+            f"{workers:2d} Scraper, Host toleriert {capacity:.1f}/s ({capacity * 60:5.0f}/min) | "
+            f"feste Pause {fixed:6.1f} Seiten/min ({fixed_blocked:4.0%} gesperrt) | "
+            f"RateGovernor {governed:6.1f} Seiten/min ({governed_blocked:4.0%} gesperrt)"
+        )
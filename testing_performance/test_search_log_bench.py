@@ -0,0 +1,63 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: Kosten einer protokollierten Suche im Request-Pfad
+# direktes Schreiben (Datei öffnen, Header prüfen, eine Zeile schreiben – bis user-046 im Request)
+# vs. SearchLog.record (nur Queue).
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_search_log_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import io
+import time
+
+import main
+from atomic_files import append_line
+from search_log import SearchLog
+
+CALLS = 2_000
+
+
+def _per_call(func, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls
+
+
+def _append_directly(path, produkt: str, preis: str) -> None:
+    """Referenz: eine Zeile pro Suche direkt in die CSV (ohne Puffer)."""
+    main.ensure_csv_with_header(path, main.CSV_FIELDS)
+    line = io.StringIO()
+    csv.writer(line).writerow([produkt, preis, "", ""])
+    append_line(path, line.getvalue())
+
+
+def measure(tmp_path, calls: int = CALLS):
+    direct_path = tmp_path / "direct.csv"
+    direct = _per_call(
+        lambda i: _append_directly(direct_path, f"ski {i % 50}", "100"), calls
+    )
+    log = SearchLog(tmp_path / "buffered.csv", tmp_path / "log.db")
+    buffered = _per_call(lambda i: log.record(f"ski {i % 50}", "100"), calls)
+    start = time.perf_counter()
+    log.close()
+    drain = time.perf_counter() - start
+    return direct, buffered, drain, log
+
+
+def test_record_is_cheaper_than_direct_write(tmp_path):
+    direct, buffered, _, log = measure(tmp_path, calls=500)
+    assert buffered < direct
+    assert sum(log.counts().values()) == 500
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        direct, buffered, drain, _ = measure(Path(tmp))
+        print(
+            f"{CALLS} Suchen | direkt {direct * 1e6:8.1f} µs/Suche"
+            f" | SearchLog.record {buffered * 1e6:6.1f} µs/Suche"
+            f" | Faktor {direct / buffered:6.1f}x | Restliche Batches schreiben {drain * 1000:.1f} ms"
+        )
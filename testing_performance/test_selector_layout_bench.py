@@ -0,0 +1,54 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: Kartenparsing mit erkannter Layout-Variante vs. allen Selektor-Varianten (generic)
+# Misst die Zeit pro Karte auf beiden Layout-Fixtures (s-card: debug_page1.html, s-item: Legacy).
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_selector_layout_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+import main
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = {
+    "s-card": ROOT / "debug_page1.html",
+    "s-item": ROOT / "testing_scraping" / "fixtures" / "search_s_item.html",
+}
+
+
+def _per_card(soup, layout, repeat: int) -> float:
+    cards = len(soup.select(main.ITEMS_SELECTOR))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        main.parse_cards(soup, set(), layout)
+    return (time.perf_counter() - start) / (repeat * cards)
+
+
+def _run(name: str, repeat: int):
+    soup = BeautifulSoup(FIXTURES[name].read_text(encoding="utf-8"), "html.parser")
+    layout = main.detect_layout(soup.select(main.ITEMS_SELECTOR))
+    assert layout.name == name
+    assert main.parse_cards(soup, set()) == main.parse_cards(
+        soup, set(), main.GENERIC_LAYOUT
+    )
+    t_generic = _per_card(soup, main.GENERIC_LAYOUT, repeat)
+    t_layout = _per_card(soup, None, repeat)  # inkl. Layout-Erkennung
+    return t_generic, t_layout
+
+
+def test_layout_fast_path_is_faster_per_card():
+    """Auf beiden Fixtures ist das Parsen mit erkannter Variante schneller."""
+    for name in FIXTURES:
+        t_generic, t_layout = _run(name, repeat=3)
+        assert t_layout < t_generic, name
+
+
+if __name__ == "__main__":
+    for name in FIXTURES:
+        t_generic, t_layout = _run(name, repeat=20)
+        print(
+            f"{name:>6}: generic {t_generic * 1e6:7.1f} µs/Karte | "
+            f"Layout {t_layout * 1e6:7.1f} µs/Karte ({t_generic / t_layout:.2f}x)"
+        )
@@ -0,0 +1,73 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: Aufwärmen mehrerer Worker – jeder parst output_clean.csv selbst vs. gemeinsamer Cache
+# (shared_cache.py): nur der erste Worker parst, alle weiteren laden die veröffentlichte Version.
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_shared_cache_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import main
+
+ROOT = Path(__file__).resolve().parent.parent
+WORKERS = 4
+
+
+def _write_clean_csv(path: Path, n: int) -> None:
+    with open(ROOT / "output_clean.csv", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields, rows = reader.fieldnames, list(reader)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i, row in enumerate(itertools.islice(itertools.cycle(rows), n)):
+            writer.writerow({**row, "link": f"{row['link']}&n={i}"})
+
+
+def _worker(args) -> float:
+    """Ein 'Worker-Prozess': lädt die Tabelle einmal und misst die Dauer."""
+    csv_path, cache_path, shared = args
+    main.CLEANED_DATA_PATH = Path(csv_path)
+    main.CACHE_DB_PATH = Path(cache_path)
+    main.OUTPUT_DIR = Path(csv_path).with_suffix(".outputs")  # nichts veröffentlicht
+    start = time.perf_counter()
+    rows = main.load_rows_for_table() if shared else list(main.iter_rows_for_table())
+    assert rows
+    return time.perf_counter() - start
+
+
+def warmup(tmp: Path, n: int, shared: bool):
+    """Gesamte Aufwärmzeit aller Worker (erster Worker zuerst, dann parallel)."""
+    csv_path, cache_path = tmp / f"clean_{n}.csv", tmp / f"cache_{n}_{shared}.db"
+    if not csv_path.exists():
+        _write_clean_csv(csv_path, n)
+    args = (str(csv_path), str(cache_path), shared)
+    with ProcessPoolExecutor(WORKERS) as pool:
+        first = pool.submit(_worker, args).result()
+        others = list(pool.map(_worker, [args] * (WORKERS - 1)))
+    return first, others
+
+
+def test_later_workers_load_instead_of_parsing(tmp_path):
+    first, others = warmup(tmp_path, 20_000, shared=True)
+    _, uncached = warmup(tmp_path, 20_000, shared=False)
+    assert max(others) < min(uncached)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (10_000, 50_000):
+            for shared in (False, True):
+                first, others = warmup(Path(tmp), n, shared)
+                total = first + sum(others)
+                print(
+                    f"{n:>7} Zeilen | {'gemeinsam' if shared else 'pro Worker':<10}"
+                    f" | erster {first * 1000:7.1f} ms | weitere Ø"
+                    f" {sum(others) / len(others) * 1000:7.1f} ms"
+                    f" | {WORKERS} Worker gesamt {total * 1000:8.1f} ms"
+                )
@@ -0,0 +1,56 @@
+# ---------------------------------------------------------------------------------------------------
+# Startzeit-Benchmark: Kalter Import von main.py (Flask-App) mit `python -X importtime`
+# Schlägt fehl, wenn der Import das Budget überschreitet oder schwere Abhängigkeiten
+# (selenium, bs4, pandas) bereits beim Start geladen werden.
+# Budget anpassbar über die Umgebungsvariable PRICEHUNTER_IMPORT_BUDGET_MS.
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET_MS = float(os.environ.get("PRICEHUNTER_IMPORT_BUDGET_MS", "200"))
+HEAVY_MODULES = ("selenium", "bs4", "pandas", "numpy")
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def cold_import_ms(module: str = "main") -> float:
+    """Kumulierte Importzeit (ms) des Moduls laut `-X importtime`."""
+    result = _run(f"import {module}", "-X", "importtime")
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000.0
+    raise AssertionError(f"Keine importtime-Zeile für {module}")
+
+
+def test_main_import_does_not_load_heavy_dependencies():
+    """Startseite/Resultate brauchen weder Selenium noch BeautifulSoup noch pandas."""
+    code = (
+        "import sys, main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert _run(code).stdout.strip() == ""
+
+
+def test_main_cold_import_within_budget():
+    """Kalter Import von main bleibt unter dem Budget (bester von drei Läufen)."""
+    best = min(cold_import_ms() for _ in range(3))
+    assert (
+        best < IMPORT_BUDGET_MS
+    ), f"Import main: {best:.0f} ms > {IMPORT_BUDGET_MS} ms"
+
+
+if __name__ == "__main__":
+    print(f"Kalter Import main: {min(cold_import_ms() for _ in range(5)):.1f} ms")
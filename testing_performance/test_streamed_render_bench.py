@@ -0,0 +1,123 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: Resultatseite (/suchresultat) gestreamt (stream_page) vs. komplett gerendert (render_template)
+# Misst Zeit bis zum ersten Byte (TTFB), Gesamtzeit und Spitzenspeicher bei 1k/10k/100k Zeilen.
+# Spitzen-RSS wird pro Messung in einem eigenen Prozess erhoben (ru_maxrss steigt nur an).
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_streamed_render_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import itertools
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import main
+
+ROOT = Path(__file__).resolve().parent.parent
+SIZES = (1_000, 10_000, 100_000)
+
+
+def _write_clean_csv(path: Path, n: int) -> None:
+    """Vervielfacht output_clean.csv auf n Zeilen (eindeutige Links)."""
+    with open(ROOT / "output_clean.csv", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields, rows = reader.fieldnames, list(reader)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i, row in enumerate(itertools.islice(itertools.cycle(rows), n)):
+            writer.writerow({**row, "link": f"{row['link']}&n={i}"})
+
+
+def _buffered_page():
+    """Referenz: ganze Seite im Speicher rendern (bisheriges Verhalten)."""
+    return main.render_template(
+        "suchresultat_total.html",
+        daten=main.load_rows_for_table(),
+        stats=main.load_stats(),
+        q="",
+        produkt="",
+        active_page="results",
+    )
+
+
+def measure(mode: str, csv_path: Path) -> dict:
+    """Liefert TTFB, Gesamtzeit, Bytes und Spitzenspeicher (tracemalloc) einer Seite."""
+    main.CLEANED_DATA_PATH = csv_path
+    if mode == "buffered":
+        main.app.view_functions["suchresultat_total"] = _buffered_page
+    client = main.app.test_client()
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get("/suchresultat", buffered=False)
+    chunks = iter(response.response)
+    size = len(next(chunks))
+    ttfb = time.perf_counter() - start
+    size += sum(len(chunk) for chunk in chunks)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    response.close()
+    return {"ttfb": ttfb, "total": total, "bytes": size, "peak": peak}
+
+
+def test_streamed_page_matches_and_keeps_memory_flat(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "CLEANED_STATS_PATH", tmp_path / "keine.stats.json")
+    monkeypatch.setattr(
+        main, "OUTPUT_DIR", tmp_path / "outputs"
+    )  # nichts veröffentlicht
+    monkeypatch.setattr(main, "CACHE_DB_PATH", tmp_path / "cache.db")
+    small, large = tmp_path / "small.csv", tmp_path / "large.csv"
+    _write_clean_csv(small, 500)
+    _write_clean_csv(large, 5_000)
+
+    monkeypatch.setattr(main, "CLEANED_DATA_PATH", large)
+    with main.app.test_request_context():
+        expected = _buffered_page()
+    assert (
+        main.app.test_client().get("/suchresultat").get_data(as_text=True) == expected
+    )
+
+    s, l_ = measure("streamed", small), measure("streamed", large)
+    assert l_["bytes"] > 9 * s["bytes"]
+    assert l_["peak"] < s["peak"] * 2  # 10x Zeilen, kein 10x Speicher
+    assert l_["ttfb"] < l_["total"] / 5  # erste Bytes lange vor dem Ende
+
+
+def _child(mode: str, csv_path: str) -> None:
+    main.CLEANED_STATS_PATH = Path(csv_path).with_suffix(".stats.json")
+    main.CACHE_DB_PATH = Path(csv_path).with_suffix(".cache.db")
+    main.OUTPUT_DIR = Path(csv_path).with_suffix(".outputs")
+    result = measure(mode, Path(csv_path))
+    result["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            path = Path(tmp) / f"clean_{n}.csv"
+            _write_clean_csv(path, n)
+            for mode in ("buffered", "streamed"):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, str(path)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                print(
+                    f"{n:>7} Zeilen | {mode:<8} | TTFB {r['ttfb'] * 1000:8.1f} ms"
+                    f" | gesamt {r['total'] * 1000:8.1f} ms | RSS {r['rss'] / 2**20:6.1f} MiB"
+                    f" | Python-Spitze {r['peak'] / 2**20:6.1f} MiB"
+                )
@@ -0,0 +1,122 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: Multi-Tab-Scraping (eine Chrome-Session) vs. ein Chrome-Driver pro Suche
+# Misst Seiten/Sekunde und RSS (Chrome-Prozessbaum) pro gleichzeitiger Suche gegen lokale
+# Fixture-Seiten. Benötigt Chrome + psutil, sonst wird der Test übersprungen.
+# Direkt ausführbar: PYTHONPATH=. python testing_performance/test_tab_scraper_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import functools
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import main
+import tab_scraper
+
+FIXTURE = Path(__file__).resolve().parent.parent / "debug_page1.html"
+EBAY_NEXT = (
+    "https://www.ebay.ch/sch/i.html?_nkw=ski&amp;_sacat=0&amp;_from=R40&amp;_udhi=70"
+    "&amp;_pgn=2"
+)
+CHROME_AVAILABLE = any(
+    shutil.which(b) for b in ("google-chrome", "chromium", "chromium-browser", "chrome")
+)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _serve(directory: Path):
+    html = FIXTURE.read_text(encoding="utf-8")
+    (directory / "page1.html").write_text(
+        html.replace(EBAY_NEXT, "page2.html"), "utf-8"
+    )
+    (directory / "page2.html").write_text(
+        html.replace("pagination__next", "pagination__none"), "utf-8"
+    )
+    handler = functools.partial(_QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/page1.html"
+
+
+def _chrome_rss_mb(driver) -> float:
+    import psutil
+
+    root = psutil.Process(driver.service.process.pid)
+    procs = [root, *root.children(recursive=True)]
+    return sum(p.memory_info().rss for p in procs if p.is_running()) / 2**20
+
+
+def bench_tabs(url: str, searches: int, max_tabs: int):
+    driver = main.start_chrome(headless=True)
+    try:
+        start = time.perf_counter()
+        results = tab_scraper.scrape_in_tabs(
+            driver,
+            [f"{url}?s={i}" for i in range(searches)],
+            max_pages=2,
+            max_tabs=max_tabs,
+        )
+        elapsed = time.perf_counter() - start
+        rss = _chrome_rss_mb(driver)
+    finally:
+        driver.quit()
+    return searches * 2 / elapsed, rss / min(searches, max_tabs), results
+
+
+def bench_drivers(url: str, searches: int):
+    def one(i):
+        driver = main.start_chrome(headless=True)
+        try:
+            rows = main.scrape_all(driver, f"{url}?s={i}", max_pages=2)
+            return rows, _chrome_rss_mb(driver)
+        finally:
+            driver.quit()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=searches) as pool:
+        out = list(pool.map(one, range(searches)))
+    elapsed = time.perf_counter() - start
+    return (
+        searches * 2 / elapsed,
+        sum(r for _, r in out) / searches,
+        [o for o, _ in out],
+    )
+
+
+@pytest.mark.skipif(not CHROME_AVAILABLE, reason="Chrome nicht installiert")
+def test_tabs_use_less_memory_per_concurrent_scrape(tmp_path, monkeypatch):
+    pytest.importorskip("psutil")
+    monkeypatch.setattr(main, "accept_cookies", lambda driver: None)
+    server, url = _serve(tmp_path)
+    try:
+        _pps_tabs, rss_tabs, res_tabs = bench_tabs(url, searches=4, max_tabs=4)
+        _pps_drv, rss_drv, res_drv = bench_drivers(url, searches=4)
+    finally:
+        server.shutdown()
+    assert [len(r) for r in res_tabs] == [len(r) for r in res_drv]
+    assert rss_tabs < rss_drv
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    main.accept_cookies = lambda driver: None
+    with tempfile.TemporaryDirectory() as tmp:
+        server, url = _serve(Path(tmp))
+        for n in (2, 4, 8):
+            pps_t, rss_t, _ = bench_tabs(url, n, max_tabs=n)
+            pps_d, rss_d, _ = bench_drivers(url, n)
+            print(
+                f"{n} Suchen: Tabs {pps_t:5.2f} Seiten/s, {rss_t:6.0f} MB/Suche | "
+                f"Driver/Suche {pps_d:5.2f} Seiten/s, {rss_d:6.0f} MB/Suche"
+            )
+        server.shutdown()
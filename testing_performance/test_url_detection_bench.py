@@ -0,0 +1,65 @@
+# ---------------------------------------------------------------------------------------------------
+# Benchmark: URL-Spaltenerkennung + product_name-Extraktion auf breiten und langen Eingaben
+# Alte Variante: jede Spalte komplett als str + Regex, danach urlsplit/parse_qs pro Zeile.
+# Direkt ausführbar für ausführliche Zahlen: PYTHONPATH=. python testing_performance/test_url_detection_bench.py
+# ---------------------------------------------------------------------------------------------------
+
+import time
+
+import pandas as pd
+
+import data_transformer_cleansing as dtc
+
+
+def legacy_find_first_url_column(df):
+    for col in df.columns:
+        series = df[col].astype(str)
+        if series.str.contains(r"https?://", regex=True, na=False).any():
+            return col
+    return None
+
+
+def _frame(rows: int, text_cols: int) -> pd.DataFrame:
+    data = {f"info_{i}": ["Brandneu |"] * rows for i in range(text_cols)}
+    data["preis"] = ["CHF 12,50"] * rows
+    data["link"] = [
+        f"https://www.ebay.ch/itm/{100000 + i}?_skw=ski&itmmeta={i}"
+        for i in range(rows)
+    ]
+    return pd.DataFrame(data)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _run(rows: int, text_cols: int):
+    df = _frame(rows, text_cols)
+
+    old_col, t_old_col = _timed(legacy_find_first_url_column, df)
+    new_col, t_new_col = _timed(dtc.find_first_url_column, df)
+    assert old_col == new_col == "link"
+
+    old_pn, t_old_pn = _timed(lambda s: s.map(dtc.extract_skw_from_url), df["link"])
+    new_pn, t_new_pn = _timed(dtc.extract_skw_series, df["link"])
+    assert old_pn.tolist() == new_pn.tolist()
+    return t_old_col, t_new_col, t_old_pn, t_new_pn
+
+
+def test_sampled_detection_and_vectorized_skw_are_faster():
+    """Auf einer breiten, langen Eingabe sind beide neuen Schritte schneller."""
+    t_old_col, t_new_col, t_old_pn, t_new_pn = _run(rows=20_000, text_cols=30)
+    assert t_new_col < t_old_col
+    assert t_new_pn < t_old_pn
+
+
+if __name__ == "__main__":
+    for rows, cols in ((10_000, 10), (100_000, 10), (100_000, 50)):
+        t_old_col, t_new_col, t_old_pn, t_new_pn = _run(rows, cols)
+        print(
+            f"{rows:>7} Zeilen x {cols:>3} Spalten: URL-Spalte alt {t_old_col * 1000:7.1f} ms"
+            f" / neu {t_new_col * 1000:6.1f} ms | product_name alt {t_old_pn * 1000:7.1f} ms"
+            f" / neu {t_new_pn * 1000:6.1f} ms"
+        )
@@ -0,0 +1,164 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für async_scraper.py gegen einen lokalen stdlib-HTTP-Stub mit den gespeicherten HTML-Fixtures
+# ---------------------------------------------------------------------------------------------------
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from async_scraper import AsyncScrapeEngine  # noqa: E402
+from rate_governor import RateGovernor  # noqa: E402
+
+FIXTURE = (Path(__file__).resolve().parent.parent / "debug_page1.html").read_text(
+    encoding="utf-8"
+)
+EBAY_NEXT = (
+    "https://www.ebay.ch/sch/i.html?_nkw=ski&amp;_sacat=0&amp;_from=R40&amp;_udhi=70"
+    "&amp;_pgn=2"
+)
+PAGE_1 = FIXTURE.replace(EBAY_NEXT, "/page2").encode("utf-8")
+PAGE_2 = FIXTURE.replace("pagination__next", "pagination__none").encode("utf-8")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    failing: dict = {}  # Pfad -> Anzahl Aufrufe, die noch fehlschlagen
+
+    def do_GET(self):  # noqa: N802 (BaseHTTPRequestHandler-API)
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            route = self.path.split("?", 1)[0]
+            fail = cls.failing.get(route, 0) > 0
+            cls.failing[route] = max(0, cls.failing.get(route, 0) - 1)
+        try:
+            if route == "/missing":
+                self.send_error(404)
+                return
+            if fail and route == "/slow":  # länger als das Timeout der Engine
+                threading.Event().wait(1.0)
+            elif fail:
+                self.send_error(500)
+                return
+            body = PAGE_2 if self.path.startswith("/page2") else PAGE_1
+            threading.Event().wait(0.02)  # etwas Latenz simulieren
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def _fast_governor():
+    """Lokaler Stub verträgt jedes Tempo."""
+    return RateGovernor(initial_rate=1000, burst=100)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubHandler.peak = 0
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_engine_paginates_and_parses_fixture(stub_server):
+    """Eine Suche: Seite 1 liefert Angebote, Seite 2 nur Duplikate -> keine neuen Zeilen."""
+
+    async def run():
+        async with AsyncScrapeEngine(page_delay=0, governor=_fast_governor()) as engine:
+            rows = await engine.scrape(f"{stub_server}/search?q=ski", max_pages=4)
+            return rows, engine.pages_fetched
+
+    rows, pages = asyncio.run(run())
+    assert pages == 2
+    assert len(rows) == 60
+    assert len({r.link for r in rows}) == len(rows)
+
+
+def test_async_engine_runs_many_searches_with_host_limit(stub_server):
+    """Viele gleichzeitige Suchen, aber nie mehr Requests pro Host als erlaubt."""
+    urls = [f"{stub_server}/search?q={i}" for i in range(6)]
+
+    async def run():
+        async with AsyncScrapeEngine(
+            per_host_limit=3, page_delay=0, governor=_fast_governor()
+        ) as engine:
+            return await engine.scrape_many(urls, max_pages=1)
+
+    results = asyncio.run(run())
+    assert [len(rows) for rows in results] == [60] * 6
+    assert 1 < _StubHandler.peak <= 3
+
+
+def test_run_scrape_stream_streams_pages_from_async_engine(
+    stub_server, monkeypatch, tmp_path
+):
+    """SCRAPE_ENGINE=http: die Live-Ansicht erhält die Seiten der Async-Engine."""
+    import main
+    import rate_governor
+
+    monkeypatch.setattr(main, "SCRAPE_ENGINE", "http")
+    monkeypatch.setattr(main, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(rate_governor, "GOVERNOR_DB_PATH", tmp_path / "governor.db")
+    monkeypatch.setattr(main, "serve_warm", lambda query, preis: None)
+    monkeypatch.setattr(
+        main, "build_search_url", lambda query, preis: f"{stub_server}/search?q={query}"
+    )
+    monkeypatch.setattr(main, "setup_driver", lambda: pytest.fail("Selenium gestartet"))
+    finished = []
+    monkeypatch.setattr(
+        main, "finish_scrape", lambda rows, search_id=None: finished.append(rows)
+    )
+
+    pages = list(main.run_scrape_stream("ski", "70"))
+    assert len(pages) == 2 and len(pages[0]) > 0
+    assert pages[1] == []  # Seite 2 enthält nur Duplikate
+    assert [len(rows) for rows in finished] == [60]
+
+    stream = main.run_scrape_stream("ski", "70")
+    assert len(next(stream)) > 0
+    stream.close()  # Browser geschlossen: keine Ausgabedateien
+    assert len(finished) == 1
+
+
+def test_async_engine_retries_errors_and_keeps_other_searches(stub_server):
+    """
+    404 beendet nur die eigene Suche; 5xx und Timeouts werden erneut
+    geladen und dem Governor gemeldet. Die übrigen Suchen behalten ihre Ergebnisse.
+    """
+    _StubHandler.failing = {"/flaky": 2, "/slow": 1}
+    governor = RateGovernor(initial_rate=1000, burst=100, backoff_base=0.01)
+    urls = [
+        f"{stub_server}{path}" for path in ("/search", "/missing", "/flaky", "/slow")
+    ]
+
+    async def run():
+        async with AsyncScrapeEngine(
+            page_delay=0, timeout=0.5, governor=governor
+        ) as engine:
+            return await engine.scrape_many(urls, max_pages=1)
+
+    ok, missing, flaky, slow = asyncio.run(run())
+    assert len(ok) == len(flaky) == len(slow) == 60
+    assert missing == []
+    (host,) = governor.snapshot().values()
+    assert host["pages"] == 1 + 1 + 3 + 2  # jeder Versuch gemeldet
+    assert host["failures"] == 0 and not host["open"]
@@ -0,0 +1,169 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für checkpoint.py: Speichern/Laden pro Seite, veraltete Checkpoints, Fortsetzen eines
+# abgebrochenen Async-Scrapes gegen mock_ebay und Checkpoints im Scheduler
+# ---------------------------------------------------------------------------------------------------
+
+import asyncio
+import random
+
+import pytest
+
+import main
+from checkpoint import Checkpoint, CheckpointStore
+from mock_ebay import MockConfig, MockEbay, start_server
+from offers import Offer
+from rate_governor import RateGovernor
+from scheduler import RESUME_DELAY, MonitorStore, SavedSearch, Scheduler
+
+SEARCH = "/sch/i.html?_nkw=ski+elan&_udhi=200"
+
+
+def _offer(item: int) -> Offer:
+    return Offer.create(
+        titel=f"Ski {item}", preis="CHF 10,00", link=f"https://www.ebay.ch/itm/{item}"
+    )
+
+
+# ---------------------- Test 1 – Speichern, Laden, veraltete Checkpoints ---------------------- #
+
+
+def test_store_round_trip_and_expiry(tmp_path):
+    now = [1000.0]
+    store = CheckpointStore(tmp_path / "cp.db", max_age=60, clock=lambda: now[0])
+    checkpoint = store.checkpoint("test", "s1")
+    assert checkpoint.load() is None
+
+    checkpoint.save(1, [_offer(1), _offer(2)], "https://www.ebay.ch/sch?_pgn=2")
+    checkpoint.save(2, [_offer(3)], None, complete=True)
+    state = checkpoint.load()
+    assert state.done and state.complete
+    assert [len(page) for page in state.pages] == [2, 1]
+    assert [o.titel for o in state.rows] == ["Ski 1", "Ski 2", "Ski 3"]
+
+    checkpoint.save(1, [_offer(4)], "https://www.ebay.ch/sch?_pgn=2")  # neuer Lauf
+    state = checkpoint.load()
+    assert not state.done and not state.complete and state.rows == [_offer(4)]
+    assert state.next_url.endswith("_pgn=2")
+
+    store.checkpoint("andere", "s1").save(1, [], None)
+    assert [(c.scope, c.pages) for c in store.pending("test")] == [("test", 1)]
+    now[0] += 61  # veraltet: wird verworfen statt fortgesetzt
+    assert checkpoint.load() is None
+    assert store.pending("test") == []
+    assert store.clear() == 1 and store.pending() == []
+
+
+# ---------------------- Test 2 – abgebrochenen Async-Scrape fortsetzen ---------------------- #
+
+
+class _CrashAfter(Checkpoint):
+    """Checkpoint, dessen Lauf nach einer bestimmten Seite abbricht."""
+
+    def __init__(self, store, scope, key, page):
+        super().__init__(store, scope, key)
+        self.page = page
+
+    def save(self, page, rows, next_url, complete=False):
+        super().save(page, rows, next_url, complete)
+        if page == self.page:
+            raise RuntimeError("WebDriver abgestürzt")
+
+
+def test_async_scrape_resumes_after_last_saved_page(tmp_path):
+    pytest.importorskip("aiohttp")
+    from async_scraper import AsyncScrapeEngine
+
+    mock = MockEbay(MockConfig(pages=3, cards=20, layout="s-item", latency=0))
+    server = start_server(mock)
+    url = f"http://127.0.0.1:{server.server_address[1]}" + SEARCH
+    store = CheckpointStore(tmp_path / "cp.db")
+
+    async def run(checkpoint):
+        governor = RateGovernor(initial_rate=1000, burst=100, backoff_base=0.001)
+        async with AsyncScrapeEngine(governor=governor, archive=None) as engine:
+            return await engine.scrape_search(
+                url, max_pages=5, stop_conditions=[], checkpoint=checkpoint
+            )
+
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(run(_CrashAfter(store, "test", "ski", page=2)))
+        assert mock.snapshot()["pages"] == 2
+
+        mock.config = mock.config._replace(captcha_rate=1.0)  # Seite 3 gesperrt
+        with pytest.raises(main.ScrapeInterrupted) as interrupted:
+            asyncio.run(run(store.checkpoint("test", "ski")))
+        assert len(interrupted.value.rows) == 40
+        assert store.pending("test")[0].pages == 2  # Checkpoint bleibt offen
+
+        mock.config = mock.config._replace(captcha_rate=0.0)
+        result = asyncio.run(run(store.checkpoint("test", "ski")))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert mock.snapshot()["pages"] == 3  # nur Seite 3 neu geladen
+    assert result.complete and len(result.rows) == 60
+    assert len({r.link for r in result.rows}) == 60
+    assert store.checkpoint("test", "ski").load().complete
+
+
+# ---------------------- Test 3 – Scheduler setzt abgebrochene Läufe fort ---------------------- #
+
+
+def test_scheduler_resumes_interrupted_search_first(tmp_path):
+    checkpoints = CheckpointStore(tmp_path / "cp.db")
+    searches = [SavedSearch("ski", "70", hits=5), SavedSearch("jacke", "70", hits=1)]
+    resumed = []
+
+    def crashing(query, preis, checkpoint):
+        checkpoint.save(1, [_offer(1)], "https://www.ebay.ch/sch?_pgn=2")
+        raise RuntimeError("Worker neu gestartet")
+
+    def runner(query, preis, checkpoint):
+        state = checkpoint.load()
+        resumed.append((query, state.rows if state else None))
+        page = 1 + len(state.pages) if state else 1
+        checkpoint.save(page, [_offer(2)], None, complete=True)
+        done = checkpoint.load()
+        return main.ScrapeResult(done.rows, done.complete)
+
+    def scheduler(run):
+        return Scheduler(
+            searches,
+            MonitorStore(tmp_path / "monitor.db"),
+            runner=run,
+            base_interval=3600,
+            rng=random.Random(1),
+            checkpoints=checkpoints,
+        )
+
+    assert scheduler(crashing).run_all() == {}  # Fehler: Checkpoints bleiben
+    assert len(checkpoints.pending("scheduler")) == 2
+
+    results = scheduler(runner).run_pending()  # offene Checkpoints sofort fällig
+    assert sorted(q for q, _ in resumed) == ["jacke", "ski"]
+    assert all(rows == [_offer(1)] for _, rows in resumed)
+    assert all(len(deltas) == 2 for deltas in results.values())
+    assert checkpoints.pending() == []  # nach apply verworfen
+
+
+def test_scheduler_keeps_checkpoint_of_interrupted_run(tmp_path):
+    now = [1000.0]
+    checkpoints = CheckpointStore(tmp_path / "cp.db")
+    store = MonitorStore(tmp_path / "monitor.db")
+
+    def blocked(query, preis, checkpoint):
+        checkpoint.save(1, [_offer(1)], "https://www.ebay.ch/sch?_pgn=2")
+        raise main.ScrapeInterrupted("Seite 2 bleibt gesperrt/leer", [_offer(1)])
+
+    scheduler = Scheduler(
+        [SavedSearch("ski", "70")],
+        store,
+        runner=blocked,
+        clock=lambda: now[0],
+        checkpoints=checkpoints,
+    )
+    assert scheduler.run_all() == {}
+    assert store.deltas(SavedSearch("ski", "70").search_id) == []  # nichts übernommen
+    assert [c.pages for c in checkpoints.pending("scheduler")] == [1]
+    assert scheduler.seconds_until_next() == RESUME_DELAY  # bald fortsetzen
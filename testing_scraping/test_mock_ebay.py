@@ -0,0 +1,92 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für mock_ebay.py: erzeugte Suchseiten (beide Layouts), Fehlerraten und ein Scrape mit
+# async_scraper gegen den laufenden Nachbau (inkl. Captcha-Seiten und Retries)
+# ---------------------------------------------------------------------------------------------------
+
+import asyncio
+
+import pytest
+
+import main
+from mock_ebay import MockConfig, MockEbay, start_server
+from rate_governor import BLOCKED, EMPTY, OK, RateGovernor, classify_page
+
+SEARCH = "/sch/i.html?_nkw=ski+elan&_udhi=200"
+
+
+@pytest.fixture(scope="module")
+def seeds():
+    return MockEbay(MockConfig(layout="mixed")).seeds  # Vorlagen nur einmal zerlegen
+
+
+# ---------------------- Test 1 – Seiten in beiden Layouts, Paginierung ---------------------- #
+
+
+def test_pages_use_both_layouts_and_paginate(seeds):
+    mock = MockEbay(MockConfig(layout="mixed", pages=2, cards=30, latency=0), seeds)
+    seen: set = set()
+
+    status, html = mock.respond(SEARCH)
+    rows, next_url = main.parse_page(html, seen)
+    assert status == 200 and '<li class="s-card' in html
+    assert len(rows) >= 25 and classify_page(html, len(rows)) == OK
+    assert next_url == "/sch/i.html?_nkw=ski+elan&_udhi=200&_pgn=2"
+
+    status, html = mock.respond(next_url)
+    rows_2, next_url = main.parse_page(html, seen)
+    assert '<li class="s-item' in html and '<li class="s-card' not in html
+    assert len(rows_2) == 30 and next_url is None  # letzte Seite
+    assert not {r.link for r in rows} & {r.link for r in rows_2}  # eindeutige Artikel
+    assert mock.snapshot()["pages"] == 2
+
+
+# ---------------------- Test 2 – Fehlerraten ---------------------- #
+
+
+def test_error_rates_and_empty_pages(seeds):
+    captcha = MockEbay(MockConfig(captcha_rate=1.0, latency=0), seeds)
+    status, html = captcha.respond(SEARCH)
+    assert status == 200 and classify_page(html, 0) == BLOCKED
+
+    throttled = MockEbay(MockConfig(throttle_rate=1.0, latency=0), seeds)
+    assert throttled.respond(SEARCH)[0] == 429
+    failing = MockEbay(MockConfig(error_rate=1.0, latency=0), seeds)
+    assert failing.respond(SEARCH)[0] == 500
+
+    mock = MockEbay(MockConfig(pages=2, latency=0), seeds)
+    status, html = mock.respond(SEARCH + "&_pgn=3")  # hinter der letzten Seite
+    rows, next_url = main.parse_page(html, set())
+    assert status == 200 and rows == [] and next_url is None
+    assert classify_page(html, 0) == EMPTY
+    assert mock.respond("/itm/1")[0] == 404
+
+
+# ---------------------- Test 3 – async_scraper gegen den Nachbau ---------------------- #
+
+
+def test_async_scrape_against_mock_retries_captchas(seeds):
+    pytest.importorskip("aiohttp")
+    from async_scraper import AsyncScrapeEngine
+
+    mock = MockEbay(
+        MockConfig(
+            pages=3, cards=20, layout="s-item", latency=0.01, captcha_rate=0.3, seed=3
+        ),
+        seeds,
+    )
+    server = start_server(mock)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    governor = RateGovernor(initial_rate=1000, burst=100, backoff_base=0.01)
+
+    async def run():
+        async with AsyncScrapeEngine(governor=governor, archive=None) as engine:
+            return await engine.scrape(base + SEARCH, max_pages=5, stop_conditions=[])
+
+    try:
+        rows = asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+    stats = mock.snapshot()
+    assert stats["captcha"] > 0  # Captchas ausgeliefert und erneut geladen
+    assert stats["pages"] == 3 and len(rows) == 60
@@ -0,0 +1,120 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für page_archive.py: Hintergrund-Writer, Inhaltsadressierung, Reparse ohne eBay
+# und Aufräumen nach Alter/Grösse
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+import json
+import time
+from pathlib import Path
+
+import page_archive
+from page_archive import PageArchive
+
+ROOT = Path(__file__).resolve().parent.parent
+S_CARD_HTML = (ROOT / "debug_page1.html").read_text(encoding="utf-8")
+S_ITEM_HTML = (Path(__file__).parent / "fixtures" / "search_s_item.html").read_text(
+    encoding="utf-8"
+)
+SKI_URL = "https://www.ebay.ch/sch/i.html?_nkw=ski&_udhi=70"
+
+
+def test_store_is_content_addressed_and_roundtrips(tmp_path):
+    archive = PageArchive(tmp_path, codec="gz")
+    digest = archive.store(S_CARD_HTML, SKI_URL, page=1)
+    assert archive.store(S_CARD_HTML, SKI_URL, page=1) == digest  # gleicher Inhalt
+    archive.store(S_ITEM_HTML, SKI_URL + "&_pgn=2", page=2, query="ski legacy")
+    archive.flush()
+
+    entries = list(archive.entries())
+    assert [(e.query, e.page) for e in entries] == [
+        ("ski", 1),
+        ("ski", 1),
+        ("ski legacy", 2),
+    ]
+    assert len(list(tmp_path.glob("pages/*/*.html.gz"))) == 2  # Duplikat nur einmal
+    assert archive.load(entries[0]) == S_CARD_HTML
+    assert archive.blob_path(entries[0]).stat().st_size < len(S_CARD_HTML) / 4
+    assert [e.page for e in archive.entries(query="ski legacy")] == [2]
+    archive.close()
+
+
+def test_reparse_cli_regenerates_clean_data(tmp_path):
+    archive = PageArchive(tmp_path / "archive", codec="gz")
+    archive.store(S_CARD_HTML, SKI_URL, page=1)
+    archive.store(S_ITEM_HTML, SKI_URL + "&_pgn=2", page=2)
+    archive.close()
+
+    # Beide Fixtures enthalten dieselben Angebote -> nach Link-Deduplizierung 60
+    rows = page_archive.reparse(tmp_path / "archive", query="ski", workers=2)
+    assert len(rows) == 60
+    assert page_archive.reparse(tmp_path / "archive", query="unbekannt") == []
+
+    raw, clean = tmp_path / "raw.csv", tmp_path / "clean.csv"
+    argv = ["reparse", "--archive", str(tmp_path / "archive"), "--workers", "2"]
+    argv += ["--raw", str(raw), "--output", str(clean)]
+    assert page_archive.main_cli(argv) == 0
+
+    with open(raw, encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 60
+    with open(clean, encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) > 0
+
+
+BLOCK_HTML = "<html><body><h1>Pardon Our Interruption</h1></body></html>"
+
+
+def test_reparse_skips_blocked_pages(tmp_path):
+    archive = PageArchive(tmp_path, codec="gz")
+    archive.store(BLOCK_HTML, SKI_URL, page=1, outcome="blocked")
+    archive.store(S_CARD_HTML, SKI_URL, page=1)
+    archive.close()
+
+    assert [e.outcome for e in archive.entries()] == ["blocked", "ok"]
+    assert len(page_archive.reparse(tmp_path, query="ski", workers=1)) == 60
+
+
+def test_prune_by_age_and_size(tmp_path):
+    archive = PageArchive(tmp_path, codec="gz", max_age=None, max_bytes=None)
+    archive.store(S_ITEM_HTML, SKI_URL + "&_pgn=2", page=2)
+    archive.store(BLOCK_HTML, SKI_URL, page=1, outcome="blocked")
+    archive.store(S_CARD_HTML, SKI_URL, page=1)
+    archive.store(S_CARD_HTML, SKI_URL, page=1)  # gleiche Datei wie zuvor
+    archive.flush()
+    assert archive.prune() == 0  # ohne Grenzen bleibt alles
+
+    # Ersten Eintrag um 40 Tage altern lassen
+    index = tmp_path / page_archive.INDEX_NAME
+    lines = index.read_text(encoding="utf-8").splitlines()
+    first = json.loads(lines[0])
+    first["timestamp"] = time.time() - 40 * 86400
+    lines[0] = json.dumps(first)
+    index.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    old = archive.blob_path(next(archive.entries()))
+    assert archive.prune(max_age=30 * 86400) == 1
+    assert not old.exists()
+    assert [e.page for e in archive.entries()] == [1, 1, 1]
+
+    # Grössengrenze: nur die neueste Seite (zwei Einträge, eine Datei) passt
+    card = archive.blob_path(list(archive.entries())[-1])
+    assert archive.prune(max_bytes=card.stat().st_size) == 1
+    assert [e.outcome for e in archive.entries()] == ["ok", "ok"]
+    assert sorted(tmp_path.glob("pages/*/*.html.gz")) == [card]
+
+    # Neue Seiten werden nach dem Aufräumen weiter angehängt
+    archive.store(S_ITEM_HTML, SKI_URL + "&_pgn=2", page=2)
+    archive.close()
+    assert [e.page for e in archive.entries()] == [1, 1, 2]
+
+
+def test_prune_cli(tmp_path):
+    archive = PageArchive(tmp_path, codec="gz")
+    archive.store(S_CARD_HTML, SKI_URL, page=1)
+    archive.close()
+
+    argv = ["prune", "--archive", str(tmp_path), "--max-age-days", "30"]
+    assert page_archive.main_cli(argv) == 0
+    assert len(list(archive.entries())) == 1
+    assert page_archive.main_cli(argv + ["--max-mb", "0"]) == 0
+    assert list(archive.entries()) == []
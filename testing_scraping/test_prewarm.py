@@ -0,0 +1,155 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für prewarm.py: Auswahl beliebter Suchen, Leerlauf/Budget, Auslieferung über main.serve_warm
+# ---------------------------------------------------------------------------------------------------
+
+import time
+from pathlib import Path
+
+import pytest
+
+from offers import Offer
+from prewarm import PrewarmStore, Prewarmer
+from search_log import SearchLog
+
+
+def _offers(query, n=3):
+    return [
+        Offer.create(
+            titel=f"{query} Angebot {i}",
+            preis=f"CHF {i},00",
+            land="aus Schweiz",
+            link=f"https://www.ebay.ch/itm/{i}?_skw={query}",
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+@pytest.fixture
+def search_log(tmp_path):
+    log = SearchLog(tmp_path / "data.csv", tmp_path / "search_log.db")
+    for query, preis, hits in [
+        ("Ski Elan", "200", 3),
+        ("jacke", "70", 2),
+        ("uhr", "50", 1),
+    ]:
+        for i in range(hits):
+            log.record(query, preis, ts=time.time() - 600 + i)
+    log.flush()
+    yield log
+    log.close()
+
+
+def _fake_finisher(tmp_path):
+    def finish(rows, search_id):
+        out_dir = tmp_path / "outputs" / search_id
+        out_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / "output_clean.csv").write_text("x\n", encoding="utf-8")
+        return out_dir
+
+    return finish
+
+
+# ---------------------- Test 1 – Beliebte Suchen, Leerlauf und Budget ---------------------- #
+
+
+def test_prewarms_popular_searches_when_idle(tmp_path, search_log):
+    now = [time.time()]
+    store = PrewarmStore(tmp_path / "prewarm.db", clock=lambda: now[0])
+    scraped = []
+
+    def runner(query, preis):
+        scraped.append((query, preis))
+        return _offers(query)
+
+    prewarmer = Prewarmer(
+        store,
+        search_log,
+        runner=runner,
+        finisher=_fake_finisher(tmp_path),
+        clock=lambda: now[0],
+        load=lambda: 0.0,
+        idle_after=60,
+    )
+    assert [c.query_key for c in prewarmer.candidates()] == ["ski elan", "jacke"]
+
+    search_log.record("ski elan", "200", ts=now[0] - 10)  # gerade eben gesucht
+    search_log.flush()
+    assert prewarmer.run_once() == []
+
+    now[0] += 100
+    warmed = prewarmer.run_once()
+    assert scraped == [("ski elan", "200"), ("jacke", "70")]  # 'uhr' nur 1x gesucht
+    assert [w.offers for w in warmed] == [3, 3]
+    assert prewarmer.candidates() == []  # frisch vorgewärmt
+    assert store.lookup(warmed[0].search_id).query == "ski elan"
+
+    now[0] += 1800.5  # zu alt
+    assert store.lookup(warmed[0].search_id) is None
+
+
+def test_busy_system_and_budget_stop_prewarming(tmp_path, search_log):
+    store = PrewarmStore(tmp_path / "prewarm.db")
+    runs = []
+    prewarmer = Prewarmer(
+        store,
+        search_log,
+        runner=lambda q, p: runs.append(q) or _offers(q),
+        finisher=_fake_finisher(tmp_path),
+        load=lambda: 2.0,
+    )
+    assert prewarmer.run_once() == []  # ausgelastet
+
+    prewarmer.load = lambda: 0.0
+    prewarmer.hourly_budget = 0.0
+    assert prewarmer.run_once() == [] and runs == []
+    assert len(prewarmer.run_once(force=True)) == 0  # Budget gilt auch mit force
+
+    prewarmer.hourly_budget = 900.0
+    prewarmer.max_per_cycle = 1
+    assert len(prewarmer.run_once()) == 1 and runs == ["Ski Elan"]
+
+
+# ---------------------- Test 2 – Auslieferung und Bericht ---------------------- #
+
+
+def test_submit_serves_prewarmed_search(tmp_path, monkeypatch, search_log):
+    import main
+
+    for name, value in {
+        "CSV_DATA_PATH": tmp_path / "output_scraper.csv",
+        "CLEANED_DATA_PATH": tmp_path / "output_clean.csv",
+        "CLEANED_STATS_PATH": tmp_path / "output_clean.stats.json",
+        "OUTPUT_DIR": tmp_path / "outputs",
+        "HISTORY_DIR": tmp_path / "history",
+        "OFFER_DB_PATH": tmp_path / "offers.db",
+        "CACHE_DB_PATH": tmp_path / "cache.db",
+        "PREWARM_DB_PATH": tmp_path / "prewarm.db",
+    }.items():
+        monkeypatch.setattr(main, name, value)
+    monkeypatch.setattr(main, "log_search", lambda *args: None)
+
+    prewarmer = Prewarmer(
+        main.get_prewarm_store(),
+        search_log,
+        runner=lambda q, p: _offers(q, 5),
+        load=lambda: 0.0,
+    )
+    (warm,) = prewarmer.run_once(force=True)[:1]
+    assert main.published_output_dir() is None  # noch nicht veröffentlicht
+
+    def no_scrape(*args, **kwargs):
+        raise AssertionError("vorgewärmte Suche darf nicht scrapen")
+
+    monkeypatch.setattr(main, "run_scrape", no_scrape)
+    main.app.config["TESTING"] = True
+    with main.app.test_client() as client:
+        response = client.post("/submit", data={"produkt": "Ski  Elan", "preis": "200"})
+        assert response.status_code == 302
+        assert len(list(main.iter_rows_for_table())) == 5
+        assert Path(warm.out_dir).parent == main.OUTPUT_DIR / warm.search_id
+        assert main.published_output_dir() == Path(warm.out_dir)
+
+        main.serve_warm("uhr", "50")  # nicht vorgewärmt -> Fehlschuss
+        report = client.get("/api/prewarm").get_json()
+    assert (report["lookups"], report["hits"], report["hit_rate"]) == (2, 1, 0.5)
+    assert report["runs"] == 2 and report["failed_runs"] == 0
@@ -0,0 +1,229 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für rate_governor.py: Seitenbewertung, Token-Bucket/AIMD, Backoff, Circuit Breaker, iter_scrape,
+# prozessübergreifender Zustand (SQLite)
+# ---------------------------------------------------------------------------------------------------
+
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+import main
+from rate_governor import (
+    BLOCKED,
+    EMPTY,
+    ERROR,
+    OK,
+    TIMEOUT,
+    CircuitOpenError,
+    RateGovernor,
+    classify_page,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+CAPTCHA_PAGE = (
+    "<html><head><title>Pardon Our Interruption...</title></head>"
+    "<body><p>Bitte bestätigen Sie, dass Sie ein Mensch sind.</p></body></html>"
+)
+SPLASH_PAGE = (
+    "<html><head><title>Sicherheitsmassnahme | eBay</title></head><body>"
+    '<iframe src="https://www.ebay.ch/splashui/captcha?ap=1"></iframe></body></html>'
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ---------------------- Test 1 – Seitenbewertung ---------------------- #
+
+
+def test_classify_page():
+    real = (ROOT / "debug_page1.html").read_text(encoding="utf-8")
+    legacy = (ROOT / "testing_scraping/fixtures/search_s_item.html").read_text(
+        encoding="utf-8"
+    )
+    assert classify_page(real, 60) == OK  # enthält CSS '.ifh-captcha', kein Captcha
+    assert classify_page(legacy, 0) == OK  # Karten vorhanden, nur weggefiltert
+    assert classify_page(CAPTCHA_PAGE, 0) == BLOCKED
+    assert classify_page(SPLASH_PAGE, 0, timed_out=True) == BLOCKED
+    assert classify_page("<html><body></body></html>", 0) == EMPTY
+    assert classify_page("<html><body></body></html>", 0, timed_out=True) == TIMEOUT
+    assert classify_page("<h3 class='srp-save-null-search__heading'>0</h3>", 0) == OK
+    assert classify_page("", 0, status=429) == BLOCKED
+    assert classify_page("", 0, status=500) == ERROR
+
+
+# ---------------------- Test 2 – Token-Bucket, AIMD, Backoff, Circuit Breaker ---------------------- #
+
+
+def test_token_bucket_and_aimd():
+    clock = _Clock()
+    governor = RateGovernor(initial_rate=1.0, burst=2.0, clock=clock)
+    url = "https://www.ebay.ch/sch/i.html?_nkw=ski"
+    assert [governor.reserve(url) for _ in range(3)] == [0.0, 0.0, 1.0]
+
+    for _ in range(4):
+        governor.record(url, OK, latency=1.0)
+    assert governor.snapshot()["www.ebay.ch"]["rate"] == 1.2  # +0.05 pro Seite
+    governor.record(url, OK, latency=20.0)  # langsam -> leicht bremsen
+    assert governor.snapshot()["www.ebay.ch"]["rate"] == 0.96
+
+    clock.now = 10.0  # Bucket wieder voll
+    governor.record(url, BLOCKED)  # halbiert Rate, leert Bucket, Backoff 1-2 s
+    governor.record(url, BLOCKED)  # gleiche Episode (lief parallel) -> nicht erneut
+    assert governor.snapshot()["www.ebay.ch"]["rate"] == 0.48
+    wait = governor.reserve(url)
+    assert 1.0 <= wait <= 2.0
+    clock.now += wait  # Backoff vorbei, Token nur zum neuen Tempo nachgefüllt
+    assert governor.reserve(url) == pytest.approx(1 / 0.48 - wait)
+    assert governor.reserve("https://other.example/") == 0.0  # andere Hosts unberührt
+
+
+def test_backoff_doubles_and_circuit_breaker_probes():
+    clock = _Clock()
+    governor = RateGovernor(
+        initial_rate=100.0, failure_threshold=3, cooldown=60.0, clock=clock
+    )
+    url = "https://www.ebay.ch/sch/i.html?_nkw=ski"
+    waits = []
+    for _ in range(2):
+        governor.record(url, EMPTY)
+        waits.append(governor.reserve(url))
+        clock.now += waits[-1]
+    assert 1.0 <= waits[0] <= 2.0 and 2.0 <= waits[1] <= 4.0
+
+    governor.record(url, BLOCKED)  # dritter Fehlschlag in Folge -> offen
+    opened = clock.now
+    with pytest.raises(CircuitOpenError) as exc:
+        governor.reserve(url)
+    assert exc.value.retry_after == pytest.approx(60.0)
+
+    clock.now = opened + 61.0
+    assert governor.reserve(url) == 0.0  # genau ein Probeaufruf
+    with pytest.raises(CircuitOpenError):
+        governor.reserve(url)
+    governor.record(url, BLOCKED)  # Probe gescheitert -> wieder offen
+    with pytest.raises(CircuitOpenError):
+        governor.reserve(url)
+
+    clock.now = opened + 122.0
+    governor.reserve(url)
+    governor.record(url, OK)
+    assert governor.snapshot()["www.ebay.ch"]["open"] is False
+    clock.now = opened + 500.0
+    assert governor.reserve(url) == 0.0
+
+
+# ---------------------- Test 3 – iter_scrape lädt gesperrte Seiten erneut ---------------------- #
+
+
+class _BlockingDriver:
+    """Liefert zuerst `blocked` Mal eine Captcha-Seite, danach Angebote."""
+
+    def __init__(self, blocked):
+        self.blocked = blocked
+        self.visited = []
+        self.page_source = ""
+
+    def get(self, url):
+        self.visited.append(url)
+        if len(self.visited) <= self.blocked:
+            self.page_source = CAPTCHA_PAGE
+            return
+        self.page_source = (
+            '<ul class="srp-results"><li class="s-item">'
+            '<a class="s-item__link" href="https://www.ebay.ch/itm/1">'
+            '<h3 class="s-item__title">Angebot 1</h3></a>'
+            '<span class="s-item__price">CHF 10,00</span></li></ul>'
+        )
+
+
+@pytest.fixture
+def no_browser(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "ARCHIVE_DIR", tmp_path)
+    monkeypatch.setattr(main, "accept_cookies", lambda d: None)
+    monkeypatch.setattr(main, "wait_for_results", lambda d, timeout=25: None)
+    monkeypatch.setattr(main, "lazy_scroll", lambda d, steps=6, pause=0.8: None)
+    sleeps = []
+    monkeypatch.setattr(main.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_iter_scrape_retries_blocked_page_after_backoff(no_browser):
+    governor = RateGovernor(initial_rate=100.0)
+    driver = _BlockingDriver(blocked=1)
+    rows = main.scrape_all(driver, "http://stub/s", max_pages=1, governor=governor)
+    assert [r.titel for r in rows] == ["Angebot 1"]
+    assert len(driver.visited) == 2
+    assert any(s >= 1.0 for s in no_browser)  # Backoff vor dem zweiten Versuch
+    assert governor.snapshot()["stub"]["blocked"] == 1
+
+
+def test_iter_scrape_gives_up_on_persistent_block(no_browser):
+    governor = RateGovernor(initial_rate=100.0, failure_threshold=3)
+    driver = _BlockingDriver(blocked=99)
+    assert main.scrape_all(driver, "http://stub/s", governor=governor) == []
+    assert len(driver.visited) == 3  # 1 + PAGE_RETRIES
+    with pytest.raises(CircuitOpenError):  # weitere Suchen auf dem Host pausieren
+        governor.reserve("http://stub/s2")
+
+
+# ---------------------- Test 4 – gemeinsamer Zustand aller Prozesse ---------------------- #
+
+
+def test_state_is_shared_between_governors(tmp_path):
+    clock = _Clock()
+    kwargs = dict(initial_rate=1.0, burst=1.0, failure_threshold=1, cooldown=60.0)
+    a = RateGovernor(clock=clock, path=tmp_path / "governor.db", **kwargs)
+    b = RateGovernor(clock=clock, path=tmp_path / "governor.db", **kwargs)
+    url = "https://www.ebay.ch/sch/i.html?_nkw=ski"
+
+    assert a.reserve(url) == 0.0
+    assert b.reserve(url) == pytest.approx(1.0)  # Token bereits von a genommen
+    b.record(url, BLOCKED)  # öffnet den Circuit auch für a
+    with pytest.raises(CircuitOpenError):
+        a.reserve(url)
+
+    clock.now = 61.0
+    assert a.reserve(url) == 0.0  # Probeaufruf durch a
+    with pytest.raises(CircuitOpenError):
+        b.reserve(url)
+    clock.now = 122.0  # a meldet nie ein Ergebnis (abgestürzt): Probe verfällt
+    assert b.reserve(url) == 0.0
+    b.record(url, OK)
+    assert a.snapshot()["www.ebay.ch"] == {
+        "rate": 0.55,
+        "failures": 0,
+        "open": False,
+        "pages": 2,
+        "blocked": 1,
+    }
+
+
+def _reserve_pages(path, count):
+    governor = RateGovernor(initial_rate=20.0, burst=1.0, path=path)
+    for _ in range(count):
+        governor.wait("http://shared.example/")
+
+
+def test_processes_share_one_rate(tmp_path):
+    path = str(tmp_path / "governor.db")
+    RateGovernor(path=path)  # Schema anlegen
+    start = time.monotonic()
+    workers = [
+        multiprocessing.Process(target=_reserve_pages, args=(path, 5)) for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    # 20 Aufrufe bei 20/s (Burst 1): gemeinsam ~0.95 s, je Prozess wären es ~0.2 s
+    assert time.monotonic() - start >= 0.9
+    assert RateGovernor(path=path).snapshot()["shared.example"]["rate"] == 20.0
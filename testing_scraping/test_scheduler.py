@@ -0,0 +1,92 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für scheduler.py: gespeicherte Suchen, Delta-Erkennung per Artikelnummer, Planung
+# ---------------------------------------------------------------------------------------------------
+
+import random
+
+from main import ScrapeResult
+from offers import Offer, item_id_from_link
+from scheduler import MonitorStore, SavedSearch, Scheduler, load_saved_searches
+
+
+def _offer(item: int, preis: str) -> Offer:
+    link = f"https://www.ebay.ch/itm/{item}?_skw=ski&itmmeta=01ABC{preis}"
+    return Offer.create(titel=f"Ski {item}", preis=preis, link=link)
+
+
+def test_item_id_from_link():
+    assert item_id_from_link("https://www.ebay.ch/itm/277557977505?_skw=ski") == (
+        "277557977505"
+    )
+    assert item_id_from_link("https://www.ebay.ch/itm/ski-atomic/1234?hash=x") == "1234"
+    assert item_id_from_link("https://example.com/a?b=c") == "https://example.com/a"
+
+
+def test_load_saved_searches_counts_repeats(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "Produkt,Preis,Region,Link\n"
+        "jacke wolle,70,,\nJacke  Wolle,70,,\nski,120,,\n,50,,\n",
+        encoding="utf-8",
+    )
+    searches = load_saved_searches(path)
+    assert [(s.query, s.preis, s.hits) for s in searches] == [
+        ("jacke wolle", "70", 2),
+        ("ski", "120", 1),
+    ]
+
+
+def test_monitor_store_records_only_deltas(tmp_path):
+    store = MonitorStore(tmp_path / "monitor.db")
+    first = store.apply("s1", [_offer(1, "CHF 10,00"), _offer(2, "CHF 20,00")])
+    assert sorted((d.kind, d.item_id) for d in first) == [("new", "1"), ("new", "2")]
+
+    # Tracking-Parameter im Link ändern sich, Artikelnummer bleibt -> keine Änderung
+    unchanged = store.apply("s1", [_offer(1, "CHF 10,00"), _offer(2, "CHF 20,00")])
+    assert unchanged == []
+
+    second = store.apply("s1", [_offer(1, "CHF 9,50"), _offer(3, "CHF 5,00")])
+    assert sorted((d.kind, d.item_id, d.old_preis) for d in second) == [
+        ("new", "3", None),
+        ("price", "1", "CHF 10,00"),
+        ("removed", "2", "CHF 20,00"),
+    ]
+    assert store.apply("s1", []) == []  # leerer Lauf entfernt nichts
+    # Teilergebnis (z.B. max_pages erreicht): keine 'removed', Stand bleibt
+    partial = store.apply("s1", [_offer(3, "CHF 4,00")], complete=False)
+    assert [(d.kind, d.item_id) for d in partial] == [("price", "3")]
+    assert [d.kind for d in store.apply("s1", [_offer(1, "CHF 9,50")])] == ["removed"]
+    assert len(store.deltas("s1")) == 7
+    assert store.deltas("s2") == []
+    store.close()
+
+
+def test_scheduler_runs_hot_searches_first_and_reschedules(tmp_path):
+    now = [1000.0]
+    calls = []
+
+    def runner(query, preis):
+        calls.append(query)
+        return ScrapeResult([_offer(len(query), "CHF 1,00")], True)
+
+    searches = [SavedSearch("ski", "70", hits=1), SavedSearch("jacke", "70", hits=4)]
+    scheduler = Scheduler(
+        searches,
+        MonitorStore(tmp_path / "monitor.db"),
+        runner=runner,
+        base_interval=3600,
+        rng=random.Random(1),
+        clock=lambda: now[0],
+    )
+    assert scheduler.interval_for(searches[1]) < scheduler.interval_for(searches[0])
+
+    results = scheduler.run_all()
+    assert calls == ["jacke", "ski"]
+    assert all(len(deltas) == 1 for deltas in results.values())
+
+    assert scheduler.run_pending() == {}  # nichts fällig
+    wait = scheduler.seconds_until_next()
+    assert 600 <= wait <= 3600 * 1.2
+    now[0] += 3600 * 1.2
+    scheduler.run_pending()
+    assert sorted(calls[2:]) == ["jacke", "ski"]
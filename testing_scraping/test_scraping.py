@@ -72,7 +72,7 @@ def test_parse_items_from_html_check_duplicates_marked_as_seen_links():
     seen = set()
     rows = parse_items_from_html(html, seen)
     assert len(rows) == 1
-    assert rows[0]["link"] == "https://www.ebay.ch/itm/123"
+    assert rows[0].link == "https://www.ebay.ch/itm/123"
     assert "https://www.ebay.ch/itm/123" in seen
 
 
@@ -112,13 +112,17 @@ def test_save_to_csv_writes_header_and_lines(tmp_path):
     assert "B" in content
 
 
-def test_append_row_writes_line_in_csv(tmp_path, monkeypatch):
+def test_log_search_writes_line_in_csv(tmp_path, monkeypatch):
     """Testet, ob die Formulareingabe je-weils als neue Zeile in der Datei «data.csv» gespeichert wird."""
-    # CSV_PATH im Modul auf temporäre Datei umbiegen
+    from search_log import open_search_log
+
+    # CSV_PATH und Such-Log im Modul auf temporäre Dateien umbiegen
     test_csv = tmp_path / "input_log.csv"
     monkeypatch.setattr(main, "CSV_PATH", test_csv)
+    monkeypatch.setattr(main, "SEARCH_DB_PATH", tmp_path / "search_log.db")
 
-    append_row(produkt_url="iphone", preis="100", region="Schweiz")
+    log_search(produkt="iphone", preis="100", region="Schweiz")
+    open_search_log(test_csv, main.SEARCH_DB_PATH).flush()
 
     assert test_csv.exists()
     lines = test_csv.read_text(encoding="utf-8").splitlines()
@@ -214,3 +218,34 @@ def test_pagination_two_pages():
     soup3 = BeautifulSoup(html_page_3, "html.parser")
     next3 = soup3.select_one(NEXT_SELECTOR)
     assert next3 is None
+
+
+def test_layout_detection_matches_generic_selectors():
+    # Beide Layout-Fixtures: erkannte Variante liefert dieselben Angebote wie alle Selektoren
+    fixtures = {
+        "s-card": Path(main.__file__).parent / "debug_page1.html",
+        "s-item": Path(__file__).parent / "fixtures" / "search_s_item.html",
+    }
+    main.reset_selector_stats()
+    for name, path in fixtures.items():
+        soup = BeautifulSoup(path.read_text(encoding="utf-8"), "html.parser")
+        assert main.detect_layout(soup.select(ITEMS_SELECTOR)).name == name
+
+        rows = main.parse_cards(soup, set())
+        generic = main.parse_cards(soup, set(), main.GENERIC_LAYOUT)
+        assert len(rows) == 60
+        assert rows == generic
+
+    stats = main.selector_stats()
+    assert stats["s-card"]["pages"] == 1 and stats["s-card"]["link"] == 60
+    assert stats["s-item"]["pages"] == 1 and stats["s-item"]["price"] == 60
+    assert stats["s-item"]["image"] == 60
+    assert stats["generic"]["pages"] == 2
+
+
+def test_detect_layout_mixed_cards_falls_back_to_generic():
+    soup = BeautifulSoup(
+        '<li class="s-card"></li><li class="s-item"></li>', "html.parser"
+    )
+    assert main.detect_layout(soup.select(ITEMS_SELECTOR)) is main.GENERIC_LAYOUT
+    assert main.detect_layout([]) is main.GENERIC_LAYOUT
@@ -0,0 +1,53 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für search_log.py: gepuffertes Schreiben (data.csv + SQLite), Flush beim Beenden, Beliebtheit
+# ---------------------------------------------------------------------------------------------------
+
+import csv
+
+from search_log import SearchLog, normalize_query
+
+
+def _rows(path):
+    with path.open(newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_record_writes_batches_to_csv_and_db(tmp_path):
+    log = SearchLog(tmp_path / "data.csv", tmp_path / "log.db", flush_interval=0.05)
+    for i in range(250):
+        log.record("Jacke  Wolle" if i % 2 else "ski elan", "70", "CH", ts=1000.0 + i)
+    log.flush()
+
+    rows = _rows(tmp_path / "data.csv")
+    assert rows[0] == ["Produkt", "Preis", "Region", "Link"]
+    assert len(rows) == 251 and rows[1] == ["ski elan", "70", "CH", ""]
+
+    top = log.popular(limit=2)
+    assert [(p.query_key, p.preis, p.hits) for p in top] == [
+        ("jacke wolle", "70", 125),
+        ("ski elan", "70", 125),
+    ]  # Gleichstand: zuletzt gesuchte zuerst
+    assert top[0].query == "Jacke  Wolle" and top[0].last_seen == 1249.0
+    assert [p.hits for p in log.popular(since=1200.0)] == [25, 25]
+    log.close()
+
+
+def test_close_flushes_pending_entries(tmp_path):
+    log = SearchLog(tmp_path / "data.csv", tmp_path / "log.db", flush_interval=60)
+    log.record("ski", "CHF 120.-")
+    log.close()  # wartet nicht 60 s, schreibt aber alles
+    assert _rows(tmp_path / "data.csv")[1] == ["ski", "CHF 120.-", "", ""]
+    assert log.counts() == {("ski", "120"): 1}
+
+
+def test_new_db_is_backfilled_from_csv(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "Produkt,Preis,Region,Link\njacke wolle,70,,\nJacke Wolle,70,,\n,50,,\n",
+        encoding="utf-8",
+    )
+    log = SearchLog(path, tmp_path / "log.db")
+    assert log.counts() == {("jacke wolle", "70"): 2}
+    assert normalize_query("  LED Stehlampe Holz Retro Vintage Gross ") == (
+        "led stehlampe holz retro vintage"
+    )
@@ -0,0 +1,123 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für stop_conditions.py und den vorzeitigen Abbruch der Paginierung in scrape_all
+# ---------------------------------------------------------------------------------------------------
+
+import main
+import rate_governor
+from offers import Offer
+from stop_conditions import (
+    DuplicateRatioAbove,
+    EnoughResults,
+    NoNewItems,
+    PageStats,
+    PriceAboveLimit,
+    TimeBudget,
+    first_stop_reason,
+    track_page,
+)
+
+
+def _stats(**kwargs):
+    base = dict(page=2, parsed=10, new_rows=5, total_rows=50, elapsed=3.0)
+    base.update(kwargs)
+    return PageStats(**base)
+
+
+def test_conditions_trigger_and_pass():
+    assert NoNewItems().check(_stats(new_rows=0))
+    assert NoNewItems().check(_stats()) is None
+
+    assert DuplicateRatioAbove(0.8).check(_stats(new_rows=1))  # 90 % Duplikate
+    assert DuplicateRatioAbove(0.8).check(_stats(new_rows=5)) is None
+    assert DuplicateRatioAbove(0.8).check(_stats(parsed=0, new_rows=0)) is None
+
+    assert EnoughResults(50).check(_stats())
+    assert EnoughResults(51).check(_stats()) is None
+
+    assert TimeBudget(2).check(_stats())
+    assert TimeBudget(10).check(_stats()) is None
+
+    assert PriceAboveLimit(100).check(_stats(min_price=120.0))
+    assert PriceAboveLimit(100).check(_stats(min_price=80.0)) is None
+    assert PriceAboveLimit(100).check(_stats(min_price=None)) is None
+
+
+def test_first_stop_reason_order():
+    conditions = [EnoughResults(10), NoNewItems()]
+    reason = first_stop_reason(conditions, _stats(new_rows=0))
+    assert reason.startswith("50 Angebote")
+    assert first_stop_reason([], _stats(new_rows=0)) is None
+
+
+def test_track_page_filters_seen_links():
+    seen = {"https://www.ebay.ch/itm/1"}
+    rows = [
+        Offer.create(titel="a", preis="CHF 10,00", link="https://www.ebay.ch/itm/1"),
+        Offer.create(titel="b", preis="CHF 12,50", link="https://www.ebay.ch/itm/2"),
+    ]
+    new_rows, stats = track_page(3, rows, seen, 7, 0.0)
+
+    assert [r.titel for r in new_rows] == ["b"]
+    assert "https://www.ebay.ch/itm/2" in seen
+    assert (stats.page, stats.parsed, stats.new_rows, stats.total_rows) == (3, 2, 1, 8)
+    assert stats.duplicates == 1
+    assert stats.min_price == 12.5
+
+
+class _RepeatingDriver:
+    """Jede Seite enthält dieselben zwei Angebote und einen 'Weiter'-Link."""
+
+    def __init__(self):
+        self.visited = []
+        self.page_source = ""
+
+    def get(self, url):
+        self.visited.append(url)
+        cards = "".join(
+            f"""
+            <li class="s-item">
+              <a class="s-item__link" href="https://www.ebay.ch/itm/{i}">
+                <h3 class="s-item__title">Angebot {i}</h3>
+              </a>
+              <span class="s-item__price">CHF 1{i},00</span>
+            </li>"""
+            for i in range(2)
+        )
+        nxt = f'<a class="pagination__next" href="{url}x">n</a>'
+        self.page_source = f'<ul class="srp-results">{cards}</ul>{nxt}'
+
+
+def test_scrape_all_stops_when_no_new_items(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "ARCHIVE_DIR", tmp_path)  # Seitenarchiv umleiten
+    monkeypatch.setattr(rate_governor, "GOVERNOR_DB_PATH", tmp_path / "governor.db")
+    monkeypatch.setattr(main, "accept_cookies", lambda d: None)
+    monkeypatch.setattr(main, "wait_for_results", lambda d, timeout=25: None)
+    monkeypatch.setattr(main, "lazy_scroll", lambda d, steps=6, pause=0.8: None)
+    monkeypatch.setattr(main.time, "sleep", lambda s: None)
+
+    driver = _RepeatingDriver()
+    rows = main.scrape_all(driver, "http://stub/s", max_pages=10)
+
+    assert len(rows) == 2
+    assert len(driver.visited) == 2  # Seite 2 liefert nichts Neues -> Abbruch
+
+    driver = _RepeatingDriver()
+    rows = main.scrape_all(driver, "http://stub/s", max_pages=10, stop_conditions=[])
+    assert len(rows) == 2
+    assert len(driver.visited) == 10  # ohne Bedingungen bis max_pages
+
+
+def test_iter_scrape_yields_each_page_before_loading_the_next(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "ARCHIVE_DIR", tmp_path)
+    monkeypatch.setattr(rate_governor, "GOVERNOR_DB_PATH", tmp_path / "governor.db")
+    monkeypatch.setattr(main, "accept_cookies", lambda d: None)
+    monkeypatch.setattr(main, "wait_for_results", lambda d, timeout=25: None)
+    monkeypatch.setattr(main, "lazy_scroll", lambda d, steps=6, pause=0.8: None)
+    monkeypatch.setattr(main.time, "sleep", lambda s: None)
+
+    driver = _RepeatingDriver()
+    pages = main.iter_scrape(driver, "http://stub/s", max_pages=10)
+
+    assert len(next(pages)) == 2
+    assert len(driver.visited) == 1  # Seite 2 wird erst beim nächsten next() geladen
+    assert list(pages) == [[]]  # Seite 2 ohne neue Angebote -> Ende
@@ -0,0 +1,114 @@
+# ---------------------------------------------------------------------------------------------------
+# Tests für tab_scraper.py mit einem Fake-WebDriver (kein Browser nötig)
+# ---------------------------------------------------------------------------------------------------
+
+import main
+import tab_scraper
+from rate_governor import RateGovernor
+
+
+def _page_html(url: str) -> str:
+    """Kleine Suchseite im s-item-Layout: 2 Karten pro Seite, Folgeseite bis p=3."""
+    query, page = url.split("?q=")[1].split("&p=")
+    page = int(page)
+    cards = "".join(
+        f"""
+        <li class="s-item">
+          <a class="s-item__link" href="https://www.ebay.ch/itm/{query}{page}{i}">
+            <h3 class="s-item__title">{query} Angebot {page}-{i}</h3>
+          </a>
+          <span class="s-item__price">CHF {page}{i},00</span>
+        </li>"""
+        for i in range(2)
+    )
+    nxt = (
+        f'<a class="pagination__next" href="http://stub?q={query}&p={page + 1}">n</a>'
+        if page < 3
+        else ""
+    )
+    return f'<ul class="srp-results">{cards}</ul>{nxt}'
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+    def new_window(self, kind):
+        handle = f"tab{len(self.driver.tabs)}"
+        self.driver.tabs[handle] = {"url": "about:blank", "origin": 0, "polls": 0}
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """Simuliert Tabs, die nach zwei Abfragen fertig geladen sind."""
+
+    def __init__(self):
+        self.tabs = {"tab0": {"url": "about:blank", "origin": 0, "polls": 0}}
+        self.current_window_handle = "tab0"
+        self.switch_to = _SwitchTo(self)
+        self.max_loading = 0
+        self.closed = []
+
+    @property
+    def _tab(self):
+        return self.tabs[self.current_window_handle]
+
+    def execute_script(self, script, *args):
+        if "window.location.href" in script:
+            self._tab.update(url=args[0], origin=self._tab["origin"] + 1, polls=0)
+            loading = sum(1 for t in self.tabs.values() if t["polls"] < 2)
+            self.max_loading = max(self.max_loading, loading)
+            return None
+        if "readyState" in script:
+            self._tab["polls"] += 1
+            state = "complete" if self._tab["polls"] >= 2 else "loading"
+            return [self._tab["origin"], state, True]
+        if "timeOrigin" in script:
+            return self._tab["origin"]
+        return None
+
+    @property
+    def page_source(self):
+        return _page_html(self._tab["url"])
+
+    def close(self):
+        self.closed.append(self.current_window_handle)
+
+
+def test_scrape_in_tabs_collects_all_pages_of_all_searches(monkeypatch):
+    """5 Suchen à 3 Seiten in 2 Tabs: alle Angebote, Reihenfolge wie start_urls."""
+    monkeypatch.setattr(main, "accept_cookies", lambda driver: None)
+    driver = FakeDriver()
+    urls = [f"http://stub?q=s{i}&p=1" for i in range(5)]
+
+    results = tab_scraper.scrape_in_tabs(
+        driver,
+        urls,
+        max_pages=3,
+        max_tabs=2,
+        poll_interval=0,
+        governor=RateGovernor(initial_rate=1000, burst=100),
+    )
+
+    assert [len(rows) for rows in results] == [6] * 5
+    assert all(
+        row.titel.startswith(f"s{i} ") for i, rows in enumerate(results) for row in rows
+    )
+    assert driver.max_loading == 2  # beide Tabs laden gleichzeitig
+    assert driver.closed == ["tab1"]  # Zusatz-Tab wieder geschlossen
+    assert driver.current_window_handle == "tab0"
+
+
+def test_scrape_in_tabs_respects_max_pages(monkeypatch):
+    monkeypatch.setattr(main, "accept_cookies", lambda driver: None)
+    results = tab_scraper.scrape_in_tabs(
+        FakeDriver(),
+        ["http://stub?q=x&p=1"],
+        max_pages=1,
+        poll_interval=0,
+        governor=RateGovernor(initial_rate=1000, burst=100),
+    )
+    assert [len(rows) for rows in results] == [2]